@@ -0,0 +1,83 @@
+# benchmarks/bench_backup.py
+"""
+백업 저장 형식 벤치마크: 가상의 500채널 길드에서 JSONB(기존) 대비 압축 스냅샷 크기와 인코딩/디코딩 시간.
+실행: python -m benchmarks.bench_backup
+"""
+from __future__ import annotations
+
+import json
+import random
+import time
+
+from utils.snapshot import decode_snapshot, encode_snapshot
+
+ROUNDS = 20
+
+
+def _overwrite(rng: random.Random, target_id: int, kind: str) -> dict:
+    return {"target_id": target_id, "target_type": kind,
+            "allow": rng.choice((0, 1024, 3072, 68608)), "deny": rng.choice((0, 2048, 1024))}
+
+
+def make_guild(rng: random.Random, n_channels: int = 500, n_roles: int = 120) -> dict:
+    gid = 10**17
+    roles = [{
+        "id": gid + i, "name": f"role-{i}", "color": rng.randrange(0xFFFFFF), "hoist": i % 7 == 0,
+        "mentionable": i % 5 == 0, "permissions": rng.getrandbits(40), "position": i, "is_everyone": i == 0,
+    } for i in range(n_roles)]
+    role_ids = [r["id"] for r in roles]
+
+    n_cats = max(1, n_channels // 20)
+    cats, texts, voices = [], [], []
+    cat_ows = []
+    for c in range(n_cats):
+        ows = [_overwrite(rng, rid, "role") for rid in rng.sample(role_ids, 6)]
+        cat_ows.append(ows)
+        cats.append({"id": gid + 1000 + c, "name": f"category-{c}", "position": c,
+                     "overwrites": ows, "parent_id": None})
+    for i in range(n_channels - n_cats):
+        c = i % n_cats
+        # 대부분은 카테고리와 권한 동기화, 일부만 개별 덮어쓰기 추가
+        ows = list(cat_ows[c])
+        if i % 10 == 0:
+            ows = ows + [_overwrite(rng, gid + 50_000 + i, "member")]
+        common = {"id": gid + 2000 + i, "name": f"channel-{i}", "position": i,
+                  "overwrites": ows, "parent_id": gid + 1000 + c}
+        if i % 4 == 0:
+            voices.append({**common, "user_limit": 0, "bitrate": 64000, "type": "voice"})
+        else:
+            texts.append({**common, "topic": f"Topic for channel {i}" if i % 3 else None,
+                          "nsfw": False, "slowmode_delay": 0, "type": "text"})
+    return {
+        "guild": {"id": gid, "name": "bench guild"},
+        "roles": roles,
+        "channels": {"categories": cats, "texts": texts, "voices": voices},
+        "created_at": "2024-01-01T00:00:00+00:00",
+    }
+
+
+def _time(fn, *args) -> float:
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(*args)
+    return (time.perf_counter() - t0) / ROUNDS * 1000
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'channels':>8} | {'json KB':>8} | {'snapshot KB':>11} | {'ratio':>6} | {'enc ms':>7} | {'dec ms':>7} | {'json enc/dec ms':>15}")
+    for n in (100, 500, 2000):
+        data = make_guild(rng, n)
+        raw = json.dumps(data)
+        blob = encode_snapshot(data)
+        assert decode_snapshot(blob) == data
+        enc = _time(encode_snapshot, data)
+        dec = _time(decode_snapshot, blob)
+        jenc = _time(json.dumps, data)
+        jdec = _time(json.loads, raw)
+        print(f"{n:>8} | {len(raw) / 1024:>8.1f} | {len(blob) / 1024:>11.1f} | {len(raw) / len(blob):>5.1f}x"
+              f" | {enc:>7.2f} | {dec:>7.2f} | {jenc:>7.2f}/{jdec:<7.2f}")
+
+
+if __name__ == "__main__":
+    main()
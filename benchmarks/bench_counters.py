@@ -0,0 +1,112 @@
+# benchmarks/bench_counters.py
+"""
+카운터 백엔드 벤치마크 + 동작 확인.
+- memory / redis(FakeRedis: 필요한 명령만 흉내 내는 메모리 대체 서버)에 같은 시나리오를 돌려 결과 비교
+- 재시작/다중 프로세스: 같은 client를 쓰는 새 백엔드가 이전 누적을 이어받는지
+그 뒤 hit() 1회 비용 측정 (redis는 클라이언트 쪽 오버헤드만).
+실행: python -m benchmarks.bench_counters
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from utils.counters import CounterBackend, MemoryCounterBackend, RedisCounterBackend
+
+HITS = 20_000
+
+
+class _FakePipeline:
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+        self.calls: list[tuple[str, tuple]] = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.calls.append((name, args))
+            return self
+        return queue
+
+    async def execute(self) -> list:
+        return [await getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+class FakeRedis:
+    """RedisCounterBackend가 쓰는 명령만 구현 (만료는 무시)"""
+
+    def __init__(self):
+        self.data: dict[str, object] = {}
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+    async def zadd(self, key: str, mapping: dict[str, float]) -> int:
+        z = self.data.setdefault(key, {})
+        z.update(mapping)
+        return len(mapping)
+
+    async def zremrangebyscore(self, key: str, lo: float, hi: float) -> int:
+        z = self.data.get(key, {})
+        gone = [m for m, score in z.items() if lo <= score <= hi]
+        for m in gone:
+            del z[m]
+        return len(gone)
+
+    async def zcard(self, key: str) -> int:
+        return len(self.data.get(key, {}))
+
+    async def pexpire(self, key: str, ms: int) -> bool:
+        return key in self.data
+
+    async def expire(self, key: str, sec: int) -> bool:
+        return key in self.data
+
+    async def incr(self, key: str) -> int:
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    async def delete(self, key: str) -> int:
+        return 1 if self.data.pop(key, None) is not None else 0
+
+
+async def _scenario(c: CounterBackend) -> list:
+    out = [await c.hit("rate:1:1", window=10) for _ in range(3)]
+    await c.reset("rate:1:1")
+    out.append(await c.hit("rate:1:1", window=10))
+    out += [await c.bump_overage("overage:rate:1:1", window=1800, threshold=3) for _ in range(4)]
+    out += [await c.hit_window("everyone:1:1", window=120, threshold=3) for _ in range(4)]
+    return out
+
+
+async def _check():
+    expected = [1, 2, 3, 1, False, False, True, False, False, False, True, False]
+    assert await _scenario(MemoryCounterBackend()) == expected
+    client = FakeRedis()
+    assert await _scenario(RedisCounterBackend(client=client)) == expected
+    # 재시작(또는 다른 프로세스)한 백엔드가 같은 서버의 누적을 이어받음
+    first = RedisCounterBackend(client=client)
+    await first.bump_overage("overage:link:1:2", window=1800, threshold=3)
+    await first.bump_overage("overage:link:1:2", window=1800, threshold=3)
+    assert await RedisCounterBackend(client=client).bump_overage("overage:link:1:2", window=1800, threshold=3)
+
+
+async def _bench(c: CounterBackend) -> float:
+    t0 = time.perf_counter()
+    for i in range(HITS):
+        await c.hit(f"rate:1:{i % 500}", window=10)
+    return (time.perf_counter() - t0) / HITS * 1e9
+
+
+async def _main():
+    await _check()
+    print(f"{'backend':>8} | {'hit ns/op':>9}")
+    for c in (MemoryCounterBackend(), RedisCounterBackend(client=FakeRedis())):
+        print(f"{c.name:>8} | {await _bench(c):>9.0f}")
+
+
+def main():
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
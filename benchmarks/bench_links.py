@@ -0,0 +1,98 @@
+# benchmarks/bench_links.py
+"""
+링크 추출 벤치마크: 실제 채팅과 비슷한 말뭉치(대부분 링크 없음)에서 메시지 1건당 비용 비교.
+- regex: 기존 방식 (모든 메시지에 LINK_RE.findall)
+- staged: "://" 사전 검사 → 단일 패스 추출 + 호스트 정규화 (기본 경로, 추출 대상은 regex와 같음)
+- shortlinks: 스킴 없는 단축/초대 링크까지 (link_filter_schemeless를 켠 길드)
+시간 측정 전에 두 경로의 추출 결과를 고정 예시로 검사함.
+실행: python -m benchmarks.bench_links
+"""
+from __future__ import annotations
+
+import random
+import re
+import time
+
+from utils.links import extract_urls
+
+LINK_RE = re.compile(r"https?://[^\s]+", re.IGNORECASE)  # 이전 구현
+MESSAGES = 50_000
+
+PLAIN = [
+    "ㅋㅋㅋㅋ 진짜?",
+    "오늘 저녁 뭐 먹지",
+    "gg wp",
+    "lol that was close",
+    "나 이따 9시에 들어옴",
+    "anyone up for ranked?",
+    "ㄹㅇ 개웃기네",
+    "brb 5 min",
+    "그거 패치 언제 나옴? 다음 주라던데...",
+    "I think the boss has like 3 phases, the last one is brutal",
+    "ok",
+    "ㅇㅇ",
+    "우리 길드 공지 확인 좀 해줘요. 이번 주말 레이드는 토요일 8시입니다.",
+    "hmm idk, maybe try restarting the client? worked for me last time",
+]
+LINKY = [
+    "이거 봐 https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "docs: https://discordpy.readthedocs.io/en/stable/api.html#discord.Message",
+    "join us discord.gg/abcdef",
+    "<https://github.com/Rapptz/discord.py/issues/1234>",
+    "free nitro!!! https://discord-airdrop.xyz/claim?id=1234",
+    "check www.example.com.",
+]
+
+
+def _corpus(rng: random.Random, n: int, link_ratio: float) -> list[str]:
+    out = []
+    for _ in range(n):
+        if rng.random() < link_ratio:
+            out.append(rng.choice(LINKY))
+        else:
+            # 긴 잡담도 섞어 본문 길이에 비례하는 비용이 드러나게
+            out.append(" ".join(rng.choices(PLAIN, k=rng.randint(1, 4))))
+    return out
+
+
+# (본문, 기본 경로 결과, shortlinks=True 결과)
+CASES = [
+    ("gg wp everyone", [], []),
+    ("and/or 3/4 ㅋㅋ", [], []),
+    ("이거 봐 https://www.youtube.com/watch?v=x", ["https://www.youtube.com/watch?v=x"], ["https://www.youtube.com/watch?v=x"]),
+    ("<HTTPS://Discord.COM@Evil.RU/Login>.", ["https://evil.ru/login"], ["https://evil.ru/login"]),
+    ("join us discord.gg/abcdef", [], ["http://discord.gg/abcdef"]),
+    ("check WWW.Example.com.", [], ["http://www.example.com"]),
+    ("Www.example.com/a and wWw.example.com/a", [], ["http://www.example.com/a"]),
+    ("mywww.site is not a link", [], []),
+    ("https://a.io https://a.io", ["https://a.io"], ["https://a.io"]),
+]
+
+
+def _check():
+    for content, plain, short in CASES:
+        got = (extract_urls(content), extract_urls(content, shortlinks=True))
+        assert got == (plain, short), (content, got)
+
+
+def _bench(fn, corpus: list[str]) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    found = sum(len(fn(c)) for c in corpus)
+    return (time.perf_counter() - t0) / len(corpus) * 1e9, found
+
+
+def main():
+    _check()
+    rng = random.Random(7)
+    short = lambda c: extract_urls(c, shortlinks=True)  # noqa: E731
+    print(f"{'link %':>6} | {'regex ns/msg':>12} | {'staged ns/msg':>13} | {'shortlinks ns/msg':>17} | links (regex/staged/shortlinks)")
+    for ratio in (0.0, 0.02, 0.1, 0.5, 1.0):
+        corpus = _corpus(rng, MESSAGES, ratio)
+        old, old_found = _bench(LINK_RE.findall, corpus)
+        new, new_found = _bench(extract_urls, corpus)
+        sl, sl_found = _bench(short, corpus)
+        print(f"{ratio * 100:>5.0f}% | {old:>12.0f} | {new:>13.0f} | {sl:>17.0f} | {old_found}/{new_found}/{sl_found}")
+
+
+if __name__ == "__main__":
+    main()
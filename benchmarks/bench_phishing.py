@@ -0,0 +1,66 @@
+# benchmarks/bench_phishing.py
+"""
+피싱 매처 마이크로벤치마크: 차단 목록 크기가 커져도 URL 1건 판정 비용이 일정한지 확인.
+실행: python -m benchmarks.bench_phishing
+"""
+from __future__ import annotations
+
+import random
+import string
+import time
+
+from utils.phishing import PhishingMatcher
+
+SIZES = (100, 1_000, 10_000, 100_000)
+LOOKUPS = 20_000
+TLDS = ("com", "net", "org", "ru", "xyz", "gg", "io")
+
+
+def _rand_domain(rng: random.Random) -> str:
+    name = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 14)))
+    return f"{name}.{rng.choice(TLDS)}"
+
+
+def _urls(rng: random.Random, blocked: list[str], n: int) -> list[tuple[str, str]]:
+    out = []
+    for i in range(n):
+        # 10%는 차단 도메인의 하위 도메인, 나머지는 무관한 도메인
+        host = f"cdn.{rng.choice(blocked)}" if i % 10 == 0 else _rand_domain(rng)
+        path = "/".join("".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(rng.randint(0, 4)))
+        out.append((f"https://{host}/{path}", host))
+    return out
+
+
+def _naive(url: str, host: str, blocked: list[str], keywords: list[str]) -> bool:
+    # 비교용: 기존 방식처럼 목록 전체를 훑는 substring 검사
+    return any(host == d or host.endswith("." + d) for d in blocked) or any(k in host for k in keywords)
+
+
+def main():
+    rng = random.Random(42)
+    keywords = ["discordgift", "discord-airdrop", "nitrodrop", "grabfree", "free-nitro", "steamcommunity-gift"]
+    print(f"{'domains':>8} | {'build ms':>9} | {'matcher us/url':>14} | {'naive us/url':>12}")
+    for size in SIZES:
+        blocked = [_rand_domain(rng) for _ in range(size)]
+        urls = _urls(rng, blocked, LOOKUPS)
+
+        t0 = time.perf_counter()
+        m = PhishingMatcher(blocked=blocked, allowed=["discord.gift"], keywords=keywords)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        hits = sum(1 for u, h in urls if m.check(u, h))
+        per = (time.perf_counter() - t0) / len(urls) * 1e6
+
+        # 큰 목록에서 단순 스캔은 너무 느리므로 일부만 측정
+        sample = urls[: max(50, LOOKUPS * 100 // size)]
+        t0 = time.perf_counter()
+        naive_hits = sum(1 for u, h in sample if _naive(u, h, blocked, keywords))
+        naive_per = (time.perf_counter() - t0) / len(sample) * 1e6
+
+        assert hits >= LOOKUPS // 10 and naive_hits >= len(sample) // 10
+        print(f"{size:>8} | {build_ms:>9.1f} | {per:>14.2f} | {naive_per:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
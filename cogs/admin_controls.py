@@ -1,34 +1,19 @@
 # cogs/admin_controls.py
-import datetime
-import time
+from typing import Literal
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
 from utils.db import (
-    get_panic_state, set_panic_state,
+    get_panic_state, set_panic_state, set_panic_job, set_panic_fast_roles,
     get_lockdown_config, set_lockdown_config,
 )
-from utils.i18n import t as _t
-
-# ===== 정책 캐시 (TTL=10초) =====
-CACHE_TTL = 10
-_lockdown_cache: dict[int, tuple[float, dict]] = {}  # guild_id -> (expires_ts, conf)
-
-def get_lockdown_conf_cached(guild_id: int) -> dict:
-    now = time.time()
-    hit = _lockdown_cache.get(guild_id)
-    if hit and hit[0] > now:
-        return hit[1]
-    conf = get_lockdown_config(guild_id)
-    _lockdown_cache[guild_id] = (now + CACHE_TTL, conf)
-    return conf
-
-def invalidate_lockdown_conf(guild_id: int | None = None):
-    if guild_id is None:
-        _lockdown_cache.clear()
-    else:
-        _lockdown_cache.pop(guild_id, None)
+from utils.guild_config import guild_configs
+from utils.i18n import t as _t, translator
+from utils.dm_outbox import dm_outbox
+from utils.panic_jobs import panic_jobs
+from utils.pipeline import MessageContext, pipeline
 
 def _default_role(guild: discord.Guild) -> discord.Role:
     return guild.default_role  # @everyone
@@ -39,17 +24,68 @@ class AdminControls(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    # ===== 외부에서 캐시 무효화 이벤트 받기 =====
-    @commands.Cog.listener()
-    async def on_lockdown_config_updated(self, guild_id: int):
-        invalidate_lockdown_conf(guild_id)
+    # 락다운 차단은 스팸 규칙보다 먼저 (편집 메시지는 대상 아님)
+    async def cog_load(self):
+        pipeline.register("lockdown", self._check_lockdown, order=10, on_edit=False)
+
+    async def cog_unload(self):
+        pipeline.unregister("lockdown")
+        await panic_jobs.close()
 
     # ========= Panic =========
+    # 채널 권한 변경은 백그라운드 작업(utils.panic_jobs)으로: 진행 상황은 원래 응답을 고쳐 알림
+    def _progress_to(self, itx: discord.Interaction):
+        tr = translator(itx.guild_id)
+
+        async def on_progress(kind: str, done: int, total: int):
+            await itx.edit_original_response(content=tr("panic_progress", kind=kind, done=done, total=total))
+        return on_progress
+
+    def _done_to(self, itx: discord.Interaction):
+        tr = translator(itx.guild_id)
+
+        async def on_done(kind: str, failed: int):
+            self.bot.dispatch("panic_config_updated", itx.guild_id)
+            if kind == "unpanic" and failed:
+                # 아직 panic 상태 (남은 기록으로 재시도)
+                await itx.followup.send(tr("panic_partial_warn"), ephemeral=True)
+                return
+            await itx.followup.send(tr("panic_on" if kind == "panic" else "panic_off"), ephemeral=True)
+            if failed:
+                await itx.followup.send(tr("panic_partial_warn"), ephemeral=True)
+        return on_done
+
+    def _resumed_done(self, guild: discord.Guild):
+        async def on_done(kind: str, failed: int):
+            self.bot.dispatch("panic_config_updated", guild.id)
+            tr = translator(guild.id)
+            emb = discord.Embed(
+                title=tr("panic_resumed_title"),
+                description=tr("panic_resumed_body", kind=kind, failed=failed),
+                color=0xF9A825,
+            )
+            if failed:
+                emb.description += "\n" + tr("panic_partial_warn")
+            await self.bot.logs.send(guild, emb)
+        return on_done
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # 재시작 전에 끝나지 못한 panic/unpanic 이어서 실행 (길드 캐시가 준비된 뒤)
+        try:
+            await panic_jobs.resume_all(self.bot, on_done_for=self._resumed_done)
+        except Exception as e:
+            print(f"❌ 패닉 작업 재개 오류: {e}")
+
     @app_commands.command(name="panic", description="Make all text channels read-only / 모든 텍스트 채널 읽기 전용")
+    @app_commands.describe(mode="channels: 채널별 권한 덮어쓰기 / fast: @everyone·지정 역할의 메시지 전송 권한만 끔(/panicroles)")
     @app_commands.checks.has_permissions(administrator=True)
-    async def panic(self, itx: discord.Interaction):
+    async def panic(self, itx: discord.Interaction, mode: Literal["channels", "fast"] = "channels"):
         guild = itx.guild
-        state = get_panic_state(guild.id)
+        if panic_jobs.running(guild.id):
+            await itx.response.send_message(_t(guild.id, "panic_job_running"), ephemeral=True)
+            return
+        state = await get_panic_state(guild.id)
         if state["enabled"]:
             await itx.response.send_message(_t(guild.id, "panic_already_on"), ephemeral=True)
             return
@@ -57,69 +93,63 @@ class AdminControls(commands.Cog):
         # 타임아웃 방지
         await itx.response.defer(ephemeral=True, thinking=True)
 
-        backup: dict[str, dict] = {}
-        everyone = guild.default_role
-        ok_all = True
-
-        text_channels = [c for c in guild.channels if isinstance(c, discord.TextChannel)]
-        for ch in text_channels:
-            try:
-                ow = ch.overwrites_for(everyone)
-                backup[str(ch.id)] = {"send_messages": ow.send_messages}
-                ow.send_messages = False
-                await ch.set_permissions(everyone, overwrite=ow, reason="Panic ON")
-            except Exception:
-                ok_all = False
-
-        set_panic_state(guild.id, True, backup)
-
-        await itx.followup.send(_t(guild.id, "panic_on"))
-        if not ok_all:
-            await itx.followup.send(_t(guild.id, "panic_partial_warn"))
+        # 켜짐 표시 + 작업 기록을 먼저 (채널별 원래 권한은 작업이 처리하면서 쌓아 감)
+        await set_panic_state(guild.id, True, {}, job={"kind": "panic"}, mode=mode)
+        self.bot.dispatch("panic_config_updated", guild.id)
+        panic_jobs.start(guild, "panic", on_progress=self._progress_to(itx), on_done=self._done_to(itx))
 
     @app_commands.command(name="unpanic", description="Restore permissions after panic / 패닉 해제 및 권한 원복")
     @app_commands.checks.has_permissions(administrator=True)
     async def unpanic(self, itx: discord.Interaction):
         guild = itx.guild
-        state = get_panic_state(guild.id)
+        if panic_jobs.running(guild.id) == "unpanic":
+            await itx.response.send_message(_t(guild.id, "panic_job_running"), ephemeral=True)
+            return
+        state = await get_panic_state(guild.id)
         if not state["enabled"]:
             await itx.response.send_message(_t(guild.id, "panic_already_off"), ephemeral=True)
             return
 
         await itx.response.defer(ephemeral=True, thinking=True)
 
-        backup = state.get("backup") or {}
-        everyone = guild.default_role
-        ok_all = True
-
-        for ch_id, data in backup.items():
-            ch = guild.get_channel(int(ch_id))
-            if not isinstance(ch, discord.TextChannel):
-                continue
-            try:
-                ow = ch.overwrites_for(everyone)
-                ow.send_messages = data.get("send_messages", None)
-                await ch.set_permissions(everyone, overwrite=ow, reason="Panic OFF")
-            except Exception:
-                ok_all = False
-
-        set_panic_state(guild.id, False, None)
-        await itx.followup.send(_t(guild.id, "panic_off"))
-        if not ok_all:
-            await itx.followup.send(_t(guild.id, "panic_partial_warn"))
+        # 진행 중인 panic은 멈추고 원복 (이미 기록된 원래 권한 기준)
+        await panic_jobs.cancel(guild.id)
+        await set_panic_job(guild.id, {"kind": "unpanic"})
+        panic_jobs.start(guild, "unpanic", on_progress=self._progress_to(itx), on_done=self._done_to(itx))
+
+    @app_commands.command(name="panicroles", description="Roles muted by fast panic / 빠른 패닉 대상 역할 관리")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def panicroles(self, itx: discord.Interaction, action: Literal["add", "remove", "list"], role: discord.Role | None = None):
+        tr = translator(itx.guild_id)
+        roles = set(int(x) for x in (await get_panic_state(itx.guild_id)).get("fast_roles") or [])
+        if action == "add" and role:
+            roles.add(role.id)
+            await set_panic_fast_roles(itx.guild_id, sorted(roles))
+            self.bot.dispatch("panic_config_updated", itx.guild_id)
+            msg = tr("panicroles_added", role=role.mention)
+        elif action == "remove" and role:
+            roles.discard(role.id)
+            await set_panic_fast_roles(itx.guild_id, sorted(roles))
+            self.bot.dispatch("panic_config_updated", itx.guild_id)
+            msg = tr("panicroles_removed", role=role.mention)
+        elif action == "list":
+            msg = tr("panicroles_list", roles=", ".join(f"<@&{rid}>" for rid in sorted(roles)) if roles else tr("none"))
+        else:
+            msg = tr("panicroles_hint")
+        await itx.response.send_message(msg, ephemeral=True)
 
     # ========= Lockdown =========
     @app_commands.command(name="lockdown", description="Toggle lockdown / 락다운 토글")
     @app_commands.describe(enabled="true/false")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def lockdown(self, itx: discord.Interaction, enabled: bool):
-        conf = get_lockdown_conf_cached(itx.guild_id)
+        conf = (await guild_configs.get(itx.guild_id)).lockdown
         if conf["enabled"] == enabled:
             key = "lockdown_already_on" if enabled else "lockdown_already_off"
             await itx.response.send_message(_t(itx.guild_id, key), ephemeral=True)
             return
 
-        set_lockdown_config(itx.guild_id, enabled=enabled)
+        await set_lockdown_config(itx.guild_id, enabled=enabled)
         # 정책 변경 즉시 반영: 캐시 무효화 이벤트 발행
         self.bot.dispatch("lockdown_config_updated", itx.guild_id)
 
@@ -140,7 +170,7 @@ class AdminControls(commands.Cog):
         min_account_age_hours: app_commands.Range[int, 0, 720] | None = None,
         min_guild_age_hours: app_commands.Range[int, 0, 720] | None = None,
     ):
-        set_lockdown_config(
+        await set_lockdown_config(
             itx.guild_id,
             min_account_age_hours=min_account_age_hours,
             min_guild_age_hours=min_guild_age_hours,
@@ -149,47 +179,40 @@ class AdminControls(commands.Cog):
         self.bot.dispatch("lockdown_config_updated", itx.guild_id)
 
         # 최신 값 조회 후, 다국어 임베드로 응답 (현재값 + 최대 10초 지연 안내)
-        l = get_lockdown_config(itx.guild_id)
+        l = await get_lockdown_config(itx.guild_id)
+        tr = translator(itx.guild_id)
         desc = (
-            f"{_t(itx.guild_id, 'lockdownset_ok')}\n"
-            f"{_t(itx.guild_id, 'lockdown_enabled', state=_t(itx.guild_id, 'bool_on') if l['enabled'] else _t(itx.guild_id, 'bool_off'))}\n"
-            f"{_t(itx.guild_id, 'lockdown_min_age', hours=l['min_account_age_hours'])}\n"
-            f"{_t(itx.guild_id, 'lockdown_min_guild_age', hours=l['min_guild_age_hours'])}\n\n"
-            f"{_t(itx.guild_id, 'policy_update_delay')}"
+            f"{tr('lockdownset_ok')}\n"
+            f"{tr('lockdown_enabled', state=tr('bool_on') if l['enabled'] else tr('bool_off'))}\n"
+            f"{tr('lockdown_min_age', hours=l['min_account_age_hours'])}\n"
+            f"{tr('lockdown_min_guild_age', hours=l['min_guild_age_hours'])}\n\n"
+            f"{tr('policy_update_delay')}"
         )
-        emb = discord.Embed(title=_t(itx.guild_id, "lockdown_title"), description=desc, color=0x455A64)
+        emb = discord.Embed(title=tr("lockdown_title"), description=desc, color=0x455A64)
         await itx.response.send_message(embed=emb, ephemeral=True)
 
     # ========= Enforcement (soft) =========
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if not message.guild or message.author.bot:
-            return
-
-        conf = get_lockdown_conf_cached(message.guild.id)
+    async def _check_lockdown(self, ctx: MessageContext) -> bool:
+        conf = ctx.config.lockdown
         if not conf["enabled"]:
-            return
+            return False
 
         # 관리자급(메시지 관리 권한)과 봇은 면제
-        perms = message.channel.permissions_for(message.author)
+        perms = ctx.permissions
         if perms.manage_messages or perms.administrator:
-            return
+            return False
 
         # 임계값 계산
         now = discord.utils.utcnow()
-        acct_age_h = (now - message.author.created_at).total_seconds() / 3600
-        joined_at = getattr(message.author, "joined_at", None)
+        acct_age_h = (now - ctx.author.created_at).total_seconds() / 3600
+        joined_at = getattr(ctx.author, "joined_at", None)
         guild_age_h = (now - joined_at).total_seconds() / 3600 if joined_at else 0
 
         if acct_age_h < conf["min_account_age_hours"] or guild_age_h < conf["min_guild_age_hours"]:
-            try:
-                await message.delete()
-            except Exception:
-                pass
-            try:
-                await message.author.send(_t(message.guild.id, "msg_blocked_lockdown"))
-            except Exception:
-                pass
+            ctx.delete()
+            dm_outbox.notify(ctx.author, _t(ctx.guild.id, "msg_blocked_lockdown"))
+            return True
+        return False
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(AdminControls(bot))
@@ -1,7 +1,6 @@
 # cogs/backup.py
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime, timezone
 from typing import Dict, List
 
@@ -11,6 +10,10 @@ from discord.ext import commands
 
 from utils.db import save_backup, list_backups, get_backup, delete_backup
 from utils.i18n import t as _t
+from utils.restore_executor import (
+    RestoreExecutor, channel_bucket, RESTORE_CONCURRENCY,
+    BUCKET_ROLE_CREATE, BUCKET_ROLE_EDIT, BUCKET_CHANNEL_CREATE, BUCKET_POSITIONS,
+)
 
 # =========================
 # Helper: permissions / overwrites / serialize
@@ -38,16 +41,17 @@ def _serialize_overwrites(ow_map: Dict) -> List[dict]:
         })
     return out
 
-def _make_overwrites(guild: discord.Guild, items: List[dict]) -> Dict:
+def _make_overwrites(guild: discord.Guild, items: List[dict], role_map: Dict | None = None) -> Dict:
     """
     [{target_id, target_type, allow, deny}] -> Overwrites dict
+    role_map(old_id -> 역할)이 있으면 복구 중 새로 만든 역할도 찾음
     존재하지 않는 타겟은 건너뜀(복구 비파괴)
     """
     result = {}
     for item in items:
         target = None
         if item["target_type"] == "role":
-            target = guild.get_role(int(item["target_id"]))
+            target = (role_map or {}).get(int(item["target_id"])) or guild.get_role(int(item["target_id"]))
         else:
             target = guild.get_member(int(item["target_id"]))
         if not target:
@@ -187,18 +191,254 @@ def _diff_voice_fields(ch: discord.VoiceChannel, snap: dict, parent: discord.Cat
     return fields
 
 # =========================
-# Throttler (서버/레이트리밋 보호)
+# Restore planner (스냅샷 + 현재 길드 → 실행 순서가 정해진 작업 목록)
 # =========================
-THROTTLE_CONCURRENCY = 1
-WRITE_DELAY = 0.7
-_sem = asyncio.Semaphore(THROTTLE_CONCURRENCY)
+# 단계는 순서대로, 단계 안의 작업은 RestoreExecutor가 버킷별로 병렬 실행
+PHASES = ("roles", "role_positions", "categories", "channels", "positions")
+
+# 예상 소요 시간 계산용 대략치 (실제 값은 디스코드 레이트리밋에 따라 다름)
+EST_CALL_SEC = 0.3               # API 호출 1회 왕복
+EST_BUCKET_INTERVAL_SEC = {      # 길드 단위 버킷의 호출 간 최소 간격
+    BUCKET_ROLE_CREATE: 1.0,
+    BUCKET_ROLE_EDIT: 0.5,
+    BUCKET_CHANNEL_CREATE: 1.0,
+    BUCKET_POSITIONS: 1.0,
+}
+
+_PENDING = object()  # 아직 만들어지지 않은 부모 카테고리 (실행 시 cat_map에서 찾음)
+
+
+class RestoreState:
+    """실행 중 채워지는 old_id → 실제 객체 매핑"""
+
+    def __init__(self, guild: discord.Guild):
+        self.guild = guild
+        self.role_map: Dict[int, discord.Role] = {}
+        self.cat_map: Dict[int, discord.CategoryChannel] = {}
+
+    def overwrites(self, items: List[dict]) -> Dict:
+        return _make_overwrites(self.guild, items, self.role_map)
+
+    def parent(self, snap: dict) -> discord.CategoryChannel | None:
+        return self.cat_map.get(int(snap["parent_id"])) if snap["parent_id"] else None
+
+
+class RestoreOp:
+    """API 호출 1회 = 작업 1개"""
+
+    __slots__ = ("phase", "kind", "bucket", "label", "run")
+
+    def __init__(self, phase: str, kind: str, bucket, label: str, run):
+        self.phase = phase
+        self.kind = kind
+        self.bucket = bucket
+        self.label = label
+        self.run = run  # async (state) -> None, 호출은 run 안에서 ex.call로
+
+
+class RestorePlan:
+    def __init__(self, ops: List[RestoreOp]):
+        order = {p: i for i, p in enumerate(PHASES)}
+        self.ops = sorted(ops, key=lambda op: order[op.phase])  # 같은 단계 안에서는 넣은 순서 유지
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def counts(self) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for op in self.ops:
+            out[op.kind] = out.get(op.kind, 0) + 1
+        return out
+
+    def estimate_seconds(self, concurrency: int = RESTORE_CONCURRENCY) -> float:
+        """단계별로 (가장 바쁜 버킷의 직렬 시간, 동시 실행 한도로 나눈 전체 시간) 중 큰 값을 합산"""
+        total = 0.0
+        for phase in PHASES:
+            ops = [op for op in self.ops if op.phase == phase]
+            if not ops:
+                continue
+            per_bucket: Dict = {}
+            for op in ops:
+                per_bucket[op.bucket] = per_bucket.get(op.bucket, 0) + 1
+            serial = max(
+                n * max(EST_CALL_SEC, EST_BUCKET_INTERVAL_SEC.get(b, 0.0)) for b, n in per_bucket.items()
+            )
+            parallel = -(-len(ops) // concurrency) * EST_CALL_SEC
+            total += max(serial, parallel)
+        return total
+
+    async def execute(self, state: RestoreState, ex: RestoreExecutor) -> int:
+        """실패한 작업 수"""
+        failed = 0
+        for phase in PHASES:
+            ops = [op for op in self.ops if op.phase == phase]
+            if phase == "positions":
+                # 위치 변경은 길드 전체 정렬이라 병렬로 하면 서로 덮어씀 → 직렬
+                for op in ops:
+                    failed += await ex.run([op.run(state, ex)])
+            elif ops:
+                failed += await ex.run(op.run(state, ex) for op in ops)
+        return failed
+
+
+def _role_ops(g: discord.Guild, snapshot_roles: List[dict], state: RestoreState) -> List[RestoreOp]:
+    ops: List[RestoreOp] = []
+    existing_by_id = {r.id: r for r in g.roles}
+    needs_positions = False
+
+    for r in snapshot_roles:
+        old_id = int(r["id"])
+        if r["is_everyone"]:
+            # @everyone 권한만 비교/동기화
+            everyone = g.default_role
+            state.role_map[old_id] = everyone
+            if everyone.permissions.value != int(r["permissions"]):
+                async def run(st, ex, r=r, everyone=everyone):
+                    await ex.call(BUCKET_ROLE_EDIT, lambda: everyone.edit(
+                        permissions=discord.Permissions(int(r["permissions"])),
+                        reason="Restore snapshot (@everyone perms)",
+                    ))
+                ops.append(RestoreOp("roles", "role_edit", BUCKET_ROLE_EDIT, "@everyone", run))
+            continue
 
-async def throttled(coro):
-    async with _sem:
-        try:
-            return await coro
-        finally:
-            await asyncio.sleep(WRITE_DELAY)
+        exist = existing_by_id.get(old_id)
+        if exist:
+            state.role_map[old_id] = exist
+            fields = _diff_role_fields(exist, r)
+            if fields:
+                async def run(st, ex, exist=exist, fields=fields):
+                    await ex.call(BUCKET_ROLE_EDIT, lambda: exist.edit(**fields, reason="Restore snapshot (update role)"))
+                ops.append(RestoreOp("roles", "role_edit", BUCKET_ROLE_EDIT, r["name"], run))
+            if exist.position != int(r["position"]):
+                needs_positions = True
+        else:
+            async def run(st, ex, r=r, old_id=old_id):
+                st.role_map[old_id] = await ex.call(BUCKET_ROLE_CREATE, lambda: g.create_role(
+                    name=r["name"],
+                    colour=discord.Colour(int(r["color"])),
+                    hoist=bool(r["hoist"]),
+                    mentionable=bool(r["mentionable"]),
+                    permissions=discord.Permissions(int(r["permissions"])),
+                    reason="Restore snapshot (create role)",
+                ))
+            ops.append(RestoreOp("roles", "role_create", BUCKET_ROLE_CREATE, r["name"], run))
+            needs_positions = True
+
+    if needs_positions:
+        # 새 역할의 실제 위치는 만든 뒤에야 알 수 있으므로 목록은 실행 시점에 계산 (호출은 1회)
+        async def run(st, ex):
+            desired = []
+            for r in sorted(snapshot_roles, key=lambda x: x["position"]):
+                role = st.role_map.get(int(r["id"]))
+                if role and not role.is_default() and role.position != int(r["position"]):
+                    desired.append({"role": role, "position": int(r["position"])})
+            if desired:
+                await ex.call(BUCKET_POSITIONS, lambda: g.edit_role_positions(positions=desired))
+        ops.append(RestoreOp("role_positions", "role_positions", BUCKET_POSITIONS, "roles", run))
+    return ops
+
+
+def _channel_edit_ops(kind: str, ch, snap: dict, fields: dict) -> List[RestoreOp]:
+    """기존 채널 수정: position은 별도 이동 작업으로, 권한/부모는 실행 시점 매핑으로 다시 계산"""
+    ops: List[RestoreOp] = []
+    pos = fields.pop("position", None)
+    if fields:
+        reason = f"Restore snapshot (update {kind})"
+
+        async def run(st, ex):
+            f = dict(fields)
+            if "overwrites" in f:
+                f["overwrites"] = st.overwrites(snap["overwrites"])
+            if "category" in f:
+                f["category"] = st.parent(snap)
+            await ex.call(channel_bucket(ch.id), lambda: ch.edit(**f, reason=reason))
+        phase = "categories" if kind == "category" else "channels"
+        ops.append(RestoreOp(phase, f"{kind}_edit", channel_bucket(ch.id), snap["name"], run))
+    if pos is not None:
+        async def run_move(st, ex):
+            await ex.call(BUCKET_POSITIONS, lambda: ch.edit(position=pos))
+        ops.append(RestoreOp("positions", "move", BUCKET_POSITIONS, snap["name"], run_move))
+    return ops
+
+
+def plan_restore(g: discord.Guild, data: dict) -> tuple[RestorePlan, RestoreState]:
+    """현재 길드를 건드리지 않고 필요한 API 호출만 작업 목록으로 (새 채널은 생성 1회에 모든 필드 포함)"""
+    state = RestoreState(g)
+    ops = _role_ops(g, data["roles"], state)
+    snap = data["channels"]
+
+    # 권한 비교용 (새로 만들 역할은 아직 없으므로 빠짐 → 해당 채널은 수정 대상이 됨)
+    def plan_ows(items: List[dict]) -> Dict:
+        return _make_overwrites(g, items, state.role_map)
+
+    existing_cats_by_id = {c.id: c for c in g.categories}
+    for c in snap["categories"]:
+        old_id = int(c["id"])
+        exist = existing_cats_by_id.get(old_id)
+        if exist:
+            state.cat_map[old_id] = exist
+            ops += _channel_edit_ops("category", exist, c, _diff_category_fields(exist, c, plan_ows(c["overwrites"])))
+        else:
+            async def run(st, ex, c=c, old_id=old_id):
+                st.cat_map[old_id] = await ex.call(BUCKET_CHANNEL_CREATE, lambda: g.create_category(
+                    name=c["name"],
+                    overwrites=st.overwrites(c["overwrites"]),
+                    position=int(c["position"]),
+                    reason="Restore snapshot (create category)",
+                ))
+            ops.append(RestoreOp("categories", "category_create", BUCKET_CHANNEL_CREATE, c["name"], run))
+
+    def plan_parent(s: dict):
+        if not s["parent_id"]:
+            return None
+        return existing_cats_by_id.get(int(s["parent_id"]), _PENDING)
+
+    existing_text_by_id = {ch.id: ch for ch in g.text_channels}
+    for t in snap["texts"]:
+        exist = existing_text_by_id.get(int(t["id"]))
+        parent = plan_parent(t)
+        if exist:
+            fields = _diff_text_fields(exist, t, None if parent is _PENDING else parent, plan_ows(t["overwrites"]))
+            if parent is _PENDING:
+                fields["category"] = parent
+            ops += _channel_edit_ops("text", exist, t, fields)
+        else:
+            async def run(st, ex, t=t):
+                await ex.call(BUCKET_CHANNEL_CREATE, lambda: g.create_text_channel(
+                    name=t["name"],
+                    overwrites=st.overwrites(t["overwrites"]),
+                    category=st.parent(t),
+                    topic=t["topic"],
+                    nsfw=bool(t["nsfw"]),
+                    slowmode_delay=int(t["slowmode_delay"] or 0),
+                    position=int(t["position"]),
+                    reason="Restore snapshot (create text)",
+                ))
+            ops.append(RestoreOp("channels", "text_create", BUCKET_CHANNEL_CREATE, t["name"], run))
+
+    existing_voice_by_id = {ch.id: ch for ch in g.voice_channels}
+    for v in snap["voices"]:
+        exist = existing_voice_by_id.get(int(v["id"]))
+        parent = plan_parent(v)
+        if exist:
+            fields = _diff_voice_fields(exist, v, None if parent is _PENDING else parent, plan_ows(v["overwrites"]))
+            if parent is _PENDING:
+                fields["category"] = parent
+            ops += _channel_edit_ops("voice", exist, v, fields)
+        else:
+            async def run(st, ex, v=v):
+                await ex.call(BUCKET_CHANNEL_CREATE, lambda: g.create_voice_channel(
+                    name=v["name"],
+                    overwrites=st.overwrites(v["overwrites"]),
+                    category=st.parent(v),
+                    bitrate=int(v["bitrate"] or 64000),
+                    user_limit=int(v["user_limit"] or 0),
+                    position=int(v["position"]),
+                    reason="Restore snapshot (create voice)",
+                ))
+            ops.append(RestoreOp("channels", "voice_create", BUCKET_CHANNEL_CREATE, v["name"], run))
+
+    return RestorePlan(ops), state
 
 # =========================
 # Cog
@@ -223,7 +463,7 @@ class BackupCog(commands.Cog):
             "channels": _serialize_channels(g),
             "created_at": datetime.now(timezone.utc).isoformat(),
         }
-        bid = save_backup(g.id, label, payload)
+        bid = await save_backup(g.id, label, payload)
         await itx.followup.send(_t(g.id, "backup_done", id=bid))
 
     # ---------- List ----------
@@ -231,7 +471,7 @@ class BackupCog(commands.Cog):
     @app_commands.describe(limit="표시 개수 (1~25)")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def backup_list(self, itx: discord.Interaction, limit: app_commands.Range[int, 1, 25] = 10):
-        rows = list_backups(itx.guild_id, limit=limit)
+        rows = await list_backups(itx.guild_id, limit=limit)
         if not rows:
             await itx.response.send_message(_t(itx.guild_id, "backup_list_empty"), ephemeral=True)
             return
@@ -239,6 +479,8 @@ class BackupCog(commands.Cog):
         for r in rows:
             created = r["created_at"].strftime("%Y-%m-%d %H:%M")
             lbl = r["label"] or "-"
+            if r["base_id"]:
+                lbl += f" (Δ #{r['base_id']})"  # 증분 백업: 베이스 id
             lines.append(_t(itx.guild_id, "backup_item", id=r["id"], created=created, label=lbl))
         await itx.response.send_message("\n".join(lines), ephemeral=True)
 
@@ -246,7 +488,7 @@ class BackupCog(commands.Cog):
     @app_commands.command(name="backup_delete", description="Delete backup / 백업 삭제")
     @app_commands.checks.has_permissions(administrator=True)
     async def backup_delete(self, itx: discord.Interaction, backup_id: int):
-        ok = delete_backup(itx.guild_id, backup_id)
+        ok = await delete_backup(itx.guild_id, backup_id)
         if not ok:
             await itx.response.send_message(_t(itx.guild_id, "backup_not_found", id=backup_id), ephemeral=True)
             return
@@ -254,145 +496,31 @@ class BackupCog(commands.Cog):
 
     # ---------- Restore ----------
     @app_commands.command(name="backup_restore", description="Restore backup (non-destructive) / 백업 복구(비파괴)")
+    @app_commands.describe(dry_run="true면 실제로 바꾸지 않고 필요한 작업 수/예상 시간만 표시")
     @app_commands.checks.has_permissions(administrator=True)
-    async def backup_restore(self, itx: discord.Interaction, backup_id: int):
+    async def backup_restore(self, itx: discord.Interaction, backup_id: int, dry_run: bool = False):
         await itx.response.defer(ephemeral=True, thinking=True)
 
         g = itx.guild
-        data = get_backup(g.id, backup_id)
+        data = await get_backup(g.id, backup_id)
         if not data:
             await itx.followup.send(_t(g.id, "backup_not_found", id=backup_id))
             return
 
-        failed_any = False
-
-        # ===== 1) Roles =====
-        try:
-            snapshot_roles = data["roles"]
-            role_map: Dict[int, discord.Role] = {}  # old_id -> role_obj
-
-            existing_by_id = {r.id: r for r in g.roles}
-            for r in snapshot_roles:
-                if r["is_everyone"]:
-                    # @everyone 권한만 비교/동기화
-                    everyone = g.default_role
-                    if everyone.permissions.value != int(r["permissions"]):
-                        await throttled(everyone.edit(
-                            permissions=discord.Permissions(int(r["permissions"])),
-                            reason="Restore snapshot (@everyone perms)",
-                        ))
-                    role_map[int(r["id"])] = everyone
-                    continue
-
-                exist = existing_by_id.get(int(r["id"]))
-                if exist:
-                    fields = _diff_role_fields(exist, r)
-                    if fields:
-                        await throttled(exist.edit(**fields, reason="Restore snapshot (update role)"))
-                    role_map[int(r["id"])] = exist
-                else:
-                    new_role = await throttled(g.create_role(
-                        name=r["name"],
-                        colour=discord.Colour(int(r["color"])),
-                        hoist=bool(r["hoist"]),
-                        mentionable=bool(r["mentionable"]),
-                        permissions=discord.Permissions(int(r["permissions"])),
-                        reason="Restore snapshot (create role)",
-                    ))
-                    role_map[int(r["id"])] = new_role
-
-            # 포지션은 변경 필요한 것만 묶어서
-            desired_positions = []
-            for r in sorted(snapshot_roles, key=lambda x: x["position"]):
-                role = role_map.get(int(r["id"]))
-                if role and not role.is_default() and role.position != int(r["position"]):
-                    desired_positions.append({"role": role, "position": int(r["position"])})
-            if desired_positions:
-                await throttled(g.edit_role_positions(positions=desired_positions))
-        except Exception:
-            failed_any = True
-
-        # ===== 2) Categories =====
-        try:
-            snap = data["channels"]
-            cat_map: Dict[int, discord.CategoryChannel] = {}
-            existing_cats_by_id = {c.id: c for c in g.categories}
-
-            for c in snap["categories"]:
-                old_id = int(c["id"])
-                exist = existing_cats_by_id.get(old_id)
-                ows = _make_overwrites(g, c["overwrites"])
-
-                if exist:
-                    fields = _diff_category_fields(exist, c, ows)
-                    if fields:
-                        await throttled(exist.edit(**fields, reason="Restore snapshot (update category)"))
-                    cat_map[old_id] = exist
-                else:
-                    new_cat = await throttled(g.create_category(
-                        name=c["name"],
-                        overwrites=ows,
-                        reason="Restore snapshot (create category)",
-                    ))
-                    if new_cat.position != int(c["position"]):
-                        await throttled(new_cat.edit(position=int(c["position"])))
-                    cat_map[old_id] = new_cat
-        except Exception:
-            failed_any = True
-
-        # ===== 3) Text Channels =====
-        try:
-            existing_text_by_id = {ch.id: ch for ch in g.text_channels}
-            for t in snap["texts"]:
-                old_id = int(t["id"])
-                parent = cat_map.get(int(t["parent_id"])) if t["parent_id"] else None
-                ows = _make_overwrites(g, t["overwrites"])
-
-                exist = existing_text_by_id.get(old_id)
-                if exist:
-                    fields = _diff_text_fields(exist, t, parent, ows)
-                    if fields:
-                        await throttled(exist.edit(**fields, reason="Restore snapshot (update text)"))
-                else:
-                    new_ch = await throttled(g.create_text_channel(
-                        name=t["name"],
-                        overwrites=ows,
-                        category=parent,
-                        reason="Restore snapshot (create text)",
-                    ))
-                    post_fields = _diff_text_fields(new_ch, t, parent, ows)
-                    if post_fields:
-                        await throttled(new_ch.edit(**post_fields))
-        except Exception:
-            failed_any = True
-
-        # ===== 4) Voice Channels =====
-        try:
-            existing_voice_by_id = {ch.id: ch for ch in g.voice_channels}
-            for v in snap["voices"]:
-                old_id = int(v["id"])
-                parent = cat_map.get(int(v["parent_id"])) if v["parent_id"] else None
-                ows = _make_overwrites(g, v["overwrites"])
-
-                exist = existing_voice_by_id.get(old_id)
-                if exist:
-                    fields = _diff_voice_fields(exist, v, parent, ows)
-                    if fields:
-                        await throttled(exist.edit(**fields, reason="Restore snapshot (update voice)"))
-                else:
-                    new_vc = await throttled(g.create_voice_channel(
-                        name=v["name"],
-                        overwrites=ows,
-                        category=parent,
-                        reason="Restore snapshot (create voice)",
-                    ))
-                    post_fields = _diff_voice_fields(new_vc, v, parent, ows)
-                    if post_fields:
-                        await throttled(new_vc.edit(**post_fields))
-        except Exception:
-            failed_any = True
+        plan, state = plan_restore(g, data)
+        if dry_run:
+            if not plan:
+                await itx.followup.send(_t(g.id, "restore_plan_empty", id=backup_id))
+                return
+            detail = "\n".join(f"• {kind}: {n}" for kind, n in sorted(plan.counts().items()))
+            await itx.followup.send(_t(
+                g.id, "restore_plan", id=backup_id, ops=len(plan),
+                sec=round(plan.estimate_seconds()), detail=detail,
+            ))
+            return
 
-        await itx.followup.send(_t(g.id, "restore_done") if not failed_any else _t(g.id, "restore_warn"))
+        failed = await plan.execute(state, RestoreExecutor())
+        await itx.followup.send(_t(g.id, "restore_done") if not failed else _t(g.id, "restore_warn"))
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(BackupCog(bot))
@@ -2,44 +2,64 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from utils.db import (
-    upsert_guild, set_log_channel, get_log_channel,
-    set_lang, get_lang
-)
-from utils.i18n import t
+from utils.db import upsert_guild, set_log_channel, set_lang
+from utils.guild_config import guild_configs
+from utils.i18n import t, remember_lang
 
 class ConfigCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    async def _send_log(self, guild: discord.Guild, embed: discord.Embed) -> bool:
-        ch_id = get_log_channel(guild.id)
-        if not ch_id:
-            return False
-        ch = guild.get_channel(ch_id) or await self.bot.fetch_channel(ch_id)
-        if ch:
-            await ch.send(embed=embed)
-            return True
-        return False
-
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild):
-        upsert_guild(guild.id)
+        await upsert_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        guild_configs.invalidate(guild.id)
+
+    # ===== 설정 변경 이벤트 → 공용 설정 캐시 무효화 =====
+    @commands.Cog.listener()
+    async def on_log_config_updated(self, guild_id: int):
+        guild_configs.invalidate(guild_id)
+        self.bot.logs.forget_channel(guild_id)
+
+    @commands.Cog.listener()
+    async def on_lang_config_updated(self, guild_id: int):
+        guild_configs.invalidate(guild_id)
+
+    @commands.Cog.listener()
+    async def on_risk_config_updated(self, guild_id: int):
+        guild_configs.invalidate(guild_id)
+
+    @commands.Cog.listener()
+    async def on_spam_config_updated(self, guild_id: int):
+        guild_configs.invalidate(guild_id)
+
+    @commands.Cog.listener()
+    async def on_lockdown_config_updated(self, guild_id: int):
+        guild_configs.invalidate(guild_id)
+
+    @commands.Cog.listener()
+    async def on_panic_config_updated(self, guild_id: int):
+        guild_configs.invalidate(guild_id)
 
     # /setlog <channel or 'clear'>
     @app_commands.command(name="setlog", description="Set the log channel / 로그 채널 설정")
     @app_commands.describe(channel="보안 로그를 보낼 채널(비우면 해제)")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def setlog(self, itx: discord.Interaction, channel: discord.TextChannel | None = None):
-        upsert_guild(itx.guild_id)
+        await upsert_guild(itx.guild_id)
         if channel is None:
-            set_log_channel(itx.guild_id, None)
+            await set_log_channel(itx.guild_id, None)
+            self.bot.dispatch("log_config_updated", itx.guild_id)
             await itx.response.send_message(
                 t(itx.guild_id, "setlog_clear"), ephemeral=True
             )
             return
 
-        set_log_channel(itx.guild_id, channel.id)
+        await set_log_channel(itx.guild_id, channel.id)
+        self.bot.dispatch("log_config_updated", itx.guild_id)
         await itx.response.send_message(
             t(itx.guild_id, "setlog_ok", channel=channel.mention), ephemeral=True
         )
@@ -48,9 +68,10 @@ class ConfigCog(commands.Cog):
     @app_commands.command(name="showconfig", description="Show current config / 현재 설정 보기")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def showconfig(self, itx: discord.Interaction):
-        ch_id = get_log_channel(itx.guild_id)
+        conf = await guild_configs.get(itx.guild_id)
+        ch_id = conf.log_channel
         channel_disp = itx.guild.get_channel(ch_id).mention if ch_id else "미설정 / Not set"
-        lang = get_lang(itx.guild_id)
+        lang = conf.lang
         await itx.response.send_message(
             t(itx.guild_id, "showconfig", channel=channel_disp, lang=lang),
             ephemeral=True
@@ -65,7 +86,7 @@ class ConfigCog(commands.Cog):
             description=t(itx.guild_id, "testlog_body"),
             color=0xE53935
         )
-        ok = await self._send_log(itx.guild, emb)
+        ok = await self.bot.logs.send(itx.guild, emb)
         if ok:
             await itx.response.send_message("✅ OK", ephemeral=True)
         else:
@@ -79,7 +100,9 @@ class ConfigCog(commands.Cog):
         lang = lang.lower().strip()
         if lang not in ("ko", "en"):
             lang = "ko"
-        set_lang(itx.guild_id, lang)
+        await set_lang(itx.guild_id, lang)
+        remember_lang(itx.guild_id, lang)
+        self.bot.dispatch("lang_config_updated", itx.guild_id)
         await itx.response.send_message(
             t(itx.guild_id, "setlang_ok", lang=lang), ephemeral=True
         )
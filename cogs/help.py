@@ -3,7 +3,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from utils.i18n import t as _t
+from utils.i18n import translator
 
 # SentinelBot에서 제공하는 주요 명령을 카테고리로 정리
 # kind: "Slash" = 일반 슬래시, "Group" = 그룹 명령(하위 커맨드 존재)
@@ -25,6 +25,7 @@ CATEGORIES = {
         ("lockdown", "Slash"),
         ("panic", "Slash"),
         ("unpanic", "Slash"),
+        ("panicroles", "Slash"),
     ],
     "backup": [
         ("backup_create", "Slash"),
@@ -64,6 +65,7 @@ class HelpCog(commands.Cog):
     @app_commands.describe(command="명령어 이름(선택). 예) spamallow add / Command name (optional). e.g., spamallow add")
     async def help_cmd(self, itx: discord.Interaction, command: str | None = None):
         guild_id = itx.guild_id or 0
+        tr = translator(guild_id)
         await itx.response.defer(ephemeral=True, thinking=False)
 
         # 특정 명령 상세
@@ -75,28 +77,28 @@ class HelpCog(commands.Cog):
                 # 단일 이름만 들어온 경우 다시 한 번 시도
                 cmd = table.get(key.split()[0]) if " " in key else None
                 if not cmd:
-                    await itx.followup.send(_t(guild_id, "help_unknown_command", name=command), ephemeral=True)
+                    await itx.followup.send(tr("help_unknown_command", name=command), ephemeral=True)
                     return
 
             # 표시용 이름: 공백 포함 입력이면 그대로, 아니면 /cmd.name
             display_name = f"/{key}" if " " in key else f"/{cmd.name}"
-            title = _t(guild_id, "help_command_title", name=display_name)
+            title = tr("help_command_title", name=display_name)
             desc_lines = [
-                _t(guild_id, "help_command_desc"),
+                tr("help_command_desc"),
                 f"> {cmd.description or '-'}",
             ]
 
             # 파라미터 표시
             if getattr(cmd, "parameters", None):
-                desc_lines.append(_t(guild_id, "help_command_usage"))
+                desc_lines.append(tr("help_command_usage"))
                 for p in cmd.parameters:
                     required = getattr(p, "required", False)
-                    opt_txt = _t(guild_id, "help_required") if required else _t(guild_id, "help_optional")
+                    opt_txt = tr("help_required") if required else tr("help_optional")
                     desc_lines.append(f"- `{p.name}` ({opt_txt}) — {p.description or '-'}")
 
             # 예시 안내
             desc_lines.append("")
-            desc_lines.append(_t(guild_id, "help_examples_header"))
+            desc_lines.append(tr("help_examples_header"))
             examples = {
                 "setlog": "/setlog #security-log",
                 "setlang": "/setlang ko",
@@ -104,10 +106,11 @@ class HelpCog(commands.Cog):
                 "spamset": "/spamset max_msgs_per_10s:8 max_mentions_per_msg:5 block_everyone_here:true",
                 "lockdownset": "/lockdownset min_account_age_hours:72 min_guild_age_hours:24",
                 "lockdown": "/lockdown true",
-                "panic": "/panic",
+                "panic": "/panic\n/panic mode:fast",
+                "panicroles": "/panicroles add @Member",
                 "unpanic": "/unpanic",
                 "backup_create": "/backup_create label:baseline",
-                "backup_restore": "/backup_restore 12",
+                "backup_restore": "/backup_restore 12 dry_run:true",
                 # ✅ 그룹 예시
                 "spamallow": "/spamallow add @Trusted\n/spamallow remove @Trusted\n/spamallow list",
                 "spamallow add": "/spamallow add @Trusted",
@@ -124,26 +127,26 @@ class HelpCog(commands.Cog):
             # 정책 반영 지연 안내(해당되는 명령에만)
             if (key.split()[0] if " " in key else cmd.name) in {"riskset", "spamset", "lockdownset"}:
                 desc_lines.append("")
-                desc_lines.append(_t(guild_id, "policy_update_delay"))
+                desc_lines.append(tr("policy_update_delay"))
 
             emb = discord.Embed(title=title, description="\n".join(desc_lines), color=0x5865F2)
-            emb.set_footer(text=_t(guild_id, "help_footer"))
+            emb.set_footer(text=tr("help_footer"))
             await itx.followup.send(embed=emb, ephemeral=True)
             return
 
         # 전체 목록
-        title = _t(guild_id, "help_title")
-        intro = _t(guild_id, "help_intro")
+        title = tr("help_title")
+        intro = tr("help_intro")
 
         emb = discord.Embed(title=title, description=intro, color=0x5865F2)
 
         # 카테고리별 섹션
         labels = {
-            "basic": _t(guild_id, "help_cat_basic"),
-            "policies": _t(guild_id, "help_cat_policies"),
-            "admin": _t(guild_id, "help_cat_admin"),
-            "backup": _t(guild_id, "help_cat_backup"),
-            "audit": _t(guild_id, "help_cat_audit"),  # ✅ 라벨 추가
+            "basic": tr("help_cat_basic"),
+            "policies": tr("help_cat_policies"),
+            "admin": tr("help_cat_admin"),
+            "backup": tr("help_cat_backup"),
+            "audit": tr("help_cat_audit"),  # ✅ 라벨 추가
         }
 
         # 실제 등록된 명령만 뽑아 표시
@@ -162,23 +165,23 @@ class HelpCog(commands.Cog):
                 emb.add_field(name=labels[key], value="\n".join(present), inline=False)
 
         emb.add_field(
-            name=_t(guild_id, "help_auto_enforce_title"),
+            name=tr("help_auto_enforce_title"),
             value="\n".join([
-                f"- {_t(guild_id, 'auto_enforce_rule_rate_link')}",
-                f"- {_t(guild_id, 'auto_enforce_rule_everyone')}",
-                f"- {_t(guild_id, 'auto_enforce_rule_join')}",
+                f"- {tr('auto_enforce_rule_rate_link')}",
+                f"- {tr('auto_enforce_rule_everyone')}",
+                f"- {tr('auto_enforce_rule_join')}",
             ]),
             inline=False,
         )
 
         emb.add_field(
-            name=_t(guild_id, "help_tips_title"),
-            value=_t(guild_id, "help_tips_body"),
+            name=tr("help_tips_title"),
+            value=tr("help_tips_body"),
             inline=False,
         )
 
 
-        emb.set_footer(text=_t(guild_id, "help_footer"))
+        emb.set_footer(text=tr("help_footer"))
 
         await itx.followup.send(embed=emb, ephemeral=True)
 
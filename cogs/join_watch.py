@@ -1,33 +1,44 @@
 # cogs/join_watch.py
 from __future__ import annotations
+import asyncio
 import time
 import discord
 from discord.ext import commands
 
-from utils.db import get_log_channel, get_risk_config
-from utils.i18n import t as _t
+from utils.audit_cache import self_actions
+from utils.counters import get_counters
+from utils.guild_config import guild_configs
+from utils.i18n import t as _t, translator
 
-_recent_joins: dict[int, list[float]] = {}
 _owner_dm_cooldown: dict[int, float] = {}
 OWNER_DM_COOLDOWN_SEC = 3600
 
-CACHE_TTL = 10
-_risk_cache: dict[int, tuple[float, dict]] = {}
+# ── 레이드 모드: 임계값을 넘은 입장자는 모아서 bulk_ban ──
+RAID_BATCH_WINDOW_SEC = 2.0   # 이 시간 동안 모인 입장자를 한 번에 BAN
+RAID_BATCH_MAX = 200          # bulk_ban 1회 최대 인원 (디스코드 제한)
+RAID_LOG_LIST_MAX = 30        # 요약 로그에 나열할 최대 인원
 
-def get_risk_conf_cached(guild_id: int):
-    now = time.time()
-    hit = _risk_cache.get(guild_id)
-    if hit and hit[0] > now:
-        return hit[1]
-    conf = get_risk_config(guild_id)
-    _risk_cache[guild_id] = (now + CACHE_TTL, conf)
-    return conf
+class _RaidBatch:
+    __slots__ = ("members", "join_count", "window_sec", "task")
 
-def invalidate_risk_conf(guild_id: int | None = None):
-    if guild_id is None:
-        _risk_cache.clear()
-    else:
-        _risk_cache.pop(guild_id, None)
+    def __init__(self, window_sec: int):
+        self.members: dict[int, discord.Member] = {}
+        self.join_count = 0
+        self.window_sec = window_sec
+        self.task: asyncio.Task | None = None
+
+_raid_batches: dict[int, _RaidBatch] = {}
+_raid_tasks: set[asyncio.Task] = set()  # 대기/BAN 작업 참조 유지 (GC 방지, 언로드 시 취소)
+
+def _track(task: asyncio.Task) -> asyncio.Task:
+    _raid_tasks.add(task)
+    task.add_done_callback(_on_raid_task_done)
+    return task
+
+def _on_raid_task_done(task: asyncio.Task):
+    _raid_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"❌ 레이드 일괄 BAN 오류: {task.exception()}")
 
 class JoinWatchCog(commands.Cog):
     """신규 유저 입장 위험 신호 감지 & 자동 제재 (저연령=Kick / 레이드=Ban)"""
@@ -35,19 +46,10 @@ class JoinWatchCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_risk_config_updated(self, guild_id: int):
-        invalidate_risk_conf(guild_id)
-
-    async def _send_log(self, guild: discord.Guild, embed: discord.Embed) -> bool:
-        ch_id = get_log_channel(guild.id)
-        if not ch_id:
-            return False
-        ch = guild.get_channel(ch_id) or await self.bot.fetch_channel(ch_id)
-        if ch:
-            await ch.send(embed=embed)
-            return True
-        return False
+    async def cog_unload(self):
+        for task in list(_raid_tasks):
+            task.cancel()
+        _raid_batches.clear()
 
     async def _notify_owner_if_no_log(self, guild: discord.Guild):
         now = time.time()
@@ -58,7 +60,7 @@ class JoinWatchCog(commands.Cog):
         try:
             owner = guild.owner or await guild.fetch_owner()
             await owner.send(
-                f"⚠️ SentinelBot: {guild.name} 서버에 로그 채널이 설정되지 않았습니다. `/setlog`로 먼저 지정하세요."
+                f"⚠️ SentinelBot: {guild.name} 서버의 로그 채널이 설정되지 않았거나 접근할 수 없습니다. `/setlog`로 확인하세요."
             )
         except Exception:
             pass
@@ -93,38 +95,75 @@ class JoinWatchCog(commands.Cog):
         )
         if member.display_avatar:
             emb.set_thumbnail(url=member.display_avatar.url)
-        await self._send_log(guild, emb)
+        await self.bot.logs.send(guild, emb)
 
-    async def _ban_raid(self, member: discord.Member, join_count: int, window_sec: int):
+    def _queue_raid_ban(self, member: discord.Member, join_count: int, window_sec: int):
+        """레이드 입장자를 길드별 배치에 모음 (윈도가 끝나거나 가득 차면 일괄 BAN)"""
         guild = member.guild
+        batch = _raid_batches.get(guild.id)
+        if batch is None:
+            batch = _raid_batches[guild.id] = _RaidBatch(window_sec)
+            batch.task = _track(asyncio.create_task(self._flush_raid_later(guild, batch)))
+        batch.members[member.id] = member
+        batch.join_count = max(batch.join_count, join_count)
+
+        if len(batch.members) >= RAID_BATCH_MAX:
+            _raid_batches.pop(guild.id, None)
+            batch.task.cancel()
+            batch.task = _track(asyncio.create_task(self._ban_raid_batch(guild, batch)))
+
+    async def _flush_raid_later(self, guild: discord.Guild, batch: _RaidBatch):
+        await asyncio.sleep(RAID_BATCH_WINDOW_SEC)
+        if _raid_batches.get(guild.id) is batch:
+            del _raid_batches[guild.id]
+        await self._ban_raid_batch(guild, batch)
+
+    async def _ban_raid_batch(self, guild: discord.Guild, batch: _RaidBatch):
         me: discord.Member = guild.me  # type: ignore
-        if member == guild.owner or member.top_role >= me.top_role:
-            return
         if not me.guild_permissions.ban_members:
             return
+        targets = [m for m in batch.members.values()
+                   if m != guild.owner and m.top_role < me.top_role]
+        if not targets:
+            return
 
-        reason = _t(guild.id, "log_join_reason_raid", count=join_count, sec=window_sec)
+        tr = translator(guild.id)
+        reason = tr("log_join_reason_raid", count=batch.join_count, sec=batch.window_sec)
         final_reason = f"Violation | {reason}"
 
+        ban = discord.AuditLogAction.ban
+        for m in targets:
+            # 배치 요약 로그 1건으로 대신하므로 modlog의 건별 BAN 로그는 생략
+            self_actions.expect(guild.id, ban, m.id, reason=final_reason, rule="join:raid", log=False)
+
+        banned_ids: set[int] = set()
         try:
-            await member.send(_t(guild.id, "dm_mod_notice", action="BAN", reason=reason))
-        except Exception:
-            pass
-        try:
-            await guild.ban(member, reason=final_reason, delete_message_days=0)
+            result = await guild.bulk_ban(targets, reason=final_reason, delete_message_seconds=0)
+            banned_ids = {u.id for u in result.banned}
         except Exception:
-            pass
-
-        emb = discord.Embed(
-            title=_t(guild.id, "log_mod_title"),
-            color=0xC62828,
-            description=(f"**Action:** BAN\n"
-                         f"**User:** {member.mention} (`{member}`)\n"
-                         f"**Reason:** {final_reason}")
-        )
-        if member.display_avatar:
-            emb.set_thumbnail(url=member.display_avatar.url)
-        await self._send_log(guild, emb)
+            # bulk_ban은 서버 관리 권한도 필요 → 없으면 개별 BAN으로 대체
+            for m in targets:
+                try:
+                    await guild.ban(m, reason=final_reason, delete_message_days=0)
+                    banned_ids.add(m.id)
+                except Exception:
+                    pass
+
+        for m in targets:
+            if m.id not in banned_ids:
+                self_actions.forget(guild.id, ban, m.id)
+        banned = [m for m in targets if m.id in banned_ids]
+        lines = [tr("log_raid_batch_body", banned=len(banned), failed=len(targets) - len(banned))]
+        lines += [f"- {m.mention} (`{m}`)" for m in banned[:RAID_LOG_LIST_MAX]]
+        if len(banned) > RAID_LOG_LIST_MAX:
+            lines.append(tr("log_raid_batch_more", count=len(banned) - RAID_LOG_LIST_MAX))
+        lines.append(f"**Reason:** {final_reason}")
+
+        emb = discord.Embed(title=tr("log_raid_batch_title"), color=0xC62828, description="\n".join(lines))
+        emb.set_footer(text=tr("log_join_footer_config"))
+        sent = await self.bot.logs.send(guild, emb)
+        if not sent:
+            await self._notify_owner_if_no_log(guild)
 
     # ── 멤버 입장 감시 ──
     @commands.Cog.listener()
@@ -133,41 +172,31 @@ class JoinWatchCog(commands.Cog):
             return
 
         guild = member.guild
-        r = get_risk_conf_cached(guild.id)
+        r = (await guild_configs.get(guild.id)).risk
         MIN_ACCOUNT_AGE_HOURS = r["min_account_age_hours"]
         RAID_JOIN_WINDOW_SEC = r["raid_join_window_sec"]
         RAID_JOIN_COUNT = r["raid_join_count"]
 
         acct_age_hours = ((discord.utils.utcnow() - member.created_at).total_seconds() / 3600)
 
-        now = time.time()
-        buf = _recent_joins.setdefault(guild.id, [])
-        buf.append(now)
-        _recent_joins[guild.id] = [ts for ts in buf if now - ts <= RAID_JOIN_WINDOW_SEC]
-        join_count = len(_recent_joins[guild.id])
-
-        reasons = []
-        if acct_age_hours < MIN_ACCOUNT_AGE_HOURS:
-            reasons.append("new_account")
-            await self._kick_new_account(member, acct_age_hours)
+        # 최근 입장 수 (카운터 백엔드: 재시작/다중 프로세스 공유)
+        join_count = await get_counters().hit(f"joins:{guild.id}", window=RAID_JOIN_WINDOW_SEC)
 
+        # 레이드 모드: 개별 처리/로그 대신 배치에 모아 일괄 BAN + 요약 로그 1건
         if join_count >= RAID_JOIN_COUNT:
-            reasons.append("raid_surge")
-            await self._ban_raid(member, join_count, RAID_JOIN_WINDOW_SEC)
+            self._queue_raid_ban(member, join_count, RAID_JOIN_WINDOW_SEC)
+            return
 
-        if not reasons:
+        if acct_age_hours >= MIN_ACCOUNT_AGE_HOURS:
             return
+        await self._kick_new_account(member, acct_age_hours)
 
         # 로그 알림
-        parts = []
-        if "new_account" in reasons:
-            parts.append(_t(guild.id, "log_join_reason_new", hours=f"{acct_age_hours:.1f}"))
-        if "raid_surge" in reasons:
-            parts.append(_t(guild.id, "log_join_reason_raid", count=join_count, sec=RAID_JOIN_WINDOW_SEC))
-        reason_str = " • ".join(parts)
+        tr = translator(guild.id)
+        reason_str = tr("log_join_reason_new", hours=f"{acct_age_hours:.1f}")
 
         emb = discord.Embed(
-            title=_t(guild.id, "log_join_title"),
+            title=tr("log_join_title"),
             color=0xE53935,
             description=(f"**User:** {member.mention} (`{member}`)\n"
                          f"**Account Created:** {discord.utils.format_dt(member.created_at, style='R')}\n"
@@ -175,9 +204,9 @@ class JoinWatchCog(commands.Cog):
         )
         if member.display_avatar:
             emb.set_thumbnail(url=member.display_avatar.url)
-        emb.set_footer(text=_t(guild.id, "log_join_footer_config"))
+        emb.set_footer(text=tr("log_join_footer_config"))
 
-        sent = await self._send_log(guild, emb)
+        sent = await self.bot.logs.send(guild, emb)
         if not sent:
             await self._notify_owner_if_no_log(guild)
 
@@ -0,0 +1,28 @@
+# cogs/message_pipeline.py
+from __future__ import annotations
+
+import discord
+from discord.ext import commands
+
+from utils.pipeline import pipeline
+
+
+class MessagePipelineCog(commands.Cog):
+    """길드 메시지를 등록된 검사 규칙(락다운/스팸 등)에 순서대로 한 번만 통과시킴"""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        await pipeline.run(message)
+
+    @commands.Cog.listener()
+    async def on_message_edit(self, before: discord.Message, after: discord.Message):
+        # 임베드 펼침/고정 등 본문이 그대로인 수정 이벤트는 다시 검사하지 않음
+        if before.content == after.content:
+            return
+        await pipeline.run(after, is_edit=True)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MessagePipelineCog(bot))
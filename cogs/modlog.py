@@ -2,8 +2,8 @@
 from __future__ import annotations
 import discord
 from discord.ext import commands
-from utils.db import get_log_channel
-from utils.i18n import t as _t
+from utils.i18n import translator
+from utils.audit_cache import audit_cache, self_actions
 
 class ModLogCog(commands.Cog):
     """BAN/UNBAN 등 주요 제재 이벤트 로깅"""
@@ -11,89 +11,95 @@ class ModLogCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    async def _send_log(self, guild: discord.Guild, embed: discord.Embed) -> bool:
-        ch_id = get_log_channel(guild.id)
-        if not ch_id:
-            return False
-        ch = guild.get_channel(ch_id) or await self.bot.fetch_channel(ch_id)
-        if ch:
-            await ch.send(embed=embed)
-            return True
-        return False
-
     @commands.Cog.listener()
-    async def on_member_ban(self, guild: discord.Guild, user: discord.User | discord.Member):
-        # 감사 로그에서 실행자/사유 추출 (권한 필요: View Audit Log)
-        executor = None
-        reason = None
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        # 게이트웨이로 오는 감사 로그 (권한 필요: View Audit Log) → BAN/UNBAN 이벤트와 짝지을 때까지 보관
+        if entry.action in (discord.AuditLogAction.ban, discord.AuditLogAction.unban):
+            audit_cache.record(entry)
+
+    async def _attribution(self, guild: discord.Guild, user: discord.abc.User, action: discord.AuditLogAction):
+        """(실행자 id, 실행자 표시, 사유). 게이트웨이 이벤트를 먼저 기다리고, 못 받으면 REST 조회"""
+        att = await audit_cache.wait_for(guild.id, action, user.id)
+        if att is not None:
+            executor = att.executor or (guild.get_member(att.executor_id) if att.executor_id else None)
+            shown = str(executor) if executor else (f"<@{att.executor_id}>" if att.executor_id else None)
+            return att.executor_id, shown, att.reason
         try:
-            async for entry in guild.audit_logs(action=discord.AuditLogAction.ban, limit=5):
+            async for entry in guild.audit_logs(action=action, limit=5):
                 if entry.target and entry.target.id == user.id:
-                    executor = entry.user
-                    reason = entry.reason
-                    break
+                    return entry.user_id, str(entry.user) if entry.user else None, entry.reason
         except Exception:
             pass
+        return None, None, None
 
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User | discord.Member):
+        audit_cache.discard(guild.id, discord.AuditLogAction.unban, user.id)
+        # 봇이 직접 건 BAN이면 등록부에 사유/규칙이 있음 → 감사 로그를 기다리지 않음
+        own = self_actions.claim(guild.id, discord.AuditLogAction.ban, user.id)
+        if own is not None and not own.log:
+            return
+        if own is not None:
+            executor_id, executor, reason = guild.me.id, None, own.reason
+        else:
+            executor_id, executor, reason = await self._attribution(guild, user, discord.AuditLogAction.ban)
+
+        tr = translator(guild.id)
         by_text = ""
-        if executor:
-            if executor.id == guild.me.id:
-                by_text = _t(guild.id, "log_ban_by_bot")
+        if executor_id:
+            if executor_id == guild.me.id:
+                by_text = tr("log_ban_by_bot")
             else:
-                by_text = _t(guild.id, "log_ban_by_mod", mod=str(executor))
+                by_text = tr("log_ban_by_mod", mod=executor)
         else:
-            by_text = _t(guild.id, "log_ban_by_unknown")
+            by_text = tr("log_ban_by_unknown")
 
-        reason_text = reason or _t(guild.id, "log_ban_no_reason")
+        reason_text = reason or tr("log_ban_no_reason")
 
         emb = discord.Embed(
-            title=_t(guild.id, "log_ban_title"),
+            title=tr("log_ban_title"),
             color=0xC62828,
             description=(
                 f"**User:** {user.mention if hasattr(user,'mention') else user} (`{user}`)\n"
-                f"**{_t(guild.id, 'log_ban_by_label')}:** {by_text}\n"
-                f"**{_t(guild.id, 'log_ban_reason_label')}:** {reason_text}"
+                f"**{tr('log_ban_by_label')}:** {by_text}\n"
+                f"**{tr('log_ban_reason_label')}:** {reason_text}"
             ),
         )
+        if own is not None and own.rule:
+            emb.description += f"\n**{tr('log_ban_rule_label')}:** `{own.rule}`"
         avatar = getattr(user, "display_avatar", None) or getattr(user, "avatar", None)
         if avatar:
             emb.set_thumbnail(url=avatar.url)
-        await self._send_log(guild, emb)
+        await self.bot.logs.send(guild, emb)
 
     @commands.Cog.listener()
     async def on_member_unban(self, guild: discord.Guild, user: discord.User):
-        executor = None
-        reason = None
-        try:
-            async for entry in guild.audit_logs(action=discord.AuditLogAction.unban, limit=5):
-                if entry.target and entry.target.id == user.id:
-                    executor = entry.user
-                    reason = entry.reason
-                    break
-        except Exception:
-            pass
+        # 짝을 찾지 못한 BAN 항목(예: 봇이 직접 건 BAN)이 다음 BAN에 붙지 않도록
+        audit_cache.discard(guild.id, discord.AuditLogAction.ban, user.id)
+        executor_id, executor, reason = await self._attribution(guild, user, discord.AuditLogAction.unban)
 
+        tr = translator(guild.id)
         by_text = ""
-        if executor:
-            if executor.id == guild.me.id:
-                by_text = _t(guild.id, "log_unban_by_bot")
+        if executor_id:
+            if executor_id == guild.me.id:
+                by_text = tr("log_unban_by_bot")
             else:
-                by_text = _t(guild.id, "log_unban_by_mod", mod=str(executor))
+                by_text = tr("log_unban_by_mod", mod=executor)
         else:
-            by_text = _t(guild.id, "log_unban_by_unknown")
+            by_text = tr("log_unban_by_unknown")
 
-        reason_text = reason or _t(guild.id, "log_unban_no_reason")
+        reason_text = reason or tr("log_unban_no_reason")
 
         emb = discord.Embed(
-            title=_t(guild.id, "log_unban_title"),
+            title=tr("log_unban_title"),
             color=0x43A047,
             description=(
                 f"**User:** {user} (`{user.id}`)\n"
-                f"**{_t(guild.id, 'log_unban_by_label')}:** {by_text}\n"
-                f"**{_t(guild.id, 'log_unban_reason_label')}:** {reason_text}"
+                f"**{tr('log_unban_by_label')}:** {by_text}\n"
+                f"**{tr('log_unban_reason_label')}:** {reason_text}"
             ),
         )
-        await self._send_log(guild, emb)
+        await self.bot.logs.send(guild, emb)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(ModLogCog(bot))
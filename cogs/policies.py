@@ -7,10 +7,10 @@ from utils.db import (
     upsert_guild,
     get_risk_config, set_risk_config,
     get_spam_config, set_spam_config,
-    get_lockdown_config,
     add_spam_whitelist_role, remove_spam_whitelist_role
 )
-from utils.i18n import t as _t
+from utils.guild_config import guild_configs
+from utils.i18n import translator
 
 
 class PoliciesCog(commands.Cog):
@@ -22,40 +22,42 @@ class PoliciesCog(commands.Cog):
     @app_commands.command(name="policies", description="Show current policies / 현재 정책 보기")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def policies(self, itx: discord.Interaction):
-        upsert_guild(itx.guild_id)
-        r = get_risk_config(itx.guild_id)
-        s = get_spam_config(itx.guild_id)
-        l = get_lockdown_config(itx.guild_id)
+        tr = translator(itx.guild_id)
+        await upsert_guild(itx.guild_id)
+        conf = await guild_configs.get(itx.guild_id)
+        r, s, l = conf.risk, conf.spam, conf.lockdown
 
         wl = s.get("everyone_whitelist", [])
-        wl_txt = ", ".join(f"<@&{rid}>" for rid in wl) if wl else _t(itx.guild_id, "none")
+        wl_txt = ", ".join(f"<@&{rid}>" for rid in wl) if wl else tr("none")
 
-        body = _t(
-            itx.guild_id,
+        body = tr(
             "policies_body",
             min_age=r["min_account_age_hours"],
             raid_count=r["raid_join_count"],
             raid_win=r["raid_join_window_sec"],
             max_msgs=s["max_msgs_per_10s"],
             max_mentions=s["max_mentions_per_msg"],
-            block_eh=_t(itx.guild_id, "bool_on") if s["block_everyone_here"] else _t(itx.guild_id, "bool_off"),
-            link_filter=_t(itx.guild_id, "bool_on") if s["enable_link_filter"] else _t(itx.guild_id, "bool_off"),
+            block_eh=tr("bool_on") if s["block_everyone_here"] else tr("bool_off"),
+            link_filter=tr("bool_on") if s["enable_link_filter"] else tr("bool_off"),
         )
+        dup_txt = f"{s['dup_authors']} users/{s['dup_window_sec']}s" if s["dup_authors"] else tr("bool_off")
         body += (
+            f"\n- Copypasta: {dup_txt}"
             f"\n- Whitelist: {wl_txt}"
-            f"\n\n{_t(itx.guild_id, 'lockdown_title')}\n"
-            f"- {_t(itx.guild_id, 'lockdown_enabled', state=_t(itx.guild_id, 'bool_on') if l['enabled'] else _t(itx.guild_id, 'bool_off'))}\n"
-            f"- {_t(itx.guild_id, 'lockdown_min_age', hours=l['min_account_age_hours'])}\n"
-            f"- {_t(itx.guild_id, 'lockdown_min_guild_age', hours=l['min_guild_age_hours'])}"
+            f"\n\n{tr('lockdown_title')}\n"
+            f"- {tr('lockdown_enabled', state=tr('bool_on') if l['enabled'] else tr('bool_off'))}\n"
+            f"- {tr('lockdown_min_age', hours=l['min_account_age_hours'])}\n"
+            f"- {tr('lockdown_min_guild_age', hours=l['min_guild_age_hours'])}"
         )
         body += (
-            f"\n\n**{_t(itx.guild_id, 'auto_enforce_title')}**\n"
-            f"- {_t(itx.guild_id, 'auto_enforce_rule_rate_link')}\n"
-            f"- {_t(itx.guild_id, 'auto_enforce_rule_everyone')}\n"
-            f"- {_t(itx.guild_id, 'auto_enforce_rule_join')}"
+            f"\n\n**{tr('auto_enforce_title')}**\n"
+            f"- {tr('auto_enforce_rule_rate_link')}\n"
+            f"- {tr('auto_enforce_rule_dup')}\n"
+            f"- {tr('auto_enforce_rule_everyone')}\n"
+            f"- {tr('auto_enforce_rule_join')}"
         )
 
-        emb = discord.Embed(title=_t(itx.guild_id, "policies_title"), description=body, color=0x546E7A)
+        emb = discord.Embed(title=tr("policies_title"), description=body, color=0x546E7A)
         await itx.response.send_message(embed=emb, ephemeral=True)
 
     @app_commands.command(name="riskset", description="Set risk policy / Risk 정책 설정")
@@ -72,8 +74,8 @@ class PoliciesCog(commands.Cog):
         raid_join_window_sec: app_commands.Range[int, 5, 600] | None = None,
         raid_join_count: app_commands.Range[int, 2, 100] | None = None,
     ):
-        upsert_guild(itx.guild_id)
-        set_risk_config(
+        await upsert_guild(itx.guild_id)
+        await set_risk_config(
             itx.guild_id,
             min_account_age_hours=min_account_age_hours,
             raid_join_window_sec=raid_join_window_sec,
@@ -81,12 +83,13 @@ class PoliciesCog(commands.Cog):
         )
         self.bot.dispatch("risk_config_updated", itx.guild_id)
 
-        r = get_risk_config(itx.guild_id)
+        r = await get_risk_config(itx.guild_id)
+        tr = translator(itx.guild_id)
         desc = (
-            f"{_t(itx.guild_id, 'riskset_ok')}\n"
+            f"{tr('riskset_ok')}\n"
             f"- Min account age: {r['min_account_age_hours']}h\n"
             f"- Raid detection: {r['raid_join_count']} users/{r['raid_join_window_sec']}s\n\n"
-            f"{_t(itx.guild_id, 'policy_update_delay')}"
+            f"{tr('policy_update_delay')}"
         )
         emb = discord.Embed(title="🔧 Risk Policy", description=desc, color=0x455A64)
         await itx.response.send_message(embed=emb, ephemeral=True)
@@ -96,7 +99,10 @@ class PoliciesCog(commands.Cog):
         max_msgs_per_10s="10초당 최대 메시지",
         max_mentions_per_msg="1메시지 최대 멘션",
         block_everyone_here="@everyone/@here 차단 여부",
-        enable_link_filter="링크 필터 사용 여부(메시지 콘텐츠 인텐트 필요)"
+        enable_link_filter="링크 필터 사용 여부(메시지 콘텐츠 인텐트 필요)",
+        link_filter_schemeless="스킴 없는 단축/초대 링크(discord.gg/…, bit.ly/…)도 검사",
+        dup_authors="같은 내용을 올린 서로 다른 계정 수(0=끔, 2 이상)",
+        dup_window_sec="복붙 도배 판정 윈도(초)",
     )
     @app_commands.checks.has_permissions(manage_guild=True)
     async def spamset(
@@ -106,29 +112,43 @@ class PoliciesCog(commands.Cog):
         max_mentions_per_msg: app_commands.Range[int, 0, 50] | None = None,
         block_everyone_here: bool | None = None,
         enable_link_filter: bool | None = None,
+        link_filter_schemeless: bool | None = None,
+        dup_authors: app_commands.Range[int, 0, 50] | None = None,
+        dup_window_sec: app_commands.Range[int, 10, 600] | None = None,
     ):
-        upsert_guild(itx.guild_id)
-        set_spam_config(
+        if dup_authors == 1:
+            # 1명 = 모든 메시지가 걸림 → 허용하지 않음
+            await itx.response.send_message(translator(itx.guild_id)("spamset_dup_authors_invalid"), ephemeral=True)
+            return
+        await upsert_guild(itx.guild_id)
+        await set_spam_config(
             itx.guild_id,
             max_msgs_per_10s=max_msgs_per_10s,
             max_mentions_per_msg=max_mentions_per_msg,
             block_everyone_here=block_everyone_here,
             enable_link_filter=enable_link_filter,
+            link_filter_schemeless=link_filter_schemeless,
+            dup_authors=dup_authors,
+            dup_window_sec=dup_window_sec,
         )
         self.bot.dispatch("spam_config_updated", itx.guild_id)
 
-        s = get_spam_config(itx.guild_id)
+        s = await get_spam_config(itx.guild_id)
+        tr = translator(itx.guild_id)
         wl = s.get("everyone_whitelist", [])
-        wl_txt = ", ".join(f"<@&{rid}>" for rid in wl) if wl else _t(itx.guild_id, "none")
+        wl_txt = ", ".join(f"<@&{rid}>" for rid in wl) if wl else tr("none")
+        dup_txt = f"{s['dup_authors']} users/{s['dup_window_sec']}s" if s["dup_authors"] else "OFF"
 
         desc = (
-            f"{_t(itx.guild_id, 'spamset_ok')}\n"
+            f"{tr('spamset_ok')}\n"
             f"- Max msgs/10s: {s['max_msgs_per_10s']}\n"
             f"- Max mentions/msg: {s['max_mentions_per_msg']}\n"
             f"- Block @everyone/@here: {'ON' if s['block_everyone_here'] else 'OFF'}\n"
-            f"- Link filter: {'ON' if s['enable_link_filter'] else 'OFF'}\n"
+            f"- Link filter: {'ON' if s['enable_link_filter'] else 'OFF'}"
+            f"{' (+ schemeless)' if s['enable_link_filter'] and s['link_filter_schemeless'] else ''}\n"
+            f"- Copypasta: {dup_txt}\n"
             f"- Whitelist: {wl_txt}\n\n"
-            f"{_t(itx.guild_id, 'policy_update_delay')}"
+            f"{tr('policy_update_delay')}"
         )
         emb = discord.Embed(title="🛡️ Spam Policy", description=desc, color=0x455A64)
         await itx.response.send_message(embed=emb, ephemeral=True)
@@ -137,22 +157,23 @@ class PoliciesCog(commands.Cog):
     @app_commands.command(name="spamallow", description="Manage @everyone/@here whitelist / 화이트리스트 관리")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def spamallow(self, itx: discord.Interaction, action: Literal["add", "remove", "list"], role: discord.Role | None = None):
+        tr = translator(itx.guild_id)
         action = action.lower()
         if action == "add" and role:
-            add_spam_whitelist_role(itx.guild_id, role.id)
+            await add_spam_whitelist_role(itx.guild_id, role.id)
             self.bot.dispatch("spam_config_updated", itx.guild_id)
-            msg = _t(itx.guild_id, "spamallow_added", role=role.mention)
+            msg = tr("spamallow_added", role=role.mention)
         elif action == "remove" and role:
-            remove_spam_whitelist_role(itx.guild_id, role.id)
+            await remove_spam_whitelist_role(itx.guild_id, role.id)
             self.bot.dispatch("spam_config_updated", itx.guild_id)
-            msg = _t(itx.guild_id, "spamallow_removed", role=role.mention)
+            msg = tr("spamallow_removed", role=role.mention)
         elif action == "list":
-            s = get_spam_config(itx.guild_id)
+            s = await get_spam_config(itx.guild_id)
             wl = s.get("everyone_whitelist", [])
-            wl_txt = ", ".join(f"<@&{rid}>" for rid in wl) if wl else _t(itx.guild_id, "none")
-            msg = _t(itx.guild_id, "spamallow_list", roles=wl_txt)
+            wl_txt = ", ".join(f"<@&{rid}>" for rid in wl) if wl else tr("none")
+            msg = tr("spamallow_list", roles=wl_txt)
         else:
-            msg = _t(itx.guild_id, "spamallow_hint")
+            msg = tr("spamallow_hint")
 
         emb = discord.Embed(title="📝 Whitelist", description=msg, color=0x455A64)
         await itx.response.send_message(embed=emb, ephemeral=True)
@@ -1,39 +1,23 @@
 # cogs/spam_watch.py
 from __future__ import annotations
 
-import re
-import time
-from urllib.parse import urlparse
-
 import discord
-from discord.ext import commands
-
-from utils.db import get_log_channel, get_spam_config
-from utils.i18n import t as _t
-
-LINK_RE = re.compile(r"https?://[^\s]+", re.IGNORECASE)
-
-# 메시지 속도 제한 버퍼
-_msg_buffer: dict[int, dict[int, list[float]]] = {}
-
-# ---- 정책 캐시 (TTL=10초) ----
-CACHE_TTL = 10
-_spam_cache: dict[int, tuple[float, dict]] = {}  # guild_id -> (expires_ts, conf)
-
-def get_spam_conf_cached(guild_id: int):
-    now = time.time()
-    hit = _spam_cache.get(guild_id)
-    if hit and hit[0] > now:
-        return hit[1]
-    conf = get_spam_config(guild_id)
-    _spam_cache[guild_id] = (now + CACHE_TTL, conf)
-    return conf
-
-def invalidate_spam_conf(guild_id: int | None = None):
-    if guild_id is None:
-        _spam_cache.clear()
-    else:
-        _spam_cache.pop(guild_id, None)
+from discord.ext import commands, tasks
+
+from utils.audit_cache import self_actions
+from utils.counters import get_counters
+from utils.dm_outbox import dm_outbox
+from utils.duplicates import duplicates, fingerprint
+from utils.enforcement import enforcer
+from utils.i18n import translator
+from utils.phishing import phishing_lists
+from utils.pipeline import MessageContext, pipeline
+from utils.purge import purger, recent_messages
+
+# 메시지 속도 제한: "rate:<gid>:<uid>" 키의 최근 10초 메시지 수 (카운터 백엔드)
+RATE_WINDOW_SEC = 10
+RATE_SWEEP_INTERVAL_SEC = 60
+PHISHING_RELOAD_INTERVAL_SEC = 60  # data/phishing/*.txt 변경 감지 주기
 
 # ── 자동 제재 규칙(요청 사양) ───────────────────────────────
 EXTRA_VIOLATIONS_TO_BAN = 10      # 도배/피싱: 임계값 초과 후 추가 10회 → BAN
@@ -42,38 +26,18 @@ OVERAGE_RESET_WINDOW_SEC = 1800   # 30분 내 누적, 초과 시 리셋
 SEV_EVERYONE_WINDOW = 120.0       # everyone/here: 2분 내
 SEV_EVERYONE_COUNT  = 3           # 3회 → BAN
 
-# overage 누적: {gid:{uid:{kind:{'count':int,'first_ts':float}}}}  kind: 'rate' | 'link'
-_overage: dict[int, dict[int, dict[str, dict]]] = {}
-# everyone 카운터: {gid:{uid:{'everyone':[ts,...]}}}
-_violations: dict[int, dict[int, dict[str, list[float]]]] = {}
-
-def _bump_overage(gid: int, uid: int, kind: str) -> bool:
-    now = time.time()
-    g = _overage.setdefault(gid, {})
-    u = g.setdefault(uid, {})
-    s = u.setdefault(kind, {"count": 0, "first_ts": now})
-    if now - s["first_ts"] > OVERAGE_RESET_WINDOW_SEC:
-        s["count"] = 0
-        s["first_ts"] = now
-    s["count"] += 1
-    if s["count"] >= EXTRA_VIOLATIONS_TO_BAN:
-        s["count"] = 0
-        s["first_ts"] = now
-        return True
-    return False
+# 위반 누적 키: "overage:<kind>:<gid>:<uid>" (kind: 'rate' | 'dup' | 'link'), "everyone:<gid>:<uid>"
+# 카운터 백엔드에 두므로 재시작/다중 프로세스에서도 이어진다
+async def _bump_overage(gid: int, uid: int, kind: str) -> bool:
+    return await get_counters().bump_overage(
+        f"overage:{kind}:{gid}:{uid}", window=OVERAGE_RESET_WINDOW_SEC, threshold=EXTRA_VIOLATIONS_TO_BAN
+    )
 
 async def _escalate_everyone_if_needed(message: discord.Message) -> bool:
-    gid, uid = message.guild.id, message.author.id
-    now = time.time()
-    vg = _violations.setdefault(gid, {})
-    vu = vg.setdefault(uid, {})
-    arr = vu.setdefault("everyone", [])
-    arr.append(now)
-    arr[:] = [t for t in arr if now - t <= SEV_EVERYONE_WINDOW]
-    if len(arr) >= SEV_EVERYONE_COUNT:
-        arr.clear()
-        return True
-    return False
+    return await get_counters().hit_window(
+        f"everyone:{message.guild.id}:{message.author.id}",
+        window=SEV_EVERYONE_WINDOW, threshold=SEV_EVERYONE_COUNT,
+    )
 
 class SpamWatchCog(commands.Cog):
     """스팸·멘션 폭탄·@everyone/@here 남용·피싱 링크 감지 (요청 조건에서만 자동 제재)"""
@@ -81,49 +45,69 @@ class SpamWatchCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_spam_config_updated(self, guild_id: int):
-        invalidate_spam_conf(guild_id)
-
-    # ── 로깅/DM ─────────────────────────────────────────────
-    async def _send_log(self, guild: discord.Guild, embed: discord.Embed) -> bool:
-        ch_id = get_log_channel(guild.id)
-        if not ch_id:
-            return False
-        ch = guild.get_channel(ch_id) or await self.bot.fetch_channel(ch_id)
-        if ch:
-            await ch.send(embed=embed)
-            return True
-        return False
+    # ── 메시지 파이프라인 등록 (락다운 다음 순서) ─────────────
+    async def cog_load(self):
+        pipeline.register("spam_rate", self._check_rate, order=20)
+        pipeline.register("spam_everyone", self._check_everyone, order=30)
+        pipeline.register("spam_mentions", self._check_mentions, order=40)
+        pipeline.register("spam_dup", self._check_dup, order=45)
+        pipeline.register("spam_link", self._check_link, order=50)
+        self._sweep_rate.start()
+        self._reload_phishing.start()
+
+    async def cog_unload(self):
+        for name in ("spam_rate", "spam_everyone", "spam_mentions", "spam_dup", "spam_link"):
+            pipeline.unregister(name)
+        self._sweep_rate.cancel()
+        self._reload_phishing.cancel()
 
-    async def _delete_and_log(self, message: discord.Message, reason_key: str, **fmt):
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        duplicates.forget_guild(guild.id)
+
+    # 말이 끊긴 유저의 버퍼·만료된 위반 기록 정리 (메모리 상한 유지)
+    @tasks.loop(seconds=RATE_SWEEP_INTERVAL_SEC)
+    async def _sweep_rate(self):
+        await get_counters().sweep()
+        duplicates.expire()
+        recent_messages.sweep(RATE_WINDOW_SEC)
+
+    # 차단/허용 목록 파일이 바뀌면 새 매처로 교체 (검사 중인 메시지는 기존 매처 사용)
+    @tasks.loop(seconds=PHISHING_RELOAD_INTERVAL_SEC)
+    async def _reload_phishing(self):
         try:
-            await message.delete()
-        except Exception:
-            pass
-
-        emb = discord.Embed(
-            title=_t(message.guild.id, "log_spam_title"),
-            color=0xE53935,
-            description=(
-                f"**User:** {message.author.mention} (`{message.author}`)\n"
-                f"**Channel:** {message.channel.mention}\n"
-                f"**Reason:** {_t(message.guild.id, reason_key, **fmt)}"
-            ),
-        )
-        if message.author.display_avatar:
-            emb.set_thumbnail(url=message.author.display_avatar.url)
-        emb.set_footer(text=_t(message.guild.id, "log_spam_footer_config"))
-        await self._send_log(message.guild, emb)
+            await phishing_lists.reload_if_changed()
+        except Exception as e:
+            print(f"❌ 피싱 목록 리로드 오류: {e}")
+
+    # ── 로깅/DM (제재 실행기에 넘기고 바로 반환) ───────────────
+    def _delete_and_log(self, ctx: MessageContext, reason_key: str, **fmt):
+        message = ctx.message
+        guild, author = ctx.guild, ctx.author
+        ctx.delete()
+
+        async def post_log():
+            tr = translator(guild.id)
+            emb = discord.Embed(
+                title=tr("log_spam_title"),
+                color=0xE53935,
+                description=(
+                    f"**User:** {author.mention} (`{author}`)\n"
+                    f"**Channel:** {message.channel.mention}\n"
+                    f"**Reason:** {tr(reason_key, **fmt)}"
+                ),
+            )
+            if author.display_avatar:
+                emb.set_thumbnail(url=author.display_avatar.url)
+            emb.set_footer(text=tr("log_spam_footer_config"))
+            await self.bot.logs.send(guild, emb)
 
-        try:
-            await message.author.send(_t(message.guild.id, "dm_spam_notice"))
-        except Exception:
-            pass
+        enforcer.submit(None, post_log)
+        dm_outbox.notify(author, translator(guild.id)("dm_spam_notice"))
 
     # ── 제재 실행(액션 하드코딩) ────────────────────────────
-    async def _moderate_user_with_action(self, message: discord.Message, *, action: str, reason_i18n_key: str, **fmt):
-        """action: 'kick' | 'ban'  (요청 조건에서만 호출)"""
+    def _moderate_user_with_action(self, message: discord.Message, *, action: str, reason_i18n_key: str, **fmt):
+        """action: 'kick' | 'ban'  (요청 조건에서만 호출). 같은 유저에 대한 같은 제재는 한 번만 실행"""
         guild = message.guild
         member: discord.Member = message.author  # type: ignore
         me: discord.Member = guild.me  # type: ignore
@@ -136,113 +120,138 @@ class SpamWatchCog(commands.Cog):
         if action == "ban" and not me.guild_permissions.ban_members:
             return
 
-        rule_reason = _t(guild.id, reason_i18n_key, **fmt)
-        final_reason = f"Violation | {rule_reason}"
-
-        try:
-            await member.send(_t(guild.id, "dm_mod_notice", action=action.upper(), reason=rule_reason))
-        except Exception:
-            pass
-
-        if action == "kick":
-            try: await member.kick(reason=final_reason)
-            except Exception: pass
-        elif action == "ban":
-            try: await guild.ban(member, reason=final_reason, delete_message_days=0)
-            except Exception: pass
-
-        col = 0xC62828 if action == "ban" else 0xEF6C00
-        emb = discord.Embed(
-            title=_t(guild.id, "log_mod_title"),
-            color=col,
-            description=(f"**Action:** {action.upper()}\n"
-                         f"**User:** {member.mention} (`{member}`)\n"
-                         f"**Reason:** {final_reason}")
-        )
-        if member.display_avatar:
-            emb.set_thumbnail(url=member.display_avatar.url)
-        await self._send_log(guild, emb)
-
-    # ── 이벤트 핸들러 ───────────────────────────────────────
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if not message.guild or message.author.bot:
-            return
-
-        guild_id = message.guild.id
-        s = get_spam_conf_cached(guild_id)
-
-        MAX_MSGS_PER_10S = int(s["max_msgs_per_10s"])
-        MAX_MENTIONS_PER_MSG = int(s["max_mentions_per_msg"])
-        BLOCK_EVERYONE_HERE = bool(s["block_everyone_here"])
-        ENABLE_LINK_FILTER = bool(s["enable_link_filter"])
-        WL: list[int] = s.get("everyone_whitelist", [])
-
-        # 도배 카운트(10s 윈도)
-        now = time.time()
-        gb = _msg_buffer.setdefault(guild_id, {})
-        ub = gb.setdefault(message.author.id, [])
-        ub.append(now)
-        gb[message.author.id] = [t for t in ub if now - t <= 10]
-
-        if len(gb[message.author.id]) > MAX_MSGS_PER_10S:
-            await self._delete_and_log(message, "log_spam_reason_rate",
-                                       count=len(gb[message.author.id]))
-            # ⬇️ 추가 10회 누적 시 BAN
-            if _bump_overage(guild_id, message.author.id, "rate"):
-                await self._moderate_user_with_action(
-                    message, action="ban", reason_i18n_key="log_spam_reason_rate",
-                    count=len(gb[message.author.id])
-                )
-            return
+        async def run():
+            tr = translator(guild.id)
+            rule_reason = tr(reason_i18n_key, **fmt)
+            final_reason = f"Violation | {rule_reason}"
+
+            try:
+                await member.send(tr("dm_mod_notice", action=action.upper(), reason=rule_reason))
+            except Exception:
+                pass
+
+            if action == "kick":
+                try: await member.kick(reason=final_reason)
+                except Exception: pass
+            elif action == "ban":
+                # modlog가 감사 로그 조회 없이 규칙까지 기록하도록 먼저 등록
+                ban = discord.AuditLogAction.ban
+                self_actions.expect(guild.id, ban, member.id, reason=final_reason,
+                                    rule="spam:" + reason_i18n_key.removeprefix("log_spam_reason_"))
+                try: await guild.ban(member, reason=final_reason, delete_message_days=0)
+                except Exception: self_actions.forget(guild.id, ban, member.id)
+
+            col = 0xC62828 if action == "ban" else 0xEF6C00
+            emb = discord.Embed(
+                title=tr("log_mod_title"),
+                color=col,
+                description=(f"**Action:** {action.upper()}\n"
+                             f"**User:** {member.mention} (`{member}`)\n"
+                             f"**Reason:** {final_reason}")
+            )
+            if member.display_avatar:
+                emb.set_thumbnail(url=member.display_avatar.url)
+            await self.bot.logs.send(guild, emb)
+
+        enforcer.submit((action, guild.id, member.id), run)
+
+    # ── 메시지 규칙 (파이프라인 단계, True=삭제 판정) ──────────
+    async def _check_rate(self, ctx: MessageContext) -> bool:
+        message = ctx.message
+        guild_id = ctx.guild.id
+        max_msgs = int(ctx.config.spam["max_msgs_per_10s"])
+
+        # 도배 카운트(10s 윈도) + 채널별 최근 메시지 id (초과 시 한꺼번에 지우기 위해)
+        count = await get_counters().hit(f"rate:{guild_id}:{message.author.id}", window=RATE_WINDOW_SEC)
+        recent_messages.add(message.channel.id, message.author.id, message.id)
+        if count <= max_msgs:
+            return False
+        # 윈도 안의 도배 메시지를 채널별 bulk delete로 (개별 삭제 호출 대신)
+        purger.purge(message.channel, recent_messages.take(message.channel.id, message.author.id, RATE_WINDOW_SEC))
+        ctx.deleted = True
+        self._delete_and_log(ctx, "log_spam_reason_rate", count=count)
+        # ⬇️ 추가 10회 누적 시 BAN
+        if await _bump_overage(guild_id, message.author.id, "rate"):
+            self._moderate_user_with_action(
+                message, action="ban", reason_i18n_key="log_spam_reason_rate",
+                count=count
+            )
+        return True
 
+    async def _check_everyone(self, ctx: MessageContext) -> bool:
+        s = ctx.config.spam
         # everyone/here (화이트리스트 제외)
-        if BLOCK_EVERYONE_HERE and message.mention_everyone:
-            author_role_ids = {r.id for r in getattr(message.author, "roles", [])}
-            if not any(rid in author_role_ids for rid in WL):
-                await self._delete_and_log(message, "log_spam_reason_everyone")
-                # ⬇️ 2분 내 3회면 BAN
-                if await _escalate_everyone_if_needed(message):
-                    await self._moderate_user_with_action(
-                        message, action="ban", reason_i18n_key="log_spam_reason_everyone"
-                    )
-                return
+        if not (bool(s["block_everyone_here"]) and ctx.message.mention_everyone):
+            return False
+        wl: list[int] = s.get("everyone_whitelist", [])
+        if any(rid in ctx.role_ids for rid in wl):
+            return False
+        self._delete_and_log(ctx, "log_spam_reason_everyone")
+        # ⬇️ 2분 내 3회면 BAN
+        if await _escalate_everyone_if_needed(ctx.message):
+            self._moderate_user_with_action(
+                ctx.message, action="ban", reason_i18n_key="log_spam_reason_everyone"
+            )
+        return True
 
+    async def _check_mentions(self, ctx: MessageContext) -> bool:
         # 멘션 과다 → 삭제만
-        total_mentions = len(message.mentions) + len(message.role_mentions)
-        if total_mentions > MAX_MENTIONS_PER_MSG:
-            await self._delete_and_log(
-                message, "log_spam_reason_mentions",
-                mentions=total_mentions, limit=MAX_MENTIONS_PER_MSG
+        limit = int(ctx.config.spam["max_mentions_per_msg"])
+        total_mentions = len(ctx.message.mentions) + len(ctx.message.role_mentions)
+        if total_mentions <= limit:
+            return False
+        self._delete_and_log(
+            ctx, "log_spam_reason_mentions",
+            mentions=total_mentions, limit=limit
+        )
+        return True
+
+    async def _check_dup(self, ctx: MessageContext) -> bool:
+        # 여러 계정이 같은 내용(정규화 지문)을 window 안에 올리면 삭제 (계정당 속도 제한을 우회하는 레이드)
+        s = ctx.config.spam
+        threshold = int(s.get("dup_authors", 0))
+        if threshold < 2:
+            return False
+        fp = fingerprint(ctx.message.content)
+        if fp is None:
+            return False
+        window = int(s.get("dup_window_sec", 60))
+        authors = duplicates.observe(ctx.guild.id, ctx.author.id, fp, window=window, threshold=threshold,
+                                     message=(ctx.message.channel.id, ctx.message.id))
+        if not authors:
+            return False
+        self._delete_and_log(ctx, "log_spam_reason_dup", authors=authors, window=window)
+        # 판정 전에 올라온 사본(처음 dup_authors-1개)도 채널별 bulk delete로
+        by_channel: dict[int, list[int]] = {}
+        for ch_id, msg_id in duplicates.take_messages(ctx.guild.id, fp):
+            by_channel.setdefault(ch_id, []).append(msg_id)
+        for ch_id, ids in by_channel.items():
+            channel = ctx.guild.get_channel_or_thread(ch_id)
+            if channel is not None:
+                purger.purge(channel, ids)
+        # ⬇️ 추가 10회 누적 시 BAN
+        if await _bump_overage(ctx.guild.id, ctx.author.id, "dup"):
+            self._moderate_user_with_action(
+                ctx.message, action="ban", reason_i18n_key="log_spam_reason_dup",
+                authors=authors, window=window
             )
-            return
+        return True
 
+    async def _check_link(self, ctx: MessageContext) -> bool:
         # 링크 필터
-        if ENABLE_LINK_FILTER:
-            content = getattr(message, "content", None)
-            if isinstance(content, str) and content:
-                urls = LINK_RE.findall(content)
-                if urls:
-                    PHISHING_KEYWORDS = ("discord-airdrop", "nitrodrop", "grabfree")
-                    for url in urls:
-                        lower = url.lower()
-                        parsed = urlparse(url)
-                        host = (parsed.netloc or "").lower()
-                        if host == "discord.gift":
-                            continue  # 공식 Nitro 선물 허용
-                        if ("discordgift" in host) or (host == "t.me") or any(k in lower for k in PHISHING_KEYWORDS):
-                            await self._delete_and_log(message, "log_spam_reason_link")
-                            # ⬇️ 추가 10회 누적 시 BAN
-                            if _bump_overage(guild_id, message.author.id, "link"):
-                                await self._moderate_user_with_action(
-                                    message, action="ban", reason_i18n_key="log_spam_reason_link"
-                                )
-                            return
-
-    @commands.Cog.listener()
-    async def on_message_edit(self, before: discord.Message, after: discord.Message):
-        if after.guild and not after.author.bot:
-            await self.on_message(after)
+        if not bool(ctx.config.spam["enable_link_filter"]) or not ctx.urls:
+            return False
+        # 허용(discord.gift 등) → 차단 도메인(하위 포함) → 키워드 (data/phishing/*.txt), 판정은 URL 캐시 우선
+        for url in ctx.urls:
+            if phishing_lists.check(url):
+                self._delete_and_log(ctx, "log_spam_reason_link")
+                # ⬇️ 추가 10회 누적 시 BAN
+                if await _bump_overage(ctx.guild.id, ctx.author.id, "link"):
+                    self._moderate_user_with_action(
+                        ctx.message, action="ban", reason_i18n_key="log_spam_reason_link"
+                    )
+                return True
+        return False
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(SpamWatchCog(bot))
@@ -3,9 +3,13 @@ import asyncio
 import datetime
 import discord
 from discord.ext import commands
-import psycopg2
 from dotenv import load_dotenv
-from utils.db import init_db
+from utils.db import init_db, close_db
+from utils.counters import init_counters, close_counters
+from utils.i18n import preload_langs
+from utils.log_dispatch import LogDispatcher
+from utils.enforcement import enforcer
+from utils.dm_outbox import dm_outbox
 
 load_dotenv()
 
@@ -18,6 +22,7 @@ class AClient(commands.Bot):
         super().__init__(command_prefix="!", intents=intents)
         self.synced = False
         self.start_time = datetime.datetime.utcnow()  # 업타임 기준(UTC)
+        self.logs = LogDispatcher(self)  # 보안 로그 채널 묶음 전송
 
     # --------- 유틸 ----------
     @staticmethod
@@ -33,8 +38,12 @@ class AClient(commands.Bot):
         return f"{minutes}m"
 
     async def setup_hook(self):
-        # 코그 로드
+        # DB 풀 생성 + 스키마 보강
         await init_db()
+        await preload_langs()
+        await init_counters()
+
+        # 코그 로드
         for filename in os.listdir("./cogs"):
             # __init__.py / 언더스코어 시작 파일은 스킵
             if not filename.endswith(".py"):
@@ -53,6 +62,14 @@ class AClient(commands.Bot):
 
         print("✅ 준비 완료")
 
+    async def close(self):
+        await enforcer.close()  # 남은 제재 작업이 로그를 더 넣을 수 있으므로 먼저
+        await self.logs.close()
+        await dm_outbox.close()
+        await super().close()
+        await close_counters()
+        await close_db()
+
     async def on_ready(self):
         print(f"✅ {self.user} 로그인 완료")
         # 로그인 직후 1회 즉시 상태 갱신
@@ -0,0 +1,171 @@
+# utils/audit_cache.py
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+
+import discord
+
+ENTRY_TTL_SEC = 60.0     # 감사 로그 항목 보관 시간 (BAN 이벤트와 짝지을 때까지)
+MAX_ENTRIES = 10_000
+WAIT_SEC = 3.0           # BAN 이벤트가 감사 로그보다 먼저 오면 이만큼만 기다림
+SELF_TTL_SEC = 120.0     # 봇이 직접 건 제재를 기억하는 시간 (호출 실패·이벤트 유실 대비)
+
+Key = tuple[int, discord.AuditLogAction, int]  # (guild_id, action, target_id)
+
+
+class Attribution:
+    """제재 실행자/사유 (감사 로그 1건에서)"""
+
+    __slots__ = ("executor", "executor_id", "reason", "expires_at")
+
+    def __init__(self, executor: discord.abc.User | None, executor_id: int | None, reason: str | None, expires_at: float):
+        self.executor = executor
+        self.executor_id = executor_id
+        self.reason = reason
+        self.expires_at = expires_at
+
+
+class AuditCorrelator:
+    """
+    on_audit_log_entry_create 게이트웨이 이벤트를 (길드, 액션, 대상) 키로 잠시 보관.
+    - on_member_ban 등은 REST 조회 대신 여기서 찾음 (없으면 WAIT_SEC까지 도착을 기다림)
+    - 짝지은 항목은 꺼내면서 지움 → BAN→UNBAN→재BAN이 이전 실행자로 잘못 기록되지 않음
+    - TTL + 개수 상한으로 메모리 유지
+    """
+
+    def __init__(self, ttl: float = ENTRY_TTL_SEC, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Key, Attribution] = OrderedDict()
+        self._waiters: dict[Key, list[asyncio.Future]] = {}
+        self.hits = 0
+        self.waited_hits = 0
+        self.misses = 0
+
+    def _expire(self, now: float):
+        # 넣은 순서 = 만료 순서
+        while self._entries:
+            key, att = next(iter(self._entries.items()))
+            if att.expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+
+    def record(self, entry: discord.AuditLogEntry):
+        target_id = getattr(entry.target, "id", None) or getattr(entry, "_target_id", None)
+        if entry.guild is None or target_id is None:
+            return
+        key = (entry.guild.id, entry.action, int(target_id))
+        now = time.monotonic()
+        att = Attribution(entry.user, entry.user_id, entry.reason, now + self.ttl)
+        # 기다리는 핸들러가 있으면 바로 넘기고 보관하지 않음
+        for fut in self._waiters.get(key, ()):
+            if not fut.done():
+                fut.set_result(att)
+                return
+        self._entries.pop(key, None)
+        self._entries[key] = att
+        self._expire(now)
+
+    def discard(self, guild_id: int, action: discord.AuditLogAction, target_id: int):
+        """짝지을 이벤트가 오지 않을 항목 정리 (예: UNBAN이 오면 남은 BAN 항목)"""
+        self._entries.pop((guild_id, action, target_id), None)
+
+    def take(self, guild_id: int, action: discord.AuditLogAction, target_id: int) -> Attribution | None:
+        """보관된 항목을 꺼냄 (한 번만 사용)"""
+        att = self._entries.pop((guild_id, action, target_id), None)
+        if att is not None and att.expires_at > time.monotonic():
+            return att
+        return None
+
+    async def wait_for(self, guild_id: int, action: discord.AuditLogAction, target_id: int,
+                       timeout: float = WAIT_SEC) -> Attribution | None:
+        att = self.take(guild_id, action, target_id)
+        if att is not None:
+            self.hits += 1
+            return att
+        key = (guild_id, action, target_id)
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(fut)
+        try:
+            att = await asyncio.wait_for(fut, timeout=timeout)
+            self.waited_hits += 1
+            return att
+        except asyncio.TimeoutError:
+            self.misses += 1
+            return None
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                if fut in waiters:
+                    waiters.remove(fut)
+                if not waiters:
+                    del self._waiters[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "waiters": sum(len(w) for w in self._waiters.values()),
+            "hits": self.hits,
+            "waited_hits": self.waited_hits,
+            "misses": self.misses,
+        }
+
+
+class SelfAction:
+    """봇이 직접 건 제재 1건 (사유 + 규칙)"""
+
+    __slots__ = ("reason", "rule", "log", "issued_at", "expires_at")
+
+    def __init__(self, reason: str, rule: str | None, log: bool, issued_at: float, expires_at: float):
+        self.reason = reason
+        self.rule = rule
+        self.log = log  # False면 modlog가 건별 로그를 남기지 않음 (요약 로그를 따로 보내는 일괄 제재)
+        self.issued_at = issued_at
+        self.expires_at = expires_at
+
+
+class SelfActions:
+    """
+    봇이 직접 건 BAN 등을 호출 직전에 등록 → modlog가 감사 로그 없이 바로 기록.
+    - claim은 꺼내면서 지움 (한 번만 사용)
+    - TTL + 개수 상한으로 메모리 유지
+    """
+
+    def __init__(self, ttl: float = SELF_TTL_SEC, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Key, SelfAction] = OrderedDict()
+        self.claimed = 0
+
+    def expect(self, guild_id: int, action: discord.AuditLogAction, target_id: int, *,
+               reason: str, rule: str | None = None, log: bool = True):
+        now = time.monotonic()
+        key = (guild_id, action, target_id)
+        self._entries.pop(key, None)
+        self._entries[key] = SelfAction(reason, rule, log, time.time(), now + self.ttl)
+        while self._entries:
+            head = next(iter(self._entries.values()))
+            if head.expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def forget(self, guild_id: int, action: discord.AuditLogAction, target_id: int):
+        """호출이 실패했을 때"""
+        self._entries.pop((guild_id, action, target_id), None)
+
+    def claim(self, guild_id: int, action: discord.AuditLogAction, target_id: int) -> SelfAction | None:
+        act = self._entries.pop((guild_id, action, target_id), None)
+        if act is None or act.expires_at <= time.monotonic():
+            return None
+        self.claimed += 1
+        return act
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "claimed": self.claimed}
+
+
+# 봇 전체가 공유하는 단일 캐시/등록부
+audit_cache = AuditCorrelator()
+self_actions = SelfActions()
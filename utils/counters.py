@@ -0,0 +1,317 @@
+# utils/counters.py
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+
+from utils.db import add_counter_deltas, fetch_counter_rows, delete_counters, purge_expired_counters
+from utils.ratelimit import SlidingWindowLimiter
+from utils.violations import ViolationStore
+
+# COUNTER_BACKEND=memory|postgres|redis
+COUNTER_BACKEND = os.getenv("COUNTER_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+FLUSH_INTERVAL_SEC = float(os.getenv("COUNTER_FLUSH_INTERVAL_SEC", "1.0"))
+
+
+class CounterBackend(ABC):
+    """
+    도배/레이드/제재 누적 카운터 공통 인터페이스. 키는 "rate:<gid>:<uid>" 같은 문자열.
+    - hit: 최근 window초 이벤트 수 (이번 이벤트 포함)
+    - bump_overage: 첫 기록부터 window 안에 threshold회 누적되면 True (리셋)
+    - hit_window: 최근 window 안에 threshold회 이상이면 True (리셋)
+    """
+
+    name = "base"
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def sweep(self):
+        """주기 정리 (만료 키 제거 등)"""
+
+    @abstractmethod
+    async def hit(self, key: str, *, window: float) -> int:
+        ...
+
+    @abstractmethod
+    async def bump_overage(self, key: str, *, window: float, threshold: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def hit_window(self, key: str, *, window: float, threshold: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def reset(self, key: str):
+        ...
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class MemoryCounterBackend(CounterBackend):
+    """단일 프로세스용 (재시작 시 초기화). 정확한 슬라이딩 윈도."""
+
+    name = "memory"
+
+    def __init__(self, maxlen: int = 128):
+        # maxlen은 설정 가능한 최대 임계값보다 커야 한다 (raid_join_count ≤ 100, max_msgs_per_10s ≤ 60)
+        self.maxlen = maxlen
+        self._limiters: dict[float, SlidingWindowLimiter] = {}
+        self._violations = ViolationStore()
+
+    async def hit(self, key: str, *, window: float) -> int:
+        lim = self._limiters.get(window)
+        if lim is None:
+            lim = self._limiters[window] = SlidingWindowLimiter(window=window, maxlen=self.maxlen)
+        return lim.hit(key)
+
+    async def bump_overage(self, key: str, *, window: float, threshold: int) -> bool:
+        return self._violations.bump_overage(key, window=window, threshold=threshold)
+
+    async def hit_window(self, key: str, *, window: float, threshold: int) -> bool:
+        return self._violations.hit_window(key, window=window, threshold=threshold)
+
+    async def reset(self, key: str):
+        for lim in self._limiters.values():
+            lim.reset(key)
+        self._violations.discard(key)
+
+    async def sweep(self):
+        for lim in self._limiters.values():
+            lim.sweep()
+        self._violations.expire()
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "windows": {w: lim.stats() for w, lim in self._limiters.items()},
+            "violations": self._violations.stats(),
+        }
+
+
+class PostgresCounterBackend(CounterBackend):
+    """
+    여러 프로세스가 공유하는 Postgres 카운터 (rate_counters 테이블).
+    - 증가분은 메모리에 모았다가 FLUSH_INTERVAL_SEC마다 executemany 한 번으로 upsert
+    - 고정 윈도 버킷 2개(이전/현재)를 가중 합산해 슬라이딩 윈도를 근사
+    - 다른 프로세스의 증가분은 flush 직후 다시 읽어 반영 (최대 flush 주기만큼 지연)
+    """
+
+    name = "postgres"
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL_SEC):
+        self.flush_interval = flush_interval
+        self._pending: dict[tuple[str, int], list] = {}  # (key, bucket) -> [delta, ttl_sec]
+        self._inflight: dict[tuple[str, int], list] = {} # flush 중인 증가분 (DB 반영 전까지 계속 셈)
+        self._remote: dict[tuple[str, int], int] = {}    # (key, bucket) -> 마지막으로 읽은 합계
+        self._touched: set[str] = set()
+        self._resets: set[str] = set()
+        self._last_seen: dict[str, tuple[float, float]] = {}  # key -> (마지막 사용 시각, window)
+        self._task: asyncio.Task | None = None
+        self.flushes = 0
+        self.flush_errors = 0
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._task is not None:
+            # 진행 중이던 flush가 되돌림을 마칠 때까지 기다린 뒤 마지막 flush
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _total(self, key: str, bucket: int) -> int:
+        p = self._pending.get((key, bucket))
+        f = self._inflight.get((key, bucket))
+        return self._remote.get((key, bucket), 0) + (p[0] if p else 0) + (f[0] if f else 0)
+
+    async def hit(self, key: str, *, window: float) -> int:
+        now = time.time()
+        bucket = int(now // window)
+        p = self._pending.get((key, bucket))
+        if p is None:
+            self._pending[(key, bucket)] = [1, window * 2]
+        else:
+            p[0] += 1
+        self._touched.add(key)
+        self._last_seen[key] = (now, window)
+        # 이전 버킷은 현재 버킷에서 지난 비율만큼 덜 센다
+        frac = (now % window) / window
+        prev = self._total(key, bucket - 1)
+        return self._total(key, bucket) + int(prev * (1.0 - frac))
+
+    async def bump_overage(self, key: str, *, window: float, threshold: int) -> bool:
+        if await self.hit(key, window=window) >= threshold:
+            await self.reset(key)
+            return True
+        return False
+
+    async def hit_window(self, key: str, *, window: float, threshold: int) -> bool:
+        return await self.bump_overage(key, window=window, threshold=threshold)
+
+    async def reset(self, key: str):
+        for k in [k for k in self._pending if k[0] == key]:
+            del self._pending[k]
+        for k in [k for k in self._inflight if k[0] == key]:
+            del self._inflight[k]
+        for k in [k for k in self._remote if k[0] == key]:
+            del self._remote[k]
+        self._resets.add(key)
+
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        self._inflight = pending
+        resets, self._resets = self._resets, set()
+        touched, self._touched = self._touched, set()
+        if not (pending or resets or touched):
+            return
+        deleted = written = False
+        try:
+            await delete_counters(list(resets))
+            deleted = True
+            await add_counter_deltas([(k, b, d, ttl) for (k, b), (d, ttl) in pending.items()])
+            written = True
+            rows = await fetch_counter_rows(list(touched))
+        except (Exception, asyncio.CancelledError) as e:
+            # 반영되지 않은 부분만 다음 flush로 되돌림 (취소돼도 증가분을 잃지 않게)
+            inflight, self._inflight = self._inflight, {}
+            if not written:
+                # flush 중 reset된 키는 _inflight에서 이미 빠져 있음
+                for k, (d, ttl) in inflight.items():
+                    cur = self._pending.setdefault(k, [0, ttl])
+                    cur[0] += d
+            if not deleted:
+                self._resets |= resets
+            self._touched |= touched
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.flush_errors += 1
+            print(f"❌ 카운터 flush 오류: {e}")
+            return
+        self.flushes += 1
+        for k in [k for k in self._remote if k[0] in touched]:
+            del self._remote[k]
+        for r in rows:
+            if r["key"] not in self._resets:  # flush 중에 reset된 키는 다시 채우지 않음
+                self._remote[(r["key"], int(r["bucket"]))] = int(r["count"])
+        self._inflight = {}
+
+    async def sweep(self):
+        now = time.time()
+        idle = {k for k, (ts, window) in self._last_seen.items() if now - ts > window * 2}
+        for k in idle:
+            del self._last_seen[k]
+        if idle:
+            for k in [k for k in self._remote if k[0] in idle]:
+                del self._remote[k]
+        try:
+            await purge_expired_counters()
+        except Exception as e:
+            print(f"❌ 카운터 정리 오류: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "pending": len(self._pending),
+            "cached": len(self._remote),
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+        }
+
+
+class RedisCounterBackend(CounterBackend):
+    """
+    Redis(또는 같은 프로토콜을 말하는 서버) 카운터.
+    - hit: sorted set 기반 정확한 슬라이딩 윈도
+    - bump_overage: INCR + 첫 증가 시 EXPIRE
+    client를 직접 넘기면 로컬 대체 서버/가짜 클라이언트도 사용 가능
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = REDIS_URL, *, client=None, prefix: str = "sentinel:"):
+        if client is None:
+            try:
+                import redis.asyncio as redis  # 선택 의존성
+            except ImportError as e:
+                raise RuntimeError("COUNTER_BACKEND=redis requires the 'redis' package") from e
+            client = redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._member = f"{os.getpid()}:"
+        self._seq = 0
+
+    async def close(self):
+        closer = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if closer:
+            await closer()
+
+    async def hit(self, key: str, *, window: float) -> int:
+        now = time.time()
+        self._seq += 1
+        k = self.prefix + key
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zadd(k, {f"{self._member}{self._seq}": now})
+        pipe.zremrangebyscore(k, 0, now - window)
+        pipe.zcard(k)
+        pipe.pexpire(k, int(window * 1000) + 1000)
+        _, _, n, _ = await pipe.execute()
+        return int(n)
+
+    async def bump_overage(self, key: str, *, window: float, threshold: int) -> bool:
+        k = self.prefix + key
+        n = await self.client.incr(k)
+        if n == 1:
+            await self.client.expire(k, int(window))
+        if n >= threshold:
+            await self.client.delete(k)
+            return True
+        return False
+
+    async def hit_window(self, key: str, *, window: float, threshold: int) -> bool:
+        if await self.hit(key, window=window) >= threshold:
+            await self.client.delete(self.prefix + key)
+            return True
+        return False
+
+    async def reset(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+
+_backend: CounterBackend = MemoryCounterBackend()
+
+def get_counters() -> CounterBackend:
+    return _backend
+
+async def init_counters(kind: str = COUNTER_BACKEND) -> CounterBackend:
+    """setup_hook에서 한 번 호출 (init_db 이후)"""
+    global _backend
+    if kind == "postgres":
+        _backend = PostgresCounterBackend()
+    elif kind == "redis":
+        _backend = RedisCounterBackend()
+    else:
+        _backend = MemoryCounterBackend()
+    await _backend.start()
+    return _backend
+
+async def close_counters():
+    await _backend.close()
@@ -1,26 +1,79 @@
 # utils/db.py
 import os, json
-import psycopg2
-from psycopg2.extras import DictCursor
+import asyncpg
 from dotenv import load_dotenv
 
+from utils.snapshot import encode_snapshot, decode_snapshot, make_delta, apply_delta
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-_conn = None
-
-def get_conn():
-    global _conn
-    if _conn is None or _conn.closed != 0:
-        _conn = psycopg2.connect(DATABASE_URL, cursor_factory=DictCursor)
-        _conn.autocommit = True
-    return _conn
+# 커넥션 풀 크기 (쿼리 대기 중에도 이벤트 루프는 계속 돈다)
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+
+_pool: asyncpg.Pool | None = None
+
+# 정책 기본값 (DB 값이 없거나 키가 빠졌을 때)
+RISK_DEFAULTS = {
+    "min_account_age_hours": 72,
+    "raid_join_window_sec": 30,
+    "raid_join_count": 5,
+}
+SPAM_DEFAULTS = {
+    "max_msgs_per_10s": 8,
+    "max_mentions_per_msg": 5,
+    "block_everyone_here": True,
+    "enable_link_filter": False,
+    "link_filter_schemeless": False,  # 스킴 없는 단축/초대 링크(discord.gg/… 등)도 검사
+    "dup_authors": 0,          # 같은 내용을 올린 서로 다른 작성자 수 (0 = 끔, 켜려면 2 이상)
+    "dup_window_sec": 60,
+    "everyone_whitelist": [],  # ✅ 기본값
+}
+LOCKDOWN_DEFAULTS = {
+    "enabled": False,
+    "min_account_age_hours": 72,
+    "min_guild_age_hours": 24,
+}
+PANIC_DEFAULTS = {
+    "enabled": False,
+    "backup": None,
+    "job": None,
+    "mode": None,        # 'channels'(채널별 덮어쓰기) | 'fast'(역할 권한 전환)
+    "fast_roles": [],    # fast 모드에서 @everyone과 함께 send_messages를 끌 역할
+}
+ENFORCE_DEFAULTS = {
+    "action": "none",
+    "ban_delete_days": 0,
+    "reason": "Violation: spam/policy",
+}
+
+def _with_defaults(base: dict, val) -> dict:
+    if not val:
+        return dict(base)
+    return {**base, **dict(val)}
+
+async def _init_conn(conn: asyncpg.Connection):
+    # JSONB <-> dict 자동 변환
+    await conn.set_type_codec("jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+def get_pool() -> asyncpg.Pool:
+    if _pool is None:
+        raise RuntimeError("DB pool is not initialized; call init_db() first")
+    return _pool
 
 async def init_db():
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
+    global _pool
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            DATABASE_URL,
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            init=_init_conn,
+        )
+    async with _pool.acquire() as conn:
+        await conn.execute("""
         CREATE TABLE IF NOT EXISTS guild_config (
           guild_id    BIGINT PRIMARY KEY,
           log_channel BIGINT,
@@ -32,7 +85,7 @@ async def init_db():
         );
         """)
         # ▶ 백업 스냅샷 저장 테이블
-        cur.execute("""
+        await conn.execute("""
         CREATE TABLE IF NOT EXISTS guild_backups (
           id         BIGSERIAL PRIMARY KEY,
           guild_id   BIGINT NOT NULL,
@@ -41,29 +94,51 @@ async def init_db():
           data       JSONB NOT NULL
         );
         """)
+        # ▶ 압축 스냅샷 (utils.snapshot). 이전 행은 data(JSONB)에 그대로 남아 있고 읽기 시 자동 판별
+        await conn.execute("ALTER TABLE guild_backups ADD COLUMN IF NOT EXISTS blob BYTEA;")
+        await conn.execute("ALTER TABLE guild_backups ALTER COLUMN data DROP NOT NULL;")
+        # ▶ 증분 백업: 베이스(전체) 스냅샷 id, NULL이면 전체
+        await conn.execute("ALTER TABLE guild_backups ADD COLUMN IF NOT EXISTS base_id BIGINT;")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_backups_base ON guild_backups (base_id) WHERE base_id IS NOT NULL;")
         # 조회 빠르게
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_backups_guild ON guild_backups (guild_id, id DESC);")
-    _ensure_columns()
-
-def _ensure_columns():
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS risk JSONB;")
-        cur.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS spam JSONB;")
-        cur.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS lockdown JSONB;")
-        cur.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS panic JSONB;")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_backups_guild ON guild_backups (guild_id, id DESC);")
+        # ▶ 도배/레이드/제재 누적 카운터 (재시작·다중 프로세스 공유용, 고정 윈도 버킷)
+        await conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_counters (
+          key        TEXT NOT NULL,
+          bucket     BIGINT NOT NULL,
+          count      INTEGER NOT NULL DEFAULT 0,
+          expires_at TIMESTAMPTZ NOT NULL,
+          PRIMARY KEY (key, bucket)
+        );
+        """)
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_counters_exp ON rate_counters (expires_at);")
+    await _ensure_columns()
+
+async def close_db():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+async def _ensure_columns():
+    async with get_pool().acquire() as conn:
+        await conn.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS risk JSONB;")
+        await conn.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS spam JSONB;")
+        await conn.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS lockdown JSONB;")
+        await conn.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS panic JSONB;")
         # ✅ 자동 제재 정책(enforce) 컬럼
-        cur.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS enforce JSONB;")
+        await conn.execute("ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS enforce JSONB;")
 
         # 기본값 주입
-        cur.execute("""UPDATE guild_config
+        await conn.execute("""UPDATE guild_config
                        SET risk = COALESCE(risk, jsonb_build_object(
                          'min_account_age_hours', 72,
                          'raid_join_window_sec', 30,
                          'raid_join_count', 5
                        ));""")
 
-        cur.execute("""UPDATE guild_config
+        await conn.execute("""UPDATE guild_config
                        SET spam = COALESCE(spam, jsonb_build_object(
                          'max_msgs_per_10s', 8,
                          'max_mentions_per_msg', 5,
@@ -72,7 +147,7 @@ def _ensure_columns():
                        ));""")
 
         # ✅ everyone_whitelist 키 보강
-        cur.execute("""
+        await conn.execute("""
         UPDATE guild_config
         SET spam = jsonb_set(
           COALESCE(spam, '{}'::jsonb),
@@ -82,300 +157,402 @@ def _ensure_columns():
         );
         """)
 
-        cur.execute("""UPDATE guild_config
+        await conn.execute("""UPDATE guild_config
                        SET lockdown = COALESCE(lockdown, jsonb_build_object(
                          'enabled', false,
                          'min_account_age_hours', 72,
                          'min_guild_age_hours', 24
                        ));""")
 
-        cur.execute("""UPDATE guild_config
+        await conn.execute("""UPDATE guild_config
                        SET panic = COALESCE(panic, jsonb_build_object(
                          'enabled', false
                        ));""")
 
         # ✅ enforce 기본값 주입 (없을 때만)
-        cur.execute("""UPDATE guild_config
+        await conn.execute("""UPDATE guild_config
                        SET enforce = COALESCE(enforce, jsonb_build_object(
                          'action','none',                -- none|kick|ban
                          'ban_delete_days', 0,           -- 0~7
                          'reason','Violation: spam/policy'
                        ));""")
 
-def upsert_guild(guild_id: int):
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO guild_config (guild_id)
-            VALUES (%s)
-            ON CONFLICT (guild_id) DO NOTHING;
-            """,
-            (guild_id,),
-        )
-
-def set_log_channel(guild_id: int, channel_id: int | None):
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO guild_config (guild_id, log_channel)
-            VALUES (%s, %s)
-            ON CONFLICT (guild_id)
-            DO UPDATE SET log_channel = EXCLUDED.log_channel;
-            """,
-            (guild_id, channel_id),
-        )
-
-def get_log_channel(guild_id: int) -> int | None:
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("SELECT log_channel FROM guild_config WHERE guild_id=%s;", (guild_id,))
-        row = cur.fetchone()
-        return int(row["log_channel"]) if row and row["log_channel"] else None
-
-def set_lang(guild_id: int, lang: str):
+async def upsert_guild(guild_id: int):
+    await get_pool().execute(
+        """
+        INSERT INTO guild_config (guild_id)
+        VALUES ($1)
+        ON CONFLICT (guild_id) DO NOTHING;
+        """,
+        guild_id,
+    )
+
+async def set_log_channel(guild_id: int, channel_id: int | None):
+    await get_pool().execute(
+        """
+        INSERT INTO guild_config (guild_id, log_channel)
+        VALUES ($1, $2)
+        ON CONFLICT (guild_id)
+        DO UPDATE SET log_channel = EXCLUDED.log_channel;
+        """,
+        guild_id, channel_id,
+    )
+
+async def get_log_channel(guild_id: int) -> int | None:
+    row = await get_pool().fetchrow("SELECT log_channel FROM guild_config WHERE guild_id=$1;", guild_id)
+    return int(row["log_channel"]) if row and row["log_channel"] else None
+
+async def set_lang(guild_id: int, lang: str):
     if lang not in ("ko", "en"):
         lang = "ko"
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO guild_config (guild_id, lang)
-            VALUES (%s, %s)
-            ON CONFLICT (guild_id)
-            DO UPDATE SET lang = EXCLUDED.lang;
-            """,
-            (guild_id, lang),
-        )
+    await get_pool().execute(
+        """
+        INSERT INTO guild_config (guild_id, lang)
+        VALUES ($1, $2)
+        ON CONFLICT (guild_id)
+        DO UPDATE SET lang = EXCLUDED.lang;
+        """,
+        guild_id, lang,
+    )
+
+async def get_lang(guild_id: int) -> str:
+    row = await get_pool().fetchrow("SELECT lang FROM guild_config WHERE guild_id=$1;", guild_id)
+    return row["lang"] if row and row["lang"] else "ko"
+
+async def get_all_langs() -> dict[int, str]:
+    """기본값(ko)이 아닌 길드 언어 전체 (시작 시 i18n 프리로드용)"""
+    rows = await get_pool().fetch("SELECT guild_id, lang FROM guild_config WHERE lang IS NOT NULL AND lang <> 'ko';")
+    return {int(r["guild_id"]): r["lang"] for r in rows}
+
+async def get_guild_config(guild_id: int) -> dict:
+    """guild_config 한 행 전체를 한 번의 쿼리로 (기본값 보정 포함)"""
+    row = await get_pool().fetchrow(
+        """
+        SELECT log_channel, lang, risk, spam, lockdown, panic, enforce
+        FROM guild_config WHERE guild_id=$1;
+        """,
+        guild_id,
+    )
+    return {
+        "log_channel": int(row["log_channel"]) if row and row["log_channel"] else None,
+        "lang": row["lang"] if row and row["lang"] else "ko",
+        "risk": _with_defaults(RISK_DEFAULTS, row["risk"] if row else None),
+        "spam": _with_defaults(SPAM_DEFAULTS, row["spam"] if row else None),
+        "lockdown": _with_defaults(LOCKDOWN_DEFAULTS, row["lockdown"] if row else None),
+        "panic": _with_defaults(PANIC_DEFAULTS, row["panic"] if row else None),
+        "enforce": _with_defaults(ENFORCE_DEFAULTS, row["enforce"] if row else None),
+    }
+
+async def get_risk_config(guild_id: int) -> dict:
+    row = await get_pool().fetchrow("SELECT risk FROM guild_config WHERE guild_id=$1;", guild_id)
+    return _with_defaults(RISK_DEFAULTS, row["risk"] if row else None)
 
-def get_lang(guild_id: int) -> str:
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("SELECT lang FROM guild_config WHERE guild_id=%s;", (guild_id,))
-        row = cur.fetchone()
-        return row["lang"] if row and row["lang"] else "ko"
-
-def get_risk_config(guild_id: int) -> dict:
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("SELECT risk FROM guild_config WHERE guild_id=%s;", (guild_id,))
-        row = cur.fetchone()
-        base = {
-            "min_account_age_hours": 72,
-            "raid_join_window_sec": 30,
-            "raid_join_count": 5,
-        }
-        if not row or not row["risk"]:
-            return base
-        val = dict(row["risk"])
-        return {**base, **val}
-
-def set_risk_config(guild_id: int, **kwargs):
+async def set_risk_config(guild_id: int, **kwargs):
     allowed = {"min_account_age_hours", "raid_join_window_sec", "raid_join_count"}
     payload = {k: v for k, v in kwargs.items() if k in allowed and v is not None}
     if not payload:
         return
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO guild_config (guild_id, risk)
-            VALUES (%s, %s::jsonb)
-            ON CONFLICT (guild_id)
-            DO UPDATE SET risk = guild_config.risk || EXCLUDED.risk;
-            """,
-            (guild_id, json.dumps(payload)),
-        )
-
-def get_spam_config(guild_id: int) -> dict:
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("SELECT spam FROM guild_config WHERE guild_id=%s;", (guild_id,))
-        row = cur.fetchone()
-        base = {
-            "max_msgs_per_10s": 8,
-            "max_mentions_per_msg": 5,
-            "block_everyone_here": True,
-            "enable_link_filter": False,
-            "everyone_whitelist": [],  # ✅ 기본값
-        }
-        if not row or not row["spam"]:
-            return base
-        val = dict(row["spam"])
-        # 누락 키 보정
-        for k, v in base.items():
-            val.setdefault(k, v)
-        return val
-
-def set_spam_config(guild_id: int, **kwargs):
+    await get_pool().execute(
+        """
+        INSERT INTO guild_config (guild_id, risk)
+        VALUES ($1, $2::jsonb)
+        ON CONFLICT (guild_id)
+        DO UPDATE SET risk = guild_config.risk || EXCLUDED.risk;
+        """,
+        guild_id, payload,
+    )
+
+async def get_spam_config(guild_id: int) -> dict:
+    row = await get_pool().fetchrow("SELECT spam FROM guild_config WHERE guild_id=$1;", guild_id)
+    # 누락 키 보정
+    return _with_defaults(SPAM_DEFAULTS, row["spam"] if row else None)
+
+async def set_spam_config(guild_id: int, **kwargs):
     allowed = {
         "max_msgs_per_10s",
         "max_mentions_per_msg",
         "block_everyone_here",
         "enable_link_filter",
+        "link_filter_schemeless",
+        "dup_authors",
+        "dup_window_sec",
         # intentionally exclude everyone_whitelist here (전용 API로 관리)
     }
     payload = {k: v for k, v in kwargs.items() if k in allowed and v is not None}
     if not payload:
         return
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO guild_config (guild_id, spam)
-            VALUES (%s, %s::jsonb)
-            ON CONFLICT (guild_id)
-            DO UPDATE SET spam = guild_config.spam || EXCLUDED.spam;
-            """,
-            (guild_id, json.dumps(payload)),
-        )
+    await get_pool().execute(
+        """
+        INSERT INTO guild_config (guild_id, spam)
+        VALUES ($1, $2::jsonb)
+        ON CONFLICT (guild_id)
+        DO UPDATE SET spam = guild_config.spam || EXCLUDED.spam;
+        """,
+        guild_id, payload,
+    )
 
 # === everyone/@here 화이트리스트 관리 ===
-def set_spam_whitelist(guild_id: int, role_ids: list[int]):
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            UPDATE guild_config
-            SET spam = jsonb_set(
-              COALESCE(spam,'{}'::jsonb),
-              '{everyone_whitelist}',
-              %s::jsonb,
-              true
-            )
-            WHERE guild_id=%s;
-            """,
-            (json.dumps([int(x) for x in role_ids]), guild_id),
+async def set_spam_whitelist(guild_id: int, role_ids: list[int]):
+    await get_pool().execute(
+        """
+        UPDATE guild_config
+        SET spam = jsonb_set(
+          COALESCE(spam,'{}'::jsonb),
+          '{everyone_whitelist}',
+          $1::jsonb,
+          true
         )
+        WHERE guild_id=$2;
+        """,
+        [int(x) for x in role_ids], guild_id,
+    )
 
-def add_spam_whitelist_role(guild_id: int, role_id: int):
-    conf = get_spam_config(guild_id)
+async def add_spam_whitelist_role(guild_id: int, role_id: int):
+    conf = await get_spam_config(guild_id)
     wl = set(int(x) for x in conf.get("everyone_whitelist", []))
     wl.add(int(role_id))
-    set_spam_whitelist(guild_id, sorted(wl))
+    await set_spam_whitelist(guild_id, sorted(wl))
 
-def remove_spam_whitelist_role(guild_id: int, role_id: int):
-    conf = get_spam_config(guild_id)
+async def remove_spam_whitelist_role(guild_id: int, role_id: int):
+    conf = await get_spam_config(guild_id)
     wl = set(int(x) for x in conf.get("everyone_whitelist", []))
     wl.discard(int(role_id))
-    set_spam_whitelist(guild_id, sorted(wl))
-
-def get_lockdown_config(guild_id: int) -> dict:
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("SELECT lockdown FROM guild_config WHERE guild_id=%s;", (guild_id,))
-        row = cur.fetchone()
-        base = {
-            "enabled": False,
-            "min_account_age_hours": 72,
-            "min_guild_age_hours": 24,
-        }
-        if not row or not row["lockdown"]:
-            return base
-        val = dict(row["lockdown"])
-        return {**base, **val}
-
-def set_lockdown_config(guild_id: int, **kwargs):
+    await set_spam_whitelist(guild_id, sorted(wl))
+
+async def get_lockdown_config(guild_id: int) -> dict:
+    row = await get_pool().fetchrow("SELECT lockdown FROM guild_config WHERE guild_id=$1;", guild_id)
+    return _with_defaults(LOCKDOWN_DEFAULTS, row["lockdown"] if row else None)
+
+async def set_lockdown_config(guild_id: int, **kwargs):
     allowed = {"enabled", "min_account_age_hours", "min_guild_age_hours"}
     payload = {k: v for k, v in kwargs.items() if k in allowed and v is not None}
     if not payload:
         return
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO guild_config (guild_id, lockdown)
-            VALUES (%s, %s::jsonb)
-            ON CONFLICT (guild_id)
-            DO UPDATE SET lockdown = guild_config.lockdown || EXCLUDED.lockdown;
-            """,
-            (guild_id, json.dumps(payload)),
-        )
-
-def get_panic_state(guild_id: int) -> dict:
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("SELECT panic FROM guild_config WHERE guild_id=%s;", (guild_id,))
-        row = cur.fetchone()
-        base = {"enabled": False, "backup": None}
-        if not row or not row["panic"]:
-            return base
-        val = dict(row["panic"])
-        return {**base, **val}
-
-def set_panic_state(guild_id: int, enabled: bool, backup: dict | None):
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO guild_config (guild_id, panic)
-            VALUES (%s, %s)
-            ON CONFLICT (guild_id)
-            DO UPDATE SET panic = EXCLUDED.panic;
-            """,
-            (guild_id, json.dumps({"enabled": enabled, "backup": backup})),
+    await get_pool().execute(
+        """
+        INSERT INTO guild_config (guild_id, lockdown)
+        VALUES ($1, $2::jsonb)
+        ON CONFLICT (guild_id)
+        DO UPDATE SET lockdown = guild_config.lockdown || EXCLUDED.lockdown;
+        """,
+        guild_id, payload,
+    )
+
+async def get_panic_state(guild_id: int) -> dict:
+    row = await get_pool().fetchrow("SELECT panic FROM guild_config WHERE guild_id=$1;", guild_id)
+    return _with_defaults(PANIC_DEFAULTS, row["panic"] if row else None)
+
+async def set_panic_state(guild_id: int, enabled: bool, backup: dict | None,
+                          job: dict | None = None, mode: str | None = None):
+    # fast_roles 같은 설정 키는 유지하고 상태 키만 덮어씀
+    await get_pool().execute(
+        """
+        INSERT INTO guild_config (guild_id, panic)
+        VALUES ($1, $2::jsonb)
+        ON CONFLICT (guild_id)
+        DO UPDATE SET panic = COALESCE(guild_config.panic, '{}'::jsonb) || EXCLUDED.panic;
+        """,
+        guild_id, {"enabled": enabled, "backup": backup, "job": job, "mode": mode},
+    )
+
+async def set_panic_fast_roles(guild_id: int, role_ids: list[int]):
+    await get_pool().execute(
+        """
+        INSERT INTO guild_config (guild_id, panic)
+        VALUES ($1, jsonb_build_object('fast_roles', $2::jsonb))
+        ON CONFLICT (guild_id)
+        DO UPDATE SET panic = COALESCE(guild_config.panic, '{}'::jsonb) || jsonb_build_object('fast_roles', $2::jsonb);
+        """,
+        guild_id, [int(x) for x in role_ids],
+    )
+
+# === 패닉 작업 체크포인트 (utils.panic_jobs) ===
+async def set_panic_job(guild_id: int, job: dict | None):
+    """진행 중인 panic/unpanic 작업 표시 (None = 없음). 재시작 시 이어서 실행할 근거"""
+    await get_pool().execute(
+        """
+        UPDATE guild_config
+        SET panic = COALESCE(panic, '{}'::jsonb) || jsonb_build_object('job', $2::jsonb)
+        WHERE guild_id=$1;
+        """,
+        guild_id, job,
+    )
+
+async def add_panic_backup(guild_id: int, entries: dict):
+    """채널별 원래 권한을 backup에 병합 (채널을 바꾸기 전에 기록)"""
+    if not entries:
+        return
+    await get_pool().execute(
+        """
+        UPDATE guild_config
+        SET panic = jsonb_set(
+          COALESCE(panic, '{}'::jsonb), '{backup}',
+          CASE WHEN jsonb_typeof(panic->'backup') = 'object' THEN panic->'backup' ELSE '{}'::jsonb END || $2::jsonb
         )
+        WHERE guild_id=$1;
+        """,
+        guild_id, entries,
+    )
+
+async def remove_panic_backup(guild_id: int, channel_ids: list[str]):
+    """원복이 끝난 채널을 backup에서 제거"""
+    if not channel_ids:
+        return
+    await get_pool().execute(
+        """
+        UPDATE guild_config
+        SET panic = jsonb_set(panic, '{backup}', (panic->'backup') - $2::text[])
+        WHERE guild_id=$1 AND jsonb_typeof(panic->'backup') = 'object';
+        """,
+        guild_id, channel_ids,
+    )
+
+async def list_panic_jobs() -> list[tuple[int, dict]]:
+    rows = await get_pool().fetch(
+        """
+        SELECT guild_id, panic->'job' AS job
+        FROM guild_config
+        WHERE jsonb_typeof(panic->'job') = 'object';
+        """
+    )
+    return [(int(r["guild_id"]), r["job"]) for r in rows]
 
 # === 백업 API ===
-def save_backup(guild_id: int, label: str | None, data: dict) -> int:
-    conn = get_conn()
-    with conn.cursor() as cur:
-        # 1) 새 백업 저장
-        cur.execute(
-            """
-            INSERT INTO guild_backups (guild_id, label, data)
-            VALUES (%s, %s, %s::jsonb)
-            RETURNING id;
-            """,
-            (guild_id, label, json.dumps(data)),
-        )
-        new_id = cur.fetchone()["id"]
-
-        # 2) 길드당 최신 3개만 유지 (나머지 삭제)
-        cur.execute(
-            """
-            DELETE FROM guild_backups g
-            USING (
-              SELECT id
-              FROM (
-                SELECT id,
-                       ROW_NUMBER() OVER (PARTITION BY guild_id ORDER BY id DESC) AS rn
-                FROM guild_backups
-                WHERE guild_id = %s
-              ) t
-              WHERE t.rn > 3
-            ) old
-            WHERE g.id = old.id;
-            """,
-            (guild_id,),
-        )
-        return new_id
-
-def list_backups(guild_id: int, limit: int = 10):
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT id, label, created_at
-            FROM guild_backups
-            WHERE guild_id=%s
-            ORDER BY id DESC
-            LIMIT %s;
-        """, (guild_id, limit))
-        return cur.fetchall()
-
-def get_backup(guild_id: int, backup_id: int) -> dict | None:
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT data FROM guild_backups
-            WHERE guild_id=%s AND id=%s;
-        """, (guild_id, backup_id))
-        row = cur.fetchone()
-        return dict(row["data"]) if row else None
-
-def delete_backup(guild_id: int, backup_id: int) -> bool:
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("DELETE FROM guild_backups WHERE guild_id=%s AND id=%s;", (guild_id, backup_id))
-        return cur.rowcount > 0
\ No newline at end of file
+# 증분 백업: 최신 전체(base_id IS NULL) 스냅샷 대비 바뀐 역할/채널만 저장 (utils.snapshot.make_delta)
+MAX_BACKUPS = 20          # 길드당 보관 개수 (델타가 참조하는 베이스는 개수와 무관하게 유지)
+REBASE_EVERY = 10         # 베이스 하나에 델타가 이만큼 쌓이면 다음 백업은 전체로
+REBASE_RATIO = 0.5        # 델타가 전체의 절반보다 크면 전체로
+
+def _row_snapshot(data, blob) -> dict:
+    if blob is not None:
+        return decode_snapshot(blob)
+    return dict(data)  # 압축 형식 이전의 JSONB 행
+
+async def save_backup(guild_id: int, label: str | None, data: dict) -> int:
+    full_blob = encode_snapshot(data)
+    async with get_pool().acquire() as conn:
+        async with conn.transaction():
+            # 1) 델타로 저장할 수 있으면 델타, 아니면 전체
+            blob, base_id = full_blob, None
+            base = await conn.fetchrow(
+                """
+                SELECT b.id, b.data, b.blob,
+                       (SELECT COUNT(*) FROM guild_backups d WHERE d.base_id = b.id) AS deltas
+                FROM guild_backups b
+                WHERE b.guild_id=$1 AND b.base_id IS NULL
+                ORDER BY b.id DESC
+                LIMIT 1;
+                """,
+                guild_id,
+            )
+            if base and base["deltas"] < REBASE_EVERY:
+                delta_blob = encode_snapshot(make_delta(_row_snapshot(base["data"], base["blob"]), data))
+                if len(delta_blob) < len(full_blob) * REBASE_RATIO:
+                    blob, base_id = delta_blob, base["id"]
+
+            new_id = await conn.fetchval(
+                """
+                INSERT INTO guild_backups (guild_id, label, blob, base_id)
+                VALUES ($1, $2, $3, $4)
+                RETURNING id;
+                """,
+                guild_id, label, blob, base_id,
+            )
+
+            # 2) 길드당 최신 MAX_BACKUPS개만 유지 (남은 델타가 참조하는 베이스는 제외)
+            await conn.execute(
+                """
+                DELETE FROM guild_backups g
+                USING (
+                  SELECT id
+                  FROM (
+                    SELECT id,
+                           ROW_NUMBER() OVER (PARTITION BY guild_id ORDER BY id DESC) AS rn
+                    FROM guild_backups
+                    WHERE guild_id = $1
+                  ) t
+                  WHERE t.rn > $2
+                ) old
+                WHERE g.id = old.id
+                  AND NOT EXISTS (SELECT 1 FROM guild_backups d WHERE d.base_id = g.id);
+                """,
+                guild_id, MAX_BACKUPS,
+            )
+            return new_id
+
+async def list_backups(guild_id: int, limit: int = 10):
+    return await get_pool().fetch("""
+        SELECT id, label, created_at, base_id
+        FROM guild_backups
+        WHERE guild_id=$1
+        ORDER BY id DESC
+        LIMIT $2;
+    """, guild_id, limit)
+
+async def get_backup(guild_id: int, backup_id: int) -> dict | None:
+    """전체 스냅샷 dict (델타면 베이스에 적용해 재구성)"""
+    row = await get_pool().fetchrow("""
+        SELECT b.data, b.blob, b.base_id, base.data AS base_data, base.blob AS base_blob
+        FROM guild_backups b
+        LEFT JOIN guild_backups base ON base.id = b.base_id
+        WHERE b.guild_id=$1 AND b.id=$2;
+    """, guild_id, backup_id)
+    if not row:
+        return None
+    snap = _row_snapshot(row["data"], row["blob"])
+    if row["base_id"] is None:
+        return snap
+    return apply_delta(_row_snapshot(row["base_data"], row["base_blob"]), snap)
+
+async def delete_backup(guild_id: int, backup_id: int) -> bool:
+    async with get_pool().acquire() as conn:
+        async with conn.transaction():
+            # 베이스를 지우면 기대고 있던 델타들은 전체 스냅샷으로 풀어 둔다
+            deps = await conn.fetch(
+                "SELECT id, blob FROM guild_backups WHERE guild_id=$1 AND base_id=$2;", guild_id, backup_id
+            )
+            if deps:
+                base = await conn.fetchrow(
+                    "SELECT data, blob FROM guild_backups WHERE guild_id=$1 AND id=$2;", guild_id, backup_id
+                )
+                base_snap = _row_snapshot(base["data"], base["blob"])
+                await conn.executemany(
+                    "UPDATE guild_backups SET blob=$2, base_id=NULL, data=NULL WHERE id=$1;",
+                    [(d["id"], encode_snapshot(apply_delta(base_snap, decode_snapshot(d["blob"])))) for d in deps],
+                )
+            status = await conn.execute("DELETE FROM guild_backups WHERE guild_id=$1 AND id=$2;", guild_id, backup_id)
+    # asyncpg는 "DELETE <n>" 상태 문자열을 돌려준다
+    return status.split()[-1] != "0"
+
+# === 카운터 API (utils.counters.PostgresCounterBackend) ===
+async def add_counter_deltas(rows: list[tuple[str, int, int, float]]):
+    """[(key, bucket, delta, ttl_sec)] 를 한 번에 upsert"""
+    if not rows:
+        return
+    await get_pool().executemany(
+        """
+        INSERT INTO rate_counters (key, bucket, count, expires_at)
+        VALUES ($1, $2, $3, NOW() + make_interval(secs => $4))
+        ON CONFLICT (key, bucket)
+        DO UPDATE SET count = rate_counters.count + EXCLUDED.count,
+                      expires_at = GREATEST(rate_counters.expires_at, EXCLUDED.expires_at);
+        """,
+        rows,
+    )
+
+async def fetch_counter_rows(keys: list[str]) -> list:
+    if not keys:
+        return []
+    return await get_pool().fetch(
+        "SELECT key, bucket, count FROM rate_counters WHERE key = ANY($1::text[]) AND expires_at > NOW();",
+        keys,
+    )
+
+async def delete_counters(keys: list[str]):
+    if not keys:
+        return
+    await get_pool().execute("DELETE FROM rate_counters WHERE key = ANY($1::text[]);", keys)
+
+async def purge_expired_counters() -> int:
+    status = await get_pool().execute("DELETE FROM rate_counters WHERE expires_at <= NOW();")
+    return int(status.split()[-1])
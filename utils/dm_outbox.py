@@ -0,0 +1,166 @@
+# utils/dm_outbox.py
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+from collections import OrderedDict
+
+import discord
+
+USER_COOLDOWN_SEC = 60.0   # 유저 1명에게 보내는 DM 최소 간격 (사이에 온 안내는 합쳐서)
+BUDGET_PER_SEC = 2.0       # 봇 전체 DM 예산 (제재 API 호출 몫을 남겨 두기 위해)
+BUDGET_BURST = 10
+MAX_PENDING_USERS = 2_000  # 대기 중인 수신자 상한 (넘치면 버림)
+CHANNEL_CACHE_SIZE = 5_000
+MAX_DM_CHARS = 2000
+
+
+class _Pending:
+    __slots__ = ("user", "notices")
+
+    def __init__(self, user: discord.abc.User):
+        self.user = user
+        self.notices: dict[str, int] = {}  # 안내 문구 -> 반복 횟수 (등장 순서 유지)
+
+
+class DMOutbox:
+    """
+    유저 안내 DM 발송함 (백그라운드 워커 1개).
+    - 유저별 쿨다운: 쿨다운 중에 온 안내는 한 통으로 합침 ("문구 (×3)")
+    - 전역 예산(토큰 버킷): 레이드 중에도 DM이 제재 호출을 밀어내지 않게
+    - DM 채널 객체 LRU 캐시: create_dm REST 호출은 처음 한 번만
+    """
+
+    def __init__(self, *, cooldown: float = USER_COOLDOWN_SEC, rate: float = BUDGET_PER_SEC,
+                 burst: int = BUDGET_BURST, max_pending: int = MAX_PENDING_USERS):
+        self.cooldown = cooldown
+        self.rate = rate
+        self.burst = burst
+        self.max_pending = max_pending
+        self._pending: dict[int, _Pending] = {}
+        self._heap: list[tuple[float, int, int]] = []  # (보낼 시각, seq, user_id)
+        self._seq = 0
+        self._last_sent: dict[int, float] = {}
+        self._channels: OrderedDict[int, discord.DMChannel] = OrderedDict()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.queued = 0
+        self.merged = 0
+        self.dropped = 0
+        self.sent = 0
+        self.failed = 0
+        self.channel_hits = 0
+        self.channel_misses = 0
+
+    def notify(self, user: discord.abc.User, text: str) -> bool:
+        """안내 1건 등록 (동기, 즉시 반환). 버려졌으면 False"""
+        p = self._pending.get(user.id)
+        if p is not None:
+            p.notices[text] = p.notices.get(text, 0) + 1
+            self.merged += 1
+            return True
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        p = self._pending[user.id] = _Pending(user)
+        p.notices[text] = 1
+        due = max(time.monotonic(), self._last_sent.get(user.id, 0.0) + self.cooldown)
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, user.id))
+        self.queued += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+        self._wake.set()
+        return True
+
+    async def _take_token(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def _worker(self):
+        while True:
+            if not self._heap:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            due = self._heap[0][0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                # 더 이른 항목이 들어오면 깨어남
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, uid = heapq.heappop(self._heap)
+            p = self._pending.pop(uid, None)
+            if p is None:
+                continue
+            await self._take_token()
+            self._last_sent[uid] = time.monotonic()
+            await self._send(p)
+            if len(self._last_sent) > self.max_pending * 4:
+                cutoff = time.monotonic() - self.cooldown
+                self._last_sent = {k: v for k, v in self._last_sent.items() if v >= cutoff}
+
+    async def _channel(self, user: discord.abc.User) -> discord.DMChannel:
+        ch = self._channels.get(user.id)
+        if ch is not None:
+            self._channels.move_to_end(user.id)
+            self.channel_hits += 1
+            return ch
+        self.channel_misses += 1
+        ch = user.dm_channel or await user.create_dm()
+        self._channels[user.id] = ch
+        if len(self._channels) > CHANNEL_CACHE_SIZE:
+            self._channels.popitem(last=False)
+        return ch
+
+    async def _send(self, p: _Pending):
+        lines = [text if n == 1 else f"{text} (×{n})" for text, n in p.notices.items()]
+        content = "\n".join(lines)[:MAX_DM_CHARS]
+        try:
+            ch = await self._channel(p.user)
+            await ch.send(content)
+            self.sent += 1
+        except (discord.Forbidden, discord.NotFound):
+            self.failed += 1  # DM 차단 등: 쿨다운은 그대로 적용
+            self._channels.pop(p.user.id, None)
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ DM 전송 오류({p.user.id}): {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.dropped += len(self._pending)
+        self._pending.clear()
+        self._heap.clear()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "queued": self.queued,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "sent": self.sent,
+            "failed": self.failed,
+            "channel_cache": len(self._channels),
+            "channel_hits": self.channel_hits,
+            "channel_misses": self.channel_misses,
+        }
+
+
+# 봇 전체가 공유하는 단일 발송함
+dm_outbox = DMOutbox()
@@ -0,0 +1,149 @@
+# utils/duplicates.py
+from __future__ import annotations
+
+import hashlib
+import time
+import unicodedata
+from collections import OrderedDict, deque
+
+MIN_NORMALIZED_LEN = 12        # 이보다 짧은 본문("ㅋㅋ", "gg")은 검사하지 않음
+MAX_FINGERPRINTS_PER_GUILD = 2_000
+BUCKET_SEC = 10                # 만료 버킷 크기 (이 단위로 한꺼번에 정리)
+MAX_TRACKED_MESSAGES = 50      # 판정 전 사본 (channel_id, message_id) 기억 수 (dup_authors 상한과 같음)
+
+
+def fingerprint(content: str) -> int | None:
+    """
+    대소문자/전각·호환 문자/공백·기호/제로폭 문자를 무시한 본문 해시 (64비트).
+    "FREE  NITRO!!" 와 "free nitro" 는 같은 지문. 너무 짧으면 None
+    """
+    if not content:
+        return None
+    text = unicodedata.normalize("NFKC", content).casefold()
+    norm = "".join(ch for ch in text if ch.isalnum())
+    if len(norm) < MIN_NORMALIZED_LEN:
+        return None
+    return int.from_bytes(hashlib.blake2b(norm.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class _Entry:
+    __slots__ = ("authors", "messages", "expires_at", "flagged")
+
+    def __init__(self):
+        self.authors: dict[int, float] = {}  # user_id -> 마지막 게시 시각
+        self.messages: deque[tuple[int, int]] | None = None  # 판정 전 사본 (판정 시 한꺼번에 삭제)
+        self.expires_at = 0.0
+        self.flagged = False
+
+
+class DuplicateIndex:
+    """
+    길드별 지문 -> 최근 작성자 목록.
+    - window 안에 서로 다른 작성자 threshold명이 같은 지문을 올리면 flagged
+      (flagged 지문은 만료 전까지 누가 올려도 바로 판정)
+    - 만료 시각을 BUCKET_SEC 단위 버킷에 모아 두고 지난 버킷만 훑어 정리
+    - 길드당 지문 수 상한, 넘으면 가장 오래 안 쓰인 것부터 제거
+    """
+
+    def __init__(self, max_per_guild: int = MAX_FINGERPRINTS_PER_GUILD, bucket_sec: float = BUCKET_SEC):
+        self.max_per_guild = max_per_guild
+        self.bucket_sec = bucket_sec
+        self._guilds: dict[int, OrderedDict[int, _Entry]] = {}
+        self._buckets: dict[int, set[tuple[int, int]]] = {}  # 버킷 번호 -> {(gid, fp)}
+        self._oldest_bucket: int | None = None
+        self.expired = 0
+        self.evicted = 0
+        self.flagged = 0
+
+    def _schedule(self, gid: int, fp: int, expires_at: float):
+        b = int(expires_at // self.bucket_sec) + 1  # 버킷이 통째로 지나면 확실히 만료
+        self._buckets.setdefault(b, set()).add((gid, fp))
+        if self._oldest_bucket is None or b < self._oldest_bucket:
+            self._oldest_bucket = b
+
+    def expire(self, now: float | None = None) -> int:
+        """지난 버킷의 지문 중 실제로 만료된 것 제거 (연장된 것은 다른 버킷에 다시 들어가 있음)"""
+        if now is None:
+            now = time.monotonic()
+        current = int(now // self.bucket_sec)
+        removed = 0
+        b = self._oldest_bucket
+        while b is not None and b <= current:
+            for gid, fp in self._buckets.pop(b, ()):
+                entries = self._guilds.get(gid)
+                entry = entries.get(fp) if entries else None
+                if entry is not None and entry.expires_at <= now:
+                    del entries[fp]
+                    removed += 1
+                    if not entries:
+                        del self._guilds[gid]
+            b = min(self._buckets) if self._buckets else None
+        self._oldest_bucket = b
+        self.expired += removed
+        return removed
+
+    def observe(self, gid: int, uid: int, fp: int, *, window: float, threshold: int,
+                message: tuple[int, int] | None = None, now: float | None = None) -> int:
+        """
+        게시 1건 기록. 판정이면 window 안의 서로 다른 작성자 수, 아니면 0.
+        message=(channel_id, message_id)를 주면 판정 전 사본으로 기억 (take_messages로 꺼냄)
+        """
+        if now is None:
+            now = time.monotonic()
+        self.expire(now)
+        entries = self._guilds.get(gid)
+        if entries is None:
+            entries = self._guilds[gid] = OrderedDict()
+        entry = entries.get(fp)
+        if entry is None:
+            entry = entries[fp] = _Entry()
+            if len(entries) > self.max_per_guild:
+                entries.popitem(last=False)
+                self.evicted += 1
+        else:
+            entries.move_to_end(fp)
+
+        authors = entry.authors
+        authors[uid] = now
+        cutoff = now - window
+        if len(authors) > 1 and min(authors.values()) < cutoff:
+            for k in [k for k, ts in authors.items() if ts < cutoff]:
+                del authors[k]
+        entry.expires_at = now + window
+        self._schedule(gid, fp, entry.expires_at)
+
+        if not entry.flagged and len(authors) >= threshold:
+            entry.flagged = True
+            self.flagged += 1
+        elif not entry.flagged and message is not None:
+            if entry.messages is None:
+                entry.messages = deque(maxlen=MAX_TRACKED_MESSAGES)
+            entry.messages.append(message)
+        return len(authors) if entry.flagged else 0
+
+    def take_messages(self, gid: int, fp: int) -> list[tuple[int, int]]:
+        """판정 전에 올라온 사본 (꺼낸 것은 잊음)"""
+        entry = self._guilds.get(gid, {}).get(fp)
+        if entry is None or not entry.messages:
+            return []
+        out = list(entry.messages)
+        entry.messages = None
+        return out
+
+    def forget_guild(self, gid: int):
+        """봇이 나간 길드의 지문 전체 제거 (남은 버킷 항목은 expire에서 건너뜀)"""
+        self._guilds.pop(gid, None)
+
+    def stats(self) -> dict:
+        return {
+            "guilds": len(self._guilds),
+            "fingerprints": sum(len(e) for e in self._guilds.values()),
+            "buckets": len(self._buckets),
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "flagged": self.flagged,
+        }
+
+
+# 봇 전체가 공유하는 단일 인덱스
+duplicates = DuplicateIndex()
@@ -0,0 +1,120 @@
+# utils/enforcement.py
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable
+
+import discord
+
+QUEUE_SIZE = 1_000       # 대기 작업 상한 (넘치면 버리고 카운트)
+NUM_WORKERS = 4
+DEDUP_TTL_SEC = 10.0     # 끝난 작업도 이 시간 동안은 같은 키로 다시 넣지 않음 (예: 같은 유저 BAN)
+
+Action = Callable[[], Awaitable[object]]
+
+
+class Enforcer:
+    """
+    제재 부수효과(삭제/BAN/KICK/DM/로그) 실행기.
+    - 메시지 리스너는 판정 후 submit만 하고 바로 돌아감 (REST 왕복을 기다리지 않음)
+    - 고정 크기 큐 + 워커 몇 개가 순서대로 실행
+    - 같은 키(예: ("ban", gid, uid))는 대기·실행 중이거나 방금 끝났으면 합쳐서 한 번만
+    """
+
+    def __init__(self, *, queue_size: int = QUEUE_SIZE, workers: int = NUM_WORKERS, dedup_ttl: float = DEDUP_TTL_SEC):
+        self.queue_size = queue_size
+        self.num_workers = workers
+        self.dedup_ttl = dedup_ttl
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._keys: dict[Hashable, float] = {}  # key -> 만료 시각 (실행 중이면 inf)
+        self.submitted = 0
+        self.deduped = 0
+        self.dropped = 0
+        self.failed = 0
+        self.done = 0
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.num_workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    def submit(self, key: Hashable | None, action: Action) -> bool:
+        """작업 등록 (동기, 즉시 반환). 중복이거나 큐가 차면 False"""
+        now = time.monotonic()
+        if key is not None:
+            exp = self._keys.get(key)
+            if exp is not None and exp > now:
+                self.deduped += 1
+                return False
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait((key, action))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        if key is not None:
+            self._keys[key] = float("inf")
+            if len(self._keys) > self.queue_size * 4:
+                self._prune(now)
+        self.submitted += 1
+        return True
+
+    def _prune(self, now: float):
+        for k in [k for k, exp in self._keys.items() if exp <= now]:
+            del self._keys[k]
+
+    async def _worker(self):
+        q = self._queue
+        while True:
+            key, action = await q.get()
+            try:
+                await action()
+                self.done += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ 제재 작업 오류({key}): {e}")
+            finally:
+                if key is not None:
+                    self._keys[key] = time.monotonic() + self.dedup_ttl
+                q.task_done()
+
+    # ── 자주 쓰는 작업 ──────────────────────────────────────
+    def delete(self, message: discord.Message) -> bool:
+        async def run():
+            try:
+                await message.delete()
+            except discord.NotFound:
+                pass
+        return self.submit(("delete", message.id), run)
+
+    async def close(self, timeout: float = 5.0):
+        """남은 작업을 잠깐 기다렸다가 워커 종료"""
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        for w in self._workers:
+            w.cancel()
+        self._workers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "workers": len(self._workers),
+            "submitted": self.submitted,
+            "deduped": self.deduped,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "done": self.done,
+        }
+
+
+# 봇 전체가 공유하는 단일 실행기
+enforcer = Enforcer()
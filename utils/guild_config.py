@@ -0,0 +1,117 @@
+# utils/guild_config.py
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+
+from utils.db import get_guild_config
+from utils.i18n import remember_lang
+
+# 캐시 크기/수명: 변경은 *_config_updated 이벤트로 즉시 무효화되고,
+# TTL은 DB를 직접 고친 경우 등을 위한 안전장치
+CACHE_MAX_GUILDS = 5000
+CACHE_TTL = 300
+
+
+class GuildConfig:
+    """guild_config 한 행의 스냅샷 (읽기 전용으로 사용)"""
+
+    __slots__ = ("guild_id", "log_channel", "lang", "risk", "spam", "lockdown", "panic", "enforce", "expires_at")
+
+    def __init__(self, guild_id: int, row: dict, expires_at: float):
+        self.guild_id = guild_id
+        self.log_channel: int | None = row["log_channel"]
+        self.lang: str = row["lang"]
+        self.risk: dict = row["risk"]
+        self.spam: dict = row["spam"]
+        self.lockdown: dict = row["lockdown"]
+        self.panic: dict = row["panic"]
+        self.enforce: dict = row["enforce"]
+        self.expires_at = expires_at
+
+
+class GuildConfigCache:
+    """길드 설정 LRU 캐시 (한 번의 쿼리로 전체 행 적재, 동시 미스는 하나로 합침)"""
+
+    def __init__(self, maxsize: int = CACHE_MAX_GUILDS, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[int, GuildConfig] = OrderedDict()
+        self._loading: dict[int, asyncio.Future] = {}
+        # invalidate마다 올라가는 세대: 적재 중에 무효화되면 그 결과는 캐시에 넣지 않음
+        self._gen: dict[int, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def peek(self, guild_id: int) -> GuildConfig | None:
+        """DB 조회 없이 캐시에 있는 값만 (만료 무시)"""
+        return self._data.get(guild_id)
+
+    async def get(self, guild_id: int) -> GuildConfig:
+        conf = self._data.get(guild_id)
+        if conf is not None and conf.expires_at > time.monotonic():
+            self._data.move_to_end(guild_id)
+            self.hits += 1
+            return conf
+
+        self.misses += 1
+        pending = self._loading.get(guild_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._loading[guild_id] = fut
+        gen = (self._epoch, self._gen.get(guild_id, 0))
+        try:
+            row = await get_guild_config(guild_id)
+            conf = GuildConfig(guild_id, row, time.monotonic() + self.ttl)
+            if gen == (self._epoch, self._gen.get(guild_id, 0)):
+                self._store(guild_id, conf)
+                # 다른 프로세스에서 바뀐 언어도 행 재적재 시 반영
+                remember_lang(guild_id, conf.lang)
+            fut.set_result(conf)
+            return conf
+        except Exception as e:
+            fut.set_exception(e)
+            # 대기자가 없으면 "never retrieved" 경고 방지
+            fut.exception()
+            raise
+        finally:
+            if not fut.done():
+                fut.cancel()
+            if self._loading.get(guild_id) is fut:
+                del self._loading[guild_id]
+
+    def _store(self, guild_id: int, conf: GuildConfig):
+        self._data[guild_id] = conf
+        self._data.move_to_end(guild_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, guild_id: int | None = None):
+        # 진행 중인 적재는 이전 값일 수 있음 → 이후 get은 새로 적재
+        if guild_id is None:
+            self._epoch += 1
+            self._data.clear()
+            self._loading.clear()
+        else:
+            self._gen[guild_id] = self._gen.get(guild_id, 0) + 1
+            self._data.pop(guild_id, None)
+            self._loading.pop(guild_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# 모든 코그가 공유하는 단일 캐시
+guild_configs = GuildConfigCache()
@@ -1,4 +1,11 @@
-from utils.db import get_lang
+import string
+import sys
+from collections import Counter
+
+from utils.db import get_all_langs
+
+# 길드별 언어 캐시 (ko가 아닌 길드만 보관, DB 조회 없이 동기 t()에서 사용)
+_langs: dict[int, str] = {}
 
 # 간단 키-문자열 사전
 TEXTS = {
@@ -33,13 +40,14 @@ TEXTS = {
         ),
         "riskset_ok": "✅ Risk 정책이 업데이트되었습니다.",
         "spamset_ok": "✅ Spam 정책이 업데이트되었습니다.",
+        "spamset_dup_authors_invalid": "❌ dup_authors는 0(끔) 또는 2 이상이어야 합니다.",
         "bool_on": "켜짐",
         "bool_off": "꺼짐",
         "panic_on": "🚨 패닉 모드가 활성화되었습니다. 모든 텍스트 채널을 읽기 전용으로 전환했습니다.",
         "panic_off": "✅ 패닉 모드가 해제되어 채널 권한을 원복했습니다.",
         "panic_already_on": "ℹ️ 이미 패닉 모드입니다.",
         "panic_already_off": "ℹ️ 패닉 모드가 아닙니다.",
-        "panic_partial_warn": "⚠️ 일부 채널 권한 원복에 실패했습니다. 수동 확인이 필요할 수 있습니다.",
+        "panic_partial_warn": "⚠️ 일부 채널/역할 권한 변경에 실패했습니다. 해제 중이었다면 패닉은 켜진 채로 남아 있으니 `/unpanic`을 다시 실행하세요.",
 
         "lockdown_on": "🛡️ 락다운이 활성화되었습니다. 신규/의심 계정의 메시지가 제한됩니다.",
         "lockdown_off": "✅ 락다운이 해제되었습니다.",
@@ -119,6 +127,7 @@ TEXTS = {
         "log_ban_title": "🚫 사용자 차단(BAN)",
         "log_ban_by_label": "실행자",
         "log_ban_reason_label": "사유",
+        "log_ban_rule_label": "규칙",
         "log_ban_by_bot": "봇(SentinelBot)",
         "log_ban_by_mod": "관리자 {mod}",
         "log_ban_by_unknown": "알 수 없음",
@@ -131,6 +140,26 @@ TEXTS = {
         "log_unban_by_mod": "관리자 {mod}",
         "log_unban_by_unknown": "알 수 없음",
         "log_unban_no_reason": "사유 미기재",
+
+        "log_raid_batch_title": "🚨 레이드 일괄 차단",
+        "log_raid_batch_body": "**차단:** {banned}명 / **실패:** {failed}명",
+        "log_raid_batch_more": "외 {count}명",
+
+        "log_spam_reason_dup": "여러 계정의 같은 내용 도배 ({authors}명 / {window}s)",
+        "auto_enforce_rule_dup": "복붙 도배: 서로 다른 계정 N명이 같은 내용을 올리면 삭제, 30분 내 추가 10회 누적 → BAN",
+
+        "restore_plan": "🧪 복구 계획 (백업 #{id}, 실제 변경 없음)\nAPI 호출 {ops}회, 예상 소요 약 {sec}초\n{detail}",
+        "restore_plan_empty": "✅ 백업 #{id}와 현재 서버가 같습니다. 복구할 항목이 없습니다.",
+
+        "panic_progress": "⏳ {kind} 진행 중: {done}/{total} 채널 처리",
+        "panic_job_running": "⏳ 이 서버에서 패닉 작업이 이미 진행 중입니다. 끝난 뒤 다시 시도해 주세요.",
+        "panic_resumed_title": "🔁 패닉 작업 재개",
+        "panic_resumed_body": "봇 재시작으로 중단된 {kind} 작업을 이어서 마쳤습니다. (실패 채널: {failed})",
+
+        "panicroles_added": "✅ 빠른 패닉 대상에 {role} 추가",
+        "panicroles_removed": "🗑️ 빠른 패닉 대상에서 {role} 제거",
+        "panicroles_list": "📄 빠른 패닉 대상 역할(@everyone 외): {roles}",
+        "panicroles_hint": "사용법: /panicroles add|remove role:@역할, /panicroles list",
     },
     "en": {
         "setlog_ok": "✅ Log channel set to {channel}.",
@@ -163,13 +192,14 @@ TEXTS = {
         ),
         "riskset_ok": "✅ Risk policy updated.",
         "spamset_ok": "✅ Spam policy updated.",
+        "spamset_dup_authors_invalid": "❌ dup_authors must be 0 (off) or at least 2.",
         "bool_on": "ON",
         "bool_off": "OFF",
         "panic_on": "🚨 Panic mode enabled. All text channels set to read-only.",
         "panic_off": "✅ Panic mode disabled. Permissions restored.",
         "panic_already_on": "ℹ️ Panic mode is already ON.",
         "panic_already_off": "ℹ️ Panic mode is not active.",
-        "panic_partial_warn": "⚠️ Failed to restore some channels. Manual review may be required.",
+        "panic_partial_warn": "⚠️ Some channel/role permission changes failed. If this was an unpanic, panic stays on — run `/unpanic` again to retry.",
 
         "lockdown_on": "🛡️ Lockdown enabled. Messages from new/suspicious accounts will be restricted.",
         "lockdown_off": "✅ Lockdown disabled.",
@@ -249,6 +279,7 @@ TEXTS = {
         "log_ban_title": "🚫 Member Banned",
         "log_ban_by_label": "Executor",
         "log_ban_reason_label": "Reason",
+        "log_ban_rule_label": "Rule",
         "log_ban_by_bot": "Bot (SentinelBot)",
         "log_ban_by_mod": "Moderator {mod}",
         "log_ban_by_unknown": "Unknown",
@@ -261,16 +292,131 @@ TEXTS = {
         "log_unban_by_mod": "Moderator {mod}",
         "log_unban_by_unknown": "Unknown",
         "log_unban_no_reason": "No reason provided",
+
+        "log_raid_batch_title": "🚨 Raid Bulk Ban",
+        "log_raid_batch_body": "**Banned:** {banned} / **Failed:** {failed}",
+        "log_raid_batch_more": "and {count} more",
+
+        "log_spam_reason_dup": "Same message from many accounts ({authors} users / {window}s)",
+        "auto_enforce_rule_dup": "Copypasta: delete once N different accounts post the same text, +10 more within 30 min → BAN",
+
+        "restore_plan": "🧪 Restore plan (backup #{id}, nothing changed)\n{ops} API calls, about {sec}s estimated\n{detail}",
+        "restore_plan_empty": "✅ The server already matches backup #{id}. Nothing to restore.",
+
+        "panic_progress": "⏳ {kind} in progress: {done}/{total} channels",
+        "panic_job_running": "⏳ A panic job is already running in this server. Try again when it finishes.",
+        "panic_resumed_title": "🔁 Panic job resumed",
+        "panic_resumed_body": "Finished the {kind} job interrupted by a bot restart. (failed channels: {failed})",
+
+        "panicroles_added": "✅ Added {role} to fast panic roles",
+        "panicroles_removed": "🗑️ Removed {role} from fast panic roles",
+        "panicroles_list": "📄 Fast panic roles (besides @everyone): {roles}",
+        "panicroles_hint": "Usage: /panicroles add|remove role:@Role, /panicroles list",
     },
 }
 
+async def preload_langs():
+    """시작 시 길드 언어를 한 번에 읽어 둔다"""
+    _langs.clear()
+    _langs.update(await get_all_langs())
+
+def remember_lang(guild_id: int, lang: str):
+    """/setlang 또는 설정 행 재적재 시 언어 캐시 갱신"""
+    if lang == "ko":
+        _langs.pop(guild_id, None)
+    else:
+        _langs[guild_id] = lang
+
+def invalidate_lang(guild_id: int | None = None):
+    if guild_id is None:
+        _langs.clear()
+    else:
+        _langs.pop(guild_id, None)
+
+# =========================
+# 컴파일된 카탈로그
+# =========================
+class _Template:
+    """리터럴/플레이스홀더로 미리 쪼개 둔 템플릿 (format 파싱·예외 처리 없이 join만)"""
+
+    __slots__ = ("text", "parts", "slots", "fields")
+
+    def __init__(self, key: str, text: str):
+        parts: list[str] = []
+        slots: list[tuple[int, str]] = []
+        for literal, field, spec, conv in string.Formatter().parse(text):
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+            if not field.isidentifier() or spec or conv:
+                raise ValueError(f"i18n: unsupported placeholder {{{field}}} in {key!r}")
+            slots.append((len(parts), sys.intern(field)))
+            parts.append("{" + field + "}")  # 값이 안 넘어오면 그대로 남김
+        self.text = text
+        self.parts = tuple(parts)
+        self.slots = tuple(slots)
+        self.fields = frozenset(f for _, f in slots)
+
+    def render(self, kwargs: dict) -> str:
+        if not self.slots or not kwargs:
+            return self.text
+        out = list(self.parts)
+        for i, field in self.slots:
+            if field in kwargs:
+                out[i] = str(kwargs[field])
+        return "".join(out)
+
+def _compile(texts: dict[str, dict[str, str]]) -> dict[str, dict[str, _Template]]:
+    return {
+        lang: {sys.intern(k): _Template(k, v) for k, v in table.items()}
+        for lang, table in texts.items()
+    }
+
+def _check_catalog(catalog: dict[str, dict[str, _Template]], base: str = "ko"):
+    """모든 언어가 기준 언어와 같은 키/플레이스홀더를 갖는지 검사"""
+    ref = catalog[base]
+    for lang, table in catalog.items():
+        if lang == base:
+            continue
+        missing = ref.keys() - table.keys()
+        extra = table.keys() - ref.keys()
+        if missing or extra:
+            raise ValueError(f"i18n: {lang} keys differ from {base} (missing={sorted(missing)}, extra={sorted(extra)})")
+        for key, tpl in ref.items():
+            if tpl.fields != table[key].fields:
+                raise ValueError(f"i18n: placeholders differ for {key!r} ({base}={sorted(tpl.fields)}, {lang}={sorted(table[key].fields)})")
+
+CATALOG = _compile(TEXTS)
+_check_catalog(CATALOG)
+
+# 카탈로그에 없는 키 요청 횟수 (키 자체를 돌려주는 fallback)
+missing_keys: Counter[str] = Counter()
+
+def _table(guild_id: int) -> dict[str, _Template]:
+    return CATALOG.get(_langs.get(guild_id, "ko"), CATALOG["ko"])
+
+def _format(table: dict[str, _Template], key: str, kwargs: dict) -> str:
+    tpl = table.get(key)
+    if tpl is None:
+        missing_keys[key] += 1
+        return key
+    return tpl.render(kwargs)
+
 def t(guild_id: int, key: str, **kwargs) -> str:
-    lang = get_lang(guild_id)
-    table = TEXTS.get(lang, TEXTS["ko"])
-    msg = table.get(key, key)
-    if kwargs:
-        try:
-            msg = msg.format(**kwargs)
-        except Exception:
-            pass
-    return msg
+    return _format(_table(guild_id), key, kwargs)
+
+class Translator:
+    """언어를 한 번만 결정해 두고 여러 키를 번역하는 핸들"""
+
+    __slots__ = ("guild_id", "table")
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.table = _table(guild_id)
+
+    def __call__(self, key: str, **kwargs) -> str:
+        return _format(self.table, key, kwargs)
+
+def translator(guild_id: int) -> Translator:
+    return Translator(guild_id)
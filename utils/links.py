@@ -0,0 +1,103 @@
+# utils/links.py
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+# 스킴 없이도 링크로 취급하는 단축/초대 도메인 (소문자, 뒤에 '/'까지 포함).
+# 길드가 link_filter_schemeless를 켰을 때만 사용: 스캠 메시지는 "discord.gg/xxx", "bit.ly/xxx"처럼
+# 스킴을 빼고 붙여 넣는 경우가 많고, 디스코드 클라이언트는 스킴 없는 초대 링크도 초대로 보여 줌.
+# 차단 목록에 없는 도메인은 추출돼도 삭제되지 않지만, 오탐 범위가 넓어지므로 기본은 끔.
+SHORTLINK_MARKERS = (
+    "www.",
+    "discord.gg/",
+    "discord.com/invite/",
+    "bit.ly/",
+    "t.me/",
+    "tinyurl.com/",
+    "goo.gl/",
+    "is.gd/",
+    "cutt.ly/",
+)
+
+_URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+# 한 번의 스캔으로 "스킴 있는 URL" 또는 "단축 도메인으로 시작하는 토큰"을 찾음
+_SHORTLINK_RE = re.compile(
+    r"https?://\S+|(?<![\w.-])(?:" + "|".join(re.escape(m) for m in SHORTLINK_MARKERS) + r")\S*",
+    re.IGNORECASE,
+)
+_TRAILING = ">)]}\"'.,!?;:"  # <url> 임베드 억제 문법, 문장 부호 등
+NORMALIZE_CACHE_SIZE = 2048  # 레이드는 같은 URL을 반복하므로 정규화 결과를 재사용
+MAX_CACHED_URL_LEN = 512
+
+
+def might_contain_link(content: str, *, shortlinks: bool = False) -> bool:
+    """정규식 전에 거르는 저비용 검사: 링크가 없을 게 확실하면 False"""
+    if "://" in content:
+        return True
+    if not shortlinks:
+        return False
+    # 모든 표식에 '.'이 있고, "www." 외에는 '/'도 있음 → 대부분의 잡담은 소문자화 전에 끝
+    if "." not in content:
+        return False
+    low = content.lower()  # 대소문자 무시 (WwW. / Discord.GG/ 등)
+    if "/" not in content:
+        return "www." in low
+    return any(m in low for m in SHORTLINK_MARKERS)
+
+
+def normalize_host(host: str) -> str:
+    """소문자, 끝의 '.' 제거, 비ASCII 라벨은 punycode(IDNA)로"""
+    host = host.lower().rstrip(".")
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")
+        except UnicodeError:
+            pass  # 인코딩 불가한 호스트는 소문자 그대로 (매처가 판정)
+    return host
+
+
+def normalize_url(raw: str) -> str:
+    """
+    스킴/호스트만 정규화한 URL (경로는 소문자화만, 판정은 어차피 소문자로 함).
+    userinfo(@ 앞)는 버리고 포트는 유지: https://discord.com@evil.ru → https://evil.ru
+    """
+    raw = raw.rstrip(_TRAILING)
+    scheme, sep, rest = raw.partition("://")
+    if not sep:
+        scheme, rest = "http", raw
+    cut = len(rest)
+    for ch in "/?#":
+        i = rest.find(ch)
+        if i != -1 and i < cut:
+            cut = i
+    authority, tail = rest[:cut], rest[cut:]
+    authority = authority.rpartition("@")[2]
+    host, colon, port = authority.partition(":")
+    if colon and not port.isdigit():
+        host, colon, port = authority, "", ""
+    return f"{scheme.lower()}://{normalize_host(host)}{colon}{port}{tail.lower()}"
+
+
+_normalize_cached = lru_cache(maxsize=NORMALIZE_CACHE_SIZE)(normalize_url)
+
+
+def extract_urls(content: str, *, shortlinks: bool = False) -> list[str]:
+    """
+    메시지 본문의 링크를 정규화해 중복 없이 (등장 순서 유지).
+    shortlinks=True면 스킴 없는 단축/초대 링크(SHORTLINK_MARKERS)도 포함.
+    """
+    if shortlinks:
+        if not content or not might_contain_link(content, shortlinks=True):
+            return []
+        found = _SHORTLINK_RE.findall(content)
+    else:
+        # 기본 경로는 함수 호출 없이 바로 거름 (모든 메시지가 지나감)
+        if not content or "://" not in content:
+            return []
+        found = _URL_RE.findall(content)
+    if len(found) == 1:
+        m = found[0]
+        return [_normalize_cached(m) if len(m) <= MAX_CACHED_URL_LEN else normalize_url(m)]
+    urls = [_normalize_cached(m) if len(m) <= MAX_CACHED_URL_LEN else normalize_url(m) for m in found]
+    return list(dict.fromkeys(urls))
@@ -0,0 +1,167 @@
+# utils/log_dispatch.py
+from __future__ import annotations
+
+import asyncio
+import time
+
+import discord
+
+from utils.guild_config import guild_configs
+
+FLUSH_WINDOW_SEC = 0.5    # 이 시간 동안 모인 임베드를 한 메시지로
+MAX_EMBEDS_PER_MSG = 10   # 디스코드 제한
+MAX_EMBED_CHARS = 6000    # 메시지 1개당 임베드 전체 글자 수 제한
+QUEUE_SIZE = 200          # 길드별 대기열 상한 (넘치면 버림)
+IDLE_EXIT_SEC = 30        # 조용한 길드의 워커/큐 정리
+MISSING_RETRY_SEC = 60    # 찾지 못한 로그 채널은 이 시간 동안 다시 조회하지 않음
+
+
+class LogDispatcher:
+    """
+    보안 로그 채널 전송 서비스.
+    - 길드별 큐 + 워커 1개, 짧은 윈도 안의 임베드를 최대 10개씩 묶어 한 번에 전송
+    - 채널 객체 캐시 (fetch_channel REST 호출은 캐시 미스 때만)
+    - 큐가 차면 버리고 카운트 → 제재 로직은 로그 전송을 기다리지 않는다
+    """
+
+    def __init__(self, bot: discord.Client, *, flush_window: float = FLUSH_WINDOW_SEC, queue_size: int = QUEUE_SIZE):
+        self.bot = bot
+        self.flush_window = flush_window
+        self.queue_size = queue_size
+        self._queues: dict[int, asyncio.Queue] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._channels: dict[int, discord.abc.Messageable] = {}
+        self._missing: dict[int, float] = {}  # guild_id -> 다시 조회할 시각
+        self.queued = 0
+        self.dropped = 0
+        self.failed = 0
+        self.messages_sent = 0
+        self.embeds_sent = 0
+
+    async def send(self, guild: discord.Guild, embed: discord.Embed) -> bool:
+        """
+        로그 채널에 닿을 수 있으면 대기열에 넣고 True (전송 완료를 기다리지 않음).
+        채널 미설정/삭제됨, 또는 대기열이 차서 버렸으면 False
+        """
+        ch_id = (await guild_configs.get(guild.id)).log_channel
+        if not ch_id or await self._channel(guild.id, ch_id) is None:
+            return False
+        q = self._queues.get(guild.id)
+        if q is None:
+            q = self._queues[guild.id] = asyncio.Queue(maxsize=self.queue_size)
+            self._workers[guild.id] = asyncio.create_task(self._worker(guild.id, q))
+        try:
+            q.put_nowait(embed)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.queued += 1
+        return True
+
+    def forget_channel(self, guild_id: int):
+        """/setlog 변경 시 캐시된 채널 객체 폐기"""
+        self._channels.pop(guild_id, None)
+        self._missing.pop(guild_id, None)
+
+    async def _channel(self, guild_id: int, ch_id: int):
+        """로그 채널 객체, 없거나 닿을 수 없으면 None"""
+        guild = self.bot.get_guild(guild_id)
+        if guild is not None:
+            # 게이트웨이 캐시가 우선: 삭제된 채널은 여기서 바로 빠짐
+            ch = guild.get_channel_or_thread(ch_id)
+            if ch is not None:
+                self._channels[guild_id] = ch
+                return ch
+        ch = self._channels.get(guild_id)
+        # 캐시에 없을 수 있는 스레드 등은 fetch해 둔 객체를 그대로 사용
+        if ch is not None and ch.id == ch_id and (guild is None or isinstance(ch, discord.Thread)):
+            return ch
+        # 삭제된 채널로 매번 REST 조회하지 않도록 실패도 잠시 기억
+        if self._missing.get(guild_id, 0.0) > time.monotonic():
+            return None
+        try:
+            ch = await self.bot.fetch_channel(ch_id)
+        except Exception:
+            self._channels.pop(guild_id, None)
+            self._missing[guild_id] = time.monotonic() + MISSING_RETRY_SEC
+            return None
+        self._missing.pop(guild_id, None)
+        self._channels[guild_id] = ch
+        return ch
+
+    async def _worker(self, guild_id: int, q: asyncio.Queue):
+        try:
+            while True:
+                try:
+                    first = await asyncio.wait_for(q.get(), timeout=IDLE_EXIT_SEC)
+                except asyncio.TimeoutError:
+                    if q.empty():
+                        return
+                    continue
+                # 짧게 기다렸다가 그동안 쌓인 것까지 한 번에
+                await asyncio.sleep(self.flush_window)
+                batch = [first]
+                while len(batch) < MAX_EMBEDS_PER_MSG and not q.empty():
+                    batch.append(q.get_nowait())
+                try:
+                    await self._deliver(guild_id, batch)
+                finally:
+                    for _ in batch:
+                        q.task_done()
+        finally:
+            self._queues.pop(guild_id, None)
+            self._workers.pop(guild_id, None)
+
+    async def _deliver(self, guild_id: int, embeds: list[discord.Embed]):
+        ch_id = (await guild_configs.get(guild_id)).log_channel
+        ch = await self._channel(guild_id, ch_id) if ch_id else None
+        if ch is None:
+            self.failed += len(embeds)
+            return
+
+        # 글자 수 제한을 넘지 않게 나눠 보냄
+        chunks: list[list[discord.Embed]] = [[]]
+        size = 0
+        for emb in embeds:
+            n = len(emb)
+            if chunks[-1] and size + n > MAX_EMBED_CHARS:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(emb)
+            size += n
+
+        for chunk in chunks:
+            try:
+                await ch.send(embeds=chunk)
+                self.messages_sent += 1
+                self.embeds_sent += len(chunk)
+            except (discord.NotFound, discord.Forbidden):
+                self.forget_channel(guild_id)
+                self.failed += len(chunk)
+            except Exception as e:
+                self.failed += len(chunk)
+                print(f"❌ 로그 전송 오류({guild_id}): {e}")
+
+    async def close(self, timeout: float = 5.0):
+        """남은 로그(전송 중인 묶음 포함)를 잠깐 기다렸다가 워커 종료"""
+        queues = list(self._queues.values())
+        if queues:
+            try:
+                await asyncio.wait_for(asyncio.gather(*(q.join() for q in queues)), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        for q in queues:
+            self.dropped += q.qsize()
+        for task in list(self._workers.values()):
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "queues": len(self._queues),
+            "pending": sum(q.qsize() for q in self._queues.values()),
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "messages_sent": self.messages_sent,
+            "embeds_sent": self.embeds_sent,
+        }
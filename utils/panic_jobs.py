@@ -0,0 +1,263 @@
+# utils/panic_jobs.py
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+import discord
+
+from utils.db import (
+    get_panic_state, set_panic_state, set_panic_job,
+    add_panic_backup, remove_panic_backup, list_panic_jobs,
+)
+from utils.restore_executor import RestoreExecutor, channel_bucket, BUCKET_ROLE_EDIT
+
+PANIC_CONCURRENCY = 5        # 동시에 권한을 바꾸는 채널 수
+CHECKPOINT_EVERY = 25        # 이 수만큼 처리할 때마다 DB에 진행 상황 기록
+PROGRESS_INTERVAL_SEC = 2.0  # 진행 상황 알림 최소 간격
+
+OnProgress = Callable[[str, int, int], Awaitable[None]]  # (kind, done, total)
+OnDone = Callable[[str, int], Awaitable[None]]           # (kind, failed)
+
+
+class PanicJobs:
+    """
+    panic/unpanic 백그라운드 작업 (길드당 1개).
+    - 채널을 바꾸기 전에 원래 권한을 묶음 단위로 panic.backup에 먼저 기록 → 중간에 죽어도 원복 가능
+    - 작업 종류는 panic.job에 남겨 두고, 재시작 후 resume_all에서 이어서 실행
+    - 채널별 버킷으로 병렬 처리 (이미 원하는 상태인 채널은 API 호출 없이 건너뜀)
+    """
+
+    def __init__(self):
+        self._tasks: dict[int, tuple[str, asyncio.Task]] = {}
+
+    def running(self, guild_id: int) -> str | None:
+        entry = self._tasks.get(guild_id)
+        return entry[0] if entry and not entry[1].done() else None
+
+    async def cancel(self, guild_id: int):
+        entry = self._tasks.pop(guild_id, None)
+        if entry and not entry[1].done():
+            entry[1].cancel()
+            try:
+                await entry[1]
+            except asyncio.CancelledError:
+                pass
+
+    def start(self, guild: discord.Guild, kind: str, *,
+              on_progress: OnProgress | None = None, on_done: OnDone | None = None) -> asyncio.Task:
+        """kind: 'panic' | 'unpanic' (DB의 panic.job은 호출하는 쪽에서 먼저 기록)"""
+        task = asyncio.create_task(self._run(guild, kind, on_progress, on_done))
+        self._tasks[guild.id] = (kind, task)
+        return task
+
+    async def resume_all(self, bot: discord.Client,
+                         on_done_for: Callable[[discord.Guild], OnDone] | None = None) -> int:
+        """재시작 전에 끝나지 못한 작업 재개, 재개한 수"""
+        resumed = 0
+        for guild_id, job in await list_panic_jobs():
+            guild = bot.get_guild(guild_id)
+            if guild is None or self.running(guild_id):
+                continue
+            self.start(guild, job.get("kind", "panic"), on_done=on_done_for(guild) if on_done_for else None)
+            resumed += 1
+        return resumed
+
+    async def close(self):
+        # 상태는 DB에 남아 있으므로 다음 실행에서 이어짐
+        for guild_id in list(self._tasks):
+            await self.cancel(guild_id)
+
+    # ── 실행 ────────────────────────────────────────────────
+    async def _run(self, guild: discord.Guild, kind: str, on_progress: OnProgress | None, on_done: OnDone | None):
+        last = 0.0
+
+        async def report(done: int, total: int):
+            nonlocal last
+            now = time.monotonic()
+            if on_progress is None or (done < total and now - last < PROGRESS_INTERVAL_SEC):
+                return
+            last = now
+            try:
+                await on_progress(kind, done, total)
+            except Exception as e:
+                print(f"❌ 패닉 진행 알림 오류({guild.id}): {e}")
+
+        try:
+            fast = (await get_panic_state(guild.id)).get("mode") == "fast"
+            if kind == "unpanic":
+                failed = await (self._unpanic_fast(guild, report) if fast else self._unpanic(guild, report))
+                if failed:
+                    # 원복 못 한 채널/역할의 기록은 남겨 두고 panic 상태 유지 → /unpanic 재시도
+                    await set_panic_job(guild.id, None)
+                else:
+                    await set_panic_state(guild.id, False, None)
+            else:
+                failed = await (self._panic_fast(guild, report) if fast else self._panic(guild, report))
+                await set_panic_job(guild.id, None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ {kind} 작업 오류({guild.id}): {e}")
+            return
+        finally:
+            entry = self._tasks.get(guild.id)
+            if entry and entry[1] is asyncio.current_task():
+                del self._tasks[guild.id]
+
+        if on_done is not None:
+            try:
+                await on_done(kind, failed)
+            except Exception as e:
+                print(f"❌ 패닉 완료 알림 오류({guild.id}): {e}")
+
+    async def _panic(self, guild: discord.Guild, report) -> int:
+        everyone = guild.default_role
+        state = await get_panic_state(guild.id)
+        recorded = set((state.get("backup") or {}).keys())
+        channels = [c for c in guild.channels if isinstance(c, discord.TextChannel)]
+        ex = RestoreExecutor(concurrency=PANIC_CONCURRENCY)
+
+        async def lock(ch: discord.TextChannel):
+            ow = ch.overwrites_for(everyone)
+            if ow.send_messages is False:
+                return
+            ow.send_messages = False
+            await ex.call(channel_bucket(ch.id), lambda: ch.set_permissions(everyone, overwrite=ow, reason="Panic ON"))
+
+        failed = 0
+        for i in range(0, len(channels), CHECKPOINT_EVERY):
+            chunk = channels[i:i + CHECKPOINT_EVERY]
+            # 체크포인트 먼저: 재개 시 이미 기록된 채널의 원래 값은 덮어쓰지 않음
+            entries = {
+                str(ch.id): {"send_messages": ch.overwrites_for(everyone).send_messages}
+                for ch in chunk if str(ch.id) not in recorded
+            }
+            await add_panic_backup(guild.id, entries)
+            recorded.update(entries)
+            failed += await ex.run(lock(ch) for ch in chunk)
+            await report(min(i + CHECKPOINT_EVERY, len(channels)), len(channels))
+        return failed
+
+    async def _unpanic(self, guild: discord.Guild, report) -> int:
+        everyone = guild.default_role
+        state = await get_panic_state(guild.id)
+        items = list((state.get("backup") or {}).items())
+        ex = RestoreExecutor(concurrency=PANIC_CONCURRENCY)
+
+        async def unlock(ch_id: str, data: dict, restored: list[str]):
+            ch = guild.get_channel(int(ch_id))
+            if isinstance(ch, discord.TextChannel):
+                ow = ch.overwrites_for(everyone)
+                value = data.get("send_messages", None)
+                if ow.send_messages != value:
+                    ow.send_messages = value
+                    await ex.call(channel_bucket(ch.id), lambda: ch.set_permissions(everyone, overwrite=ow, reason="Panic OFF"))
+            restored.append(ch_id)  # 없어진 채널도 처리 완료로
+
+        failed = 0
+        for i in range(0, len(items), CHECKPOINT_EVERY):
+            restored: list[str] = []
+            failed += await ex.run(unlock(ch_id, data, restored) for ch_id, data in items[i:i + CHECKPOINT_EVERY])
+            await remove_panic_backup(guild.id, restored)
+            await report(min(i + CHECKPOINT_EVERY, len(items)), len(items))
+        return failed
+
+    # ── fast 모드: 역할 권한 전환 (채널 수와 무관하게 호출 몇 번) ──
+    # backup = {"roles": {role_id: send_messages 비트}, "channels": {ch_id: {role_id: True}},
+    #           "members": {ch_id: {member_id: True}}}  (채널에서 send_messages를 따로 허용한 덮어쓰기)
+    async def _panic_fast(self, guild: discord.Guild, report) -> int:
+        state = await get_panic_state(guild.id)
+        backup = state.get("backup") or {}
+        roles = _fast_roles(guild, state.get("fast_roles") or [])
+        role_ids = {r.id for r in roles}
+
+        if "roles" not in backup:
+            # 바꾸기 전에 한 번에 기록 (재개 시에는 이미 바뀐 값을 원래 값으로 착각하지 않도록 건너뜀)
+            channels: dict[str, dict[str, bool]] = {}
+            members: dict[str, dict[str, bool]] = {}
+            me_id = guild.me.id if guild.me else None
+            for ch in guild.channels:
+                # 로컬 스캔: 대상 역할 또는 개별 멤버에게 send_messages를 명시적으로 다시 허용한 채널만
+                grants, member_grants = {}, {}
+                for t, ow in ch.overwrites.items():
+                    if ow.send_messages is not True:
+                        continue
+                    if isinstance(t, discord.Role) and t.id in role_ids:
+                        grants[str(t.id)] = True
+                    elif isinstance(t, discord.Member) and t.id != me_id:
+                        member_grants[str(t.id)] = True
+                if grants:
+                    channels[str(ch.id)] = grants
+                if member_grants:
+                    members[str(ch.id)] = member_grants
+            backup = {"roles": {str(r.id): r.permissions.send_messages for r in roles},
+                      "channels": channels, "members": members}
+            await add_panic_backup(guild.id, backup)
+
+        ex = RestoreExecutor(concurrency=PANIC_CONCURRENCY)
+        failed = await ex.run(
+            [_set_role_send(ex, guild.get_role(int(rid)), False) for rid in backup["roles"]]
+            + [_set_channel_send(ex, guild, ch_id, {t: None for t in grants})
+               for ch_id, grants in backup["channels"].items()]
+            + [_set_channel_send(ex, guild, ch_id, {t: None for t in grants}, members=True)
+               for ch_id, grants in (backup.get("members") or {}).items()]
+        )
+        await report(1, 1)
+        return failed
+
+    async def _unpanic_fast(self, guild: discord.Guild, report) -> int:
+        backup = (await get_panic_state(guild.id)).get("backup") or {}
+        ex = RestoreExecutor(concurrency=PANIC_CONCURRENCY)
+        failed = await ex.run(
+            [_set_role_send(ex, guild.get_role(int(rid)), bool(v)) for rid, v in (backup.get("roles") or {}).items()]
+            + [_set_channel_send(ex, guild, ch_id, grants) for ch_id, grants in (backup.get("channels") or {}).items()]
+            + [_set_channel_send(ex, guild, ch_id, grants, members=True)
+               for ch_id, grants in (backup.get("members") or {}).items()]
+        )
+        await report(1, 1)
+        return failed
+
+
+def _fast_roles(guild: discord.Guild, role_ids: list[int]) -> list[discord.Role]:
+    """@everyone + 설정된 역할 중 봇이 수정할 수 있는 것"""
+    me = guild.me
+    roles = [guild.default_role]
+    for rid in role_ids:
+        role = guild.get_role(int(rid))
+        if role and not role.is_default() and not role.managed and (me is None or role < me.top_role):
+            roles.append(role)
+    return roles
+
+
+async def _set_role_send(ex: RestoreExecutor, role: discord.Role | None, value: bool):
+    """역할의 send_messages 비트만 바꿈 (다른 권한은 그대로)"""
+    if role is None or role.permissions.send_messages == value:
+        return
+    perms = discord.Permissions(role.permissions.value)
+    perms.send_messages = value
+    reason = "Panic ON (fast)" if not value else "Panic OFF (fast)"
+    await ex.call(BUCKET_ROLE_EDIT, lambda: role.edit(permissions=perms, reason=reason))
+
+
+async def _set_channel_send(ex: RestoreExecutor, guild: discord.Guild, ch_id: str, values: dict[str, bool | None],
+                            *, members: bool = False):
+    """채널의 역할별(members=True면 멤버별) 덮어쓰기에서 send_messages만 values로 (None = 상속)"""
+    ch = guild.get_channel(int(ch_id))
+    if ch is None:
+        return
+    for target_id, value in values.items():
+        target = guild.get_member(int(target_id)) if members else guild.get_role(int(target_id))
+        if target is None:
+            continue  # 나간 멤버/지운 역할
+        ow = ch.overwrites_for(target)
+        if ow.send_messages == value:
+            continue
+        ow.send_messages = value
+        reason = "Panic ON (fast)" if value is None else "Panic OFF (fast)"
+        await ex.call(channel_bucket(ch.id), lambda: ch.set_permissions(target, overwrite=ow, reason=reason))
+
+
+# 봇 전체가 공유하는 단일 작업 관리자
+panic_jobs = PanicJobs()
@@ -0,0 +1,249 @@
+# utils/phishing.py
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import OrderedDict, deque
+from urllib.parse import urlparse
+
+# 목록 파일 위치: 한 줄에 하나, '#' 이후는 주석
+LIST_DIR = os.getenv(
+    "PHISHING_LIST_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "phishing"),
+)
+BLOCKLIST_FILE = "blocklist.txt"   # 도메인 (하위 도메인 포함 차단)
+ALLOWLIST_FILE = "allowlist.txt"   # 도메인 (차단 목록/키워드보다 우선 허용)
+KEYWORDS_FILE = "keywords.txt"     # 호스트 이름에 포함되면 차단 (경로/쿼리는 보지 않음)
+
+VERDICT_CACHE_SIZE = 20_000        # URL 판정 캐시 (모든 길드 공유)
+MAX_CACHED_URL_LEN = 512           # 이보다 긴 URL은 캐시하지 않음 (메모리 상한)
+
+_END = ""  # 트라이 종료 표시 (라벨은 빈 문자열이 될 수 없음)
+
+
+class DomainTrie:
+    """라벨을 뒤집어(TLD부터) 저장한 접미사 트라이: 도메인 자체와 모든 하위 도메인에 매치"""
+
+    def __init__(self, domains=()):
+        self._root: dict = {}
+        self.size = 0
+        for d in domains:
+            self.add(d)
+
+    def add(self, domain: str):
+        domain = domain.strip().strip(".").lower()
+        if not domain:
+            return
+        node = self._root
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        if _END not in node:
+            node[_END] = domain
+            self.size += 1
+
+    def match(self, host: str) -> str | None:
+        """host 또는 그 상위 도메인이 등록돼 있으면 등록된 도메인을 돌려줌"""
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                return None
+            hit = node.get(_END)
+            if hit is not None:
+                return hit
+        return None
+
+
+class KeywordAutomaton:
+    """Aho-Corasick: 키워드 수와 무관하게 텍스트 길이에 비례하는 한 번의 스캔"""
+
+    def __init__(self, keywords=()):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[str | None] = [None]
+        self.size = 0
+        for kw in keywords:
+            self._add(kw)
+        self._build()
+
+    def _add(self, kw: str):
+        kw = kw.strip().lower()
+        if not kw:
+            return
+        state = 0
+        for ch in kw:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+                self._goto[state][ch] = nxt
+            state = nxt
+        if self._out[state] is None:
+            self.size += 1
+        self._out[state] = kw
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            s = queue.popleft()
+            for ch, nxt in self._goto[s].items():
+                queue.append(nxt)
+                f = self._fail[s]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                # 접미사 상태의 출력도 이어받음 (첫 매치만 필요하므로 하나면 충분)
+                if self._out[nxt] is None:
+                    self._out[nxt] = self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> str | None:
+        """처음 발견된 키워드 (없으면 None). text는 소문자여야 함"""
+        if not self.size:
+            return None
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state] is not None:
+                return out[state]
+        return None
+
+
+class PhishingMatcher:
+    """허용 목록 → 차단 도메인 → 키워드 순으로 판정 (불변 객체, 통째로 교체해 리로드)"""
+
+    def __init__(self, blocked=(), allowed=(), keywords=()):
+        self.blocked = DomainTrie(blocked)
+        self.allowed = DomainTrie(allowed)
+        self.keywords = KeywordAutomaton(keywords)
+
+    def check(self, url: str, host: str) -> str | None:
+        """url/host는 소문자. 차단 사유("domain:<d>" | "keyword:<k>") 또는 None"""
+        if host and self.allowed.match(host):
+            return None
+        if host:
+            hit = self.blocked.match(host)
+            if hit:
+                return f"domain:{hit}"
+        # 호스트만 검사: "example.com/blog/discordgift-scams" 같은 경로·쿼리는 오탐이 되므로 제외
+        kw = self.keywords.search(host) if host else None
+        if kw:
+            return f"keyword:{kw}"
+        return None
+
+
+_NO_MATCH = ""  # 캐시에 "차단 아님"을 저장하는 표시
+
+
+class VerdictCache:
+    """정규화 URL -> 판정 LRU. 같은 스캠 URL이 반복되면 dict 조회 한 번으로 끝"""
+
+    def __init__(self, maxsize: int = VERDICT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> str | None:
+        """판정(차단 아님이면 _NO_MATCH), 캐시에 없으면 None"""
+        v = self._data.get(key)
+        if v is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return v
+
+    def put(self, key: str, verdict: str | None):
+        self._data[key] = verdict or _NO_MATCH
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def _read_list(path: str) -> list[str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [ln.split("#", 1)[0].strip() for ln in f if ln.split("#", 1)[0].strip()]
+    except FileNotFoundError:
+        return []
+
+
+def load_matcher(list_dir: str = LIST_DIR) -> PhishingMatcher:
+    return PhishingMatcher(
+        blocked=_read_list(os.path.join(list_dir, BLOCKLIST_FILE)),
+        allowed=_read_list(os.path.join(list_dir, ALLOWLIST_FILE)),
+        keywords=_read_list(os.path.join(list_dir, KEYWORDS_FILE)),
+    )
+
+
+class PhishingLists:
+    """
+    현재 매처 보관 + 파일 변경 시 백그라운드 스레드에서 새로 만들어 참조만 바꿔치기.
+    검사 중인 메시지는 이전 매처를 그대로 쓰므로 리로드 중에도 누락 없음.
+    """
+
+    def __init__(self, list_dir: str = LIST_DIR):
+        self.list_dir = list_dir
+        self.matcher = load_matcher(list_dir)
+        self.verdicts = VerdictCache()
+        self._mtimes = self._stat()
+        self.reloads = 0
+
+    def check(self, url: str) -> str | None:
+        """URL 1건 판정 (캐시 우선). 차단 사유 또는 None"""
+        key = url.lower()
+        cached = self.verdicts.get(key)
+        if cached is not None:
+            return cached or None
+        try:
+            host = urlparse(key).hostname or ""
+        except ValueError:
+            host = ""
+        verdict = self.matcher.check(key, host)
+        if len(key) <= MAX_CACHED_URL_LEN:
+            self.verdicts.put(key, verdict)
+        return verdict
+
+    def _stat(self) -> tuple:
+        out = []
+        for name in (BLOCKLIST_FILE, ALLOWLIST_FILE, KEYWORDS_FILE):
+            try:
+                out.append(os.stat(os.path.join(self.list_dir, name)).st_mtime_ns)
+            except FileNotFoundError:
+                out.append(None)
+        return tuple(out)
+
+    async def reload_if_changed(self) -> bool:
+        mtimes = self._stat()
+        if mtimes == self._mtimes:
+            return False
+        matcher = await asyncio.to_thread(load_matcher, self.list_dir)
+        self.matcher = matcher
+        self.verdicts.clear()  # 이전 목록 기준 판정 폐기
+        self._mtimes = mtimes
+        self.reloads += 1
+        return True
+
+
+phishing_lists = PhishingLists()
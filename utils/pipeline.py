@@ -0,0 +1,112 @@
+# utils/pipeline.py
+from __future__ import annotations
+
+from typing import Awaitable, Callable
+
+import discord
+
+from utils.enforcement import enforcer
+from utils.guild_config import GuildConfig, guild_configs
+from utils.links import extract_urls
+from utils.purge import recent_messages
+
+
+class MessageContext:
+    """메시지 1건에 대해 모든 규칙이 공유하는 값 (필요할 때 한 번만 계산)"""
+
+    __slots__ = ("message", "guild", "author", "config", "is_edit", "deleted",
+                 "_role_ids", "_perms", "_urls")
+
+    def __init__(self, message: discord.Message, config: GuildConfig, *, is_edit: bool = False):
+        self.message = message
+        self.guild: discord.Guild = message.guild  # type: ignore
+        self.author: discord.Member = message.author  # type: ignore
+        self.config = config
+        self.is_edit = is_edit
+        self.deleted = False
+        self._role_ids: set[int] | None = None
+        self._perms: discord.Permissions | None = None
+        self._urls: list[str] | None = None
+
+    @property
+    def role_ids(self) -> set[int]:
+        if self._role_ids is None:
+            self._role_ids = {r.id for r in getattr(self.author, "roles", [])}
+        return self._role_ids
+
+    @property
+    def permissions(self) -> discord.Permissions:
+        if self._perms is None:
+            self._perms = self.message.channel.permissions_for(self.author)
+        return self._perms
+
+    @property
+    def urls(self) -> list[str]:
+        """정규화된 링크 목록 (링크가 없어 보이면 정규식도 돌리지 않음)"""
+        if self._urls is None:
+            content = self.message.content
+            shortlinks = bool(self.config.spam.get("link_filter_schemeless", False))
+            self._urls = extract_urls(content, shortlinks=shortlinks) if isinstance(content, str) else []
+        return self._urls
+
+    def delete(self) -> bool:
+        """메시지 삭제는 파이프라인 전체에서 한 번만 (실제 REST 호출은 제재 실행기에서)"""
+        if not self.deleted:
+            enforcer.delete(self.message)
+            # 뒤이은 도배 일괄 삭제 묶음에 섞여 묶음 전체가 실패하지 않도록
+            recent_messages.discard(self.message.channel.id, self.author.id, self.message.id)
+            self.deleted = True
+        return True
+
+
+# 규칙 단계: True를 돌려주면(삭제 판정) 뒤 단계는 건너뜀
+Stage = Callable[[MessageContext], Awaitable[bool]]
+
+
+class _Entry:
+    __slots__ = ("name", "order", "stage", "on_edit")
+
+    def __init__(self, name: str, order: int, stage: Stage, on_edit: bool):
+        self.name = name
+        self.order = order
+        self.stage = stage
+        self.on_edit = on_edit
+
+
+class MessagePipeline:
+    """순서가 있는 메시지 검사 규칙 레지스트리"""
+
+    def __init__(self):
+        self._entries: list[_Entry] = []
+
+    def register(self, name: str, stage: Stage, *, order: int, on_edit: bool = True):
+        self.unregister(name)
+        self._entries.append(_Entry(name, order, stage, on_edit))
+        self._entries.sort(key=lambda e: e.order)
+
+    def unregister(self, name: str):
+        self._entries = [e for e in self._entries if e.name != name]
+
+    @property
+    def stages(self) -> list[str]:
+        return [e.name for e in self._entries]
+
+    async def run(self, message: discord.Message, *, is_edit: bool = False) -> str | None:
+        """삭제 판정을 내린 단계 이름(없으면 None)"""
+        if not message.guild or message.author.bot or not self._entries:
+            return None
+        config = await guild_configs.get(message.guild.id)
+        ctx = MessageContext(message, config, is_edit=is_edit)
+        for entry in self._entries:
+            if is_edit and not entry.on_edit:
+                continue
+            try:
+                if await entry.stage(ctx):
+                    return entry.name
+            except Exception as e:
+                print(f"❌ 메시지 규칙 오류({entry.name}): {e}")
+        return None
+
+
+# 봇 전체가 공유하는 단일 파이프라인
+pipeline = MessagePipeline()
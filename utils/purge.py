@@ -0,0 +1,130 @@
+# utils/purge.py
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+
+import discord
+
+from utils.enforcement import enforcer
+
+RECENT_PER_USER = 100     # (채널, 유저)별로 기억하는 최근 메시지 수 (bulk delete 1회 한도와 같음)
+PURGE_WINDOW_SEC = 1.0    # 이 시간 동안 모인 삭제 요청을 채널별로 한 번에
+BULK_DELETE_MAX = 100     # 디스코드 bulk delete 한도
+
+
+class RecentMessages:
+    """(channel_id, user_id) -> 최근 (시각, message_id) 링버퍼"""
+
+    def __init__(self, maxlen: int = RECENT_PER_USER):
+        self.maxlen = maxlen
+        self._data: dict[tuple[int, int], deque[tuple[float, int]]] = {}
+
+    def add(self, channel_id: int, user_id: int, message_id: int, now: float | None = None):
+        key = (channel_id, user_id)
+        dq = self._data.get(key)
+        if dq is None:
+            dq = self._data[key] = deque(maxlen=self.maxlen)
+        dq.append((time.monotonic() if now is None else now, message_id))
+
+    def discard(self, channel_id: int, user_id: int, message_id: int):
+        """다른 경로로 이미 지운 메시지는 일괄 삭제 대상에서 뺌"""
+        dq = self._data.get((channel_id, user_id))
+        if dq:
+            for item in dq:
+                if item[1] == message_id:
+                    dq.remove(item)
+                    break
+
+    def take(self, channel_id: int, user_id: int, window: float, now: float | None = None) -> list[int]:
+        """최근 window초 안의 메시지 id를 꺼냄 (꺼낸 것은 잊음)"""
+        dq = self._data.pop((channel_id, user_id), None)
+        if not dq:
+            return []
+        cutoff = (time.monotonic() if now is None else now) - window
+        return [mid for ts, mid in dq if ts >= cutoff]
+
+    def sweep(self, window: float, now: float | None = None) -> int:
+        cutoff = (time.monotonic() if now is None else now) - window
+        idle = [k for k, dq in self._data.items() if not dq or dq[-1][0] < cutoff]
+        for k in idle:
+            del self._data[k]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class BulkPurger:
+    """
+    채널별 삭제 대기열: PURGE_WINDOW_SEC 동안 모은 id를 delete_messages(최대 100개씩)로 한 번에.
+    실제 호출은 제재 실행기(enforcer)에서.
+    묶음이 실패하면(이미 지워진 id가 섞인 경우 등) 그 묶음만 한 건씩 다시 지움.
+    """
+
+    def __init__(self, window: float = PURGE_WINDOW_SEC):
+        self.window = window
+        self._pending: dict[int, tuple[discord.abc.Messageable, set[int]]] = {}
+        self.requested = 0
+        self.calls = 0
+        self.fallbacks = 0
+        self.failed = 0
+
+    def purge(self, channel: discord.abc.Messageable, message_ids) -> int:
+        entry = self._pending.get(channel.id)
+        if entry is None:
+            entry = self._pending[channel.id] = (channel, set())
+            asyncio.get_running_loop().call_later(self.window, self._flush, channel.id)
+        before = len(entry[1])
+        entry[1].update(message_ids)
+        added = len(entry[1]) - before
+        self.requested += added
+        return added
+
+    def _flush(self, channel_id: int):
+        entry = self._pending.pop(channel_id, None)
+        if entry is None:
+            return
+        channel, ids = entry
+        ordered = sorted(ids)
+        for i in range(0, len(ordered), BULK_DELETE_MAX):
+            chunk = [discord.Object(id=mid) for mid in ordered[i:i + BULK_DELETE_MAX]]
+            enforcer.submit(None, lambda chunk=chunk: self._delete(channel, chunk))
+
+    async def _delete(self, channel, chunk: list[discord.Object]):
+        self.calls += 1
+        try:
+            # 1개면 discord.py가 단건 삭제로 처리
+            await channel.delete_messages(chunk, reason="Flood purge")
+            return
+        except discord.NotFound:
+            if len(chunk) == 1:
+                return
+        except discord.HTTPException:
+            if len(chunk) == 1:
+                self.failed += 1
+                raise
+        # 묶음 하나가 잘못된 id 때문에 통째로 실패 → 한 건씩 (없는 메시지는 무시)
+        self.fallbacks += 1
+        for obj in chunk:
+            self.calls += 1
+            try:
+                await channel.get_partial_message(obj.id).delete()
+            except discord.NotFound:
+                pass
+            except discord.HTTPException:
+                self.failed += 1
+
+    def stats(self) -> dict:
+        return {
+            "pending_channels": len(self._pending),
+            "requested": self.requested,
+            "calls": self.calls,
+            "fallbacks": self.fallbacks,
+            "failed": self.failed,
+        }
+
+
+recent_messages = RecentMessages()
+purger = BulkPurger()
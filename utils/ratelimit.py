@@ -0,0 +1,74 @@
+# utils/ratelimit.py
+from __future__ import annotations
+
+import sys
+import time
+from collections import deque
+from typing import Hashable
+
+
+class SlidingWindowLimiter:
+    """
+    키(예: (guild_id, user_id))별 최근 이벤트 시각을 고정 크기 링버퍼에 보관하는 슬라이딩 윈도 카운터.
+    - hit(): O(1) 분할상환 (만료분만 왼쪽에서 pop)
+    - sweep(): 윈도를 벗어난(말이 없는) 키 제거 → 메모리 상한 유지
+    """
+
+    def __init__(self, window: float, maxlen: int = 64):
+        # maxlen은 설정 가능한 최대 임계값(+1)보다 커야 초과를 판정할 수 있다
+        self.window = window
+        self.maxlen = maxlen
+        self._buckets: dict[Hashable, deque[float]] = {}
+        self.evicted = 0
+
+    def hit(self, key: Hashable, now: float | None = None) -> int:
+        """이벤트 1건 기록 후 윈도 안의 이벤트 수(최대 maxlen)"""
+        if now is None:
+            now = time.monotonic()
+        dq = self._buckets.get(key)
+        if dq is None:
+            dq = self._buckets[key] = deque(maxlen=self.maxlen)
+        dq.append(now)
+        cutoff = now - self.window
+        while dq[0] < cutoff:
+            dq.popleft()
+        return len(dq)
+
+    def count(self, key: Hashable, now: float | None = None) -> int:
+        dq = self._buckets.get(key)
+        if not dq:
+            return 0
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self.window
+        return sum(1 for ts in dq if ts >= cutoff)
+
+    def reset(self, key: Hashable):
+        self._buckets.pop(key, None)
+
+    def sweep(self, now: float | None = None) -> int:
+        """마지막 이벤트가 윈도 밖인 키를 제거하고 제거 수를 돌려줌"""
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self.window
+        idle = [k for k, dq in self._buckets.items() if not dq or dq[-1] < cutoff]
+        for k in idle:
+            del self._buckets[k]
+        self.evicted += len(idle)
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def stats(self) -> dict:
+        """현재 키 수와 대략적인 메모리 사용량(바이트)"""
+        size = sys.getsizeof(self._buckets)
+        float_size = sys.getsizeof(0.0)
+        for k, dq in self._buckets.items():
+            size += sys.getsizeof(k) + sys.getsizeof(dq) + len(dq) * float_size
+        return {
+            "keys": len(self._buckets),
+            "events": sum(len(dq) for dq in self._buckets.values()),
+            "bytes": size,
+            "evicted": self.evicted,
+        }
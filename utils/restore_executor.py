@@ -0,0 +1,97 @@
+# utils/restore_executor.py
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable, Iterable
+
+import discord
+
+RESTORE_CONCURRENCY = 8   # 길드 1개 복구에서 동시에 진행하는 API 호출 수
+MAX_RETRIES = 3           # discord.py 자체 재시도 후에도 429면 추가로 기다렸다 재시도
+DEFAULT_RETRY_AFTER = 1.0
+
+# 디스코드 레이트리밋 버킷 구분 (major parameter 기준)
+# - 채널 PATCH 는 채널별 버킷 → 서로 다른 채널 수정은 병렬
+# - 역할 생성/수정, 채널 생성, 위치 변경은 길드 단위 버킷 → 종류별로 직렬
+BUCKET_ROLE_CREATE = "role_create"
+BUCKET_ROLE_EDIT = "role_edit"
+BUCKET_CHANNEL_CREATE = "channel_create"
+BUCKET_POSITIONS = "positions"
+
+
+def channel_bucket(channel_id: int) -> tuple[str, int]:
+    return ("channel", channel_id)
+
+
+def _retry_after(e: Exception) -> float:
+    """discord.py가 노출하는 레이트리밋 정보에서 대기 시간(초)"""
+    if isinstance(e, discord.RateLimited):
+        return float(e.retry_after)
+    resp = getattr(e, "response", None)
+    headers = getattr(resp, "headers", None) or {}
+    for name in ("X-RateLimit-Reset-After", "Retry-After"):
+        v = headers.get(name)
+        if v is not None:
+            try:
+                return float(v)
+            except ValueError:
+                pass
+    return DEFAULT_RETRY_AFTER
+
+
+class RestoreExecutor:
+    """
+    길드 1개 복구용 API 호출 스케줄러 (복구 요청마다 새로 만듦 → 길드끼리 서로 막지 않음).
+    - 같은 버킷의 호출은 순서대로, 다른 버킷은 동시에 (전체 동시 수는 concurrency)
+    - 고정 sleep 없음: 버킷 대기는 discord.py가 응답 헤더로 처리하고,
+      그래도 429가 올라오면 Retry-After만큼 해당 버킷만 멈췄다가 재시도
+    """
+
+    def __init__(self, *, concurrency: int = RESTORE_CONCURRENCY, max_retries: int = MAX_RETRIES):
+        self.max_retries = max_retries
+        self._sem = asyncio.Semaphore(concurrency)
+        self._locks: dict[Hashable, asyncio.Lock] = {}
+        self.calls = 0
+        self.retries = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    async def call(self, bucket: Hashable, factory: Callable[[], Awaitable]):
+        """factory()가 만든 코루틴을 bucket 순서에 맞춰 실행 (재시도 때마다 새로 만듦)"""
+        lock = self._locks.get(bucket)
+        if lock is None:
+            lock = self._locks[bucket] = asyncio.Lock()
+        async with lock:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    async with self._sem:
+                        self.calls += 1
+                        return await factory()
+                except (discord.RateLimited, discord.HTTPException) as e:
+                    limited = isinstance(e, discord.RateLimited) or getattr(e, "status", None) == 429
+                    if not limited or attempt == self.max_retries:
+                        raise
+                    self.retries += 1
+                    # 세마포어는 놓고 기다림 → 다른 버킷은 계속 진행
+                    await asyncio.sleep(_retry_after(e))
+
+    async def run(self, jobs: Iterable[Awaitable]) -> int:
+        """작업들을 동시에 실행하고 실패 수를 돌려줌 (하나가 실패해도 나머지는 계속)"""
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        failed = 0
+        for r in results:
+            if isinstance(r, BaseException):
+                failed += 1
+                print(f"❌ 복구 작업 실패: {r}")
+        self.failed += failed
+        return failed
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failed": self.failed,
+            "buckets": len(self._locks),
+            "elapsed_sec": round(time.monotonic() - self.started_at, 2),
+        }
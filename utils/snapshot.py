@@ -0,0 +1,131 @@
+# utils/snapshot.py
+from __future__ import annotations
+
+import json
+import zlib
+
+# 저장 형식: MAGIC(2) + 버전(1) + zlib(압축 JSON)
+MAGIC = b"SB"
+FORMAT_VERSION = 1
+COMPRESS_LEVEL = 6
+
+_CHANNEL_KINDS = ("categories", "texts", "voices")
+
+
+def _intern_overwrites(channels: dict) -> tuple[dict, list, list]:
+    """
+    채널 권한 덮어쓰기 인턴: 항목 (target_id, type, allow, deny) 과
+    항목 목록(카테고리와 동기화된 채널은 목록 자체가 같음)을 각각 표에 한 번만 저장
+    """
+    items: list[list] = []
+    item_idx: dict[tuple, int] = {}
+    lists: list[list[int]] = []
+    list_idx: dict[tuple, int] = {}
+    out = {}
+    for kind in _CHANNEL_KINDS:
+        rows = []
+        for ch in channels.get(kind, []):
+            refs = []
+            for ow in ch.get("overwrites", []):
+                key = (int(ow["target_id"]), ow["target_type"], int(ow["allow"]), int(ow["deny"]))
+                i = item_idx.get(key)
+                if i is None:
+                    i = item_idx[key] = len(items)
+                    items.append(list(key))
+                refs.append(i)
+            lkey = tuple(refs)
+            li = list_idx.get(lkey)
+            if li is None:
+                li = list_idx[lkey] = len(lists)
+                lists.append(refs)
+            rows.append({**{k: v for k, v in ch.items() if k != "overwrites"}, "ow": li})
+        out[kind] = rows
+    return out, items, lists
+
+
+def _expand_overwrites(channels: dict, items: list, lists: list) -> dict:
+    out = {}
+    for kind in _CHANNEL_KINDS:
+        rows = []
+        for ch in channels.get(kind, []):
+            ows = [
+                {"target_id": items[i][0], "target_type": items[i][1], "allow": items[i][2], "deny": items[i][3]}
+                for i in lists[ch["ow"]]
+            ]
+            rows.append({**{k: v for k, v in ch.items() if k != "ow"}, "overwrites": ows})
+        out[kind] = rows
+    return out
+
+
+def encode_snapshot(data: dict) -> bytes:
+    """백업 dict -> 압축 바이트 (guild_backups.blob)"""
+    doc = dict(data)
+    channels, items, lists = _intern_overwrites(data.get("channels") or {})
+    doc["channels"] = channels
+    doc["_ow"] = {"items": items, "lists": lists}
+    raw = json.dumps(doc, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return MAGIC + bytes([FORMAT_VERSION]) + zlib.compress(raw, COMPRESS_LEVEL)
+
+
+def decode_snapshot(blob: bytes) -> dict:
+    """압축 바이트 -> 백업 dict (encode_snapshot 이전과 같은 모양)"""
+    blob = bytes(blob)
+    if blob[:2] != MAGIC:
+        raise ValueError("not a snapshot blob")
+    version = blob[2]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported snapshot format version: {version}")
+    doc = json.loads(zlib.decompress(blob[3:]).decode("utf-8"))
+    ow = doc.pop("_ow")
+    doc["channels"] = _expand_overwrites(doc["channels"], ow["items"], ow["lists"])
+    return doc
+
+
+# ── 증분(델타) 스냅샷 ─────────────────────────────────────
+# 델타 = 베이스 대비 바뀌거나 새로 생긴 역할/채널 + 사라진 id 목록.
+# 모양이 전체 스냅샷과 같아서(roles/channels) encode_snapshot으로 그대로 저장한다.
+
+def _by_id(items: list[dict]) -> dict[int, dict]:
+    return {int(x["id"]): x for x in items}
+
+
+def _diff_list(base: list[dict], new: list[dict]) -> tuple[list[dict], list[int]]:
+    old = _by_id(base)
+    changed = [x for x in new if old.get(int(x["id"])) != x]
+    new_ids = {int(x["id"]) for x in new}
+    removed = [i for i in old if i not in new_ids]
+    return changed, removed
+
+
+def _apply_list(base: list[dict], changed: list[dict], removed: list[int]) -> list[dict]:
+    items = _by_id(base)
+    for i in removed:
+        items.pop(int(i), None)
+    for x in changed:
+        items[int(x["id"])] = x
+    # 직렬화 시 position 오름차순이었으므로 같은 기준으로 정렬 (동률은 베이스 순서 유지)
+    return sorted(items.values(), key=lambda x: x.get("position", 0))
+
+
+def make_delta(base: dict, new: dict) -> dict:
+    roles, removed_roles = _diff_list(base.get("roles", []), new.get("roles", []))
+    channels, removed = {}, {"roles": removed_roles}
+    for kind in _CHANNEL_KINDS:
+        channels[kind], removed[kind] = _diff_list(
+            (base.get("channels") or {}).get(kind, []), (new.get("channels") or {}).get(kind, [])
+        )
+    return {**{k: v for k, v in new.items() if k not in ("roles", "channels")},
+            "roles": roles, "channels": channels, "removed": removed}
+
+
+def apply_delta(base: dict, delta: dict) -> dict:
+    removed = delta.get("removed", {})
+    channels = {
+        kind: _apply_list((base.get("channels") or {}).get(kind, []),
+                          delta["channels"].get(kind, []), removed.get(kind, []))
+        for kind in _CHANNEL_KINDS
+    }
+    return {**{k: v for k, v in delta.items() if k not in ("roles", "channels", "removed")},
+            "roles": _apply_list(base.get("roles", []), delta.get("roles", []), removed.get("roles", [])),
+            "channels": channels}
+
@@ -0,0 +1,135 @@
+# utils/violations.py
+from __future__ import annotations
+
+import heapq
+import time
+from collections import deque
+from typing import Hashable
+
+# 전체 위반 기록 상한 (넘으면 가장 먼저 만료될 기록부터 버림)
+MAX_ENTRIES = 100_000
+
+
+class _Overage:
+    """고정 윈도 누적 카운터 (첫 위반 시각부터 window 동안)"""
+
+    __slots__ = ("count", "first_ts", "expires_at")
+
+    def __init__(self, now: float, window: float):
+        self.count = 0
+        self.first_ts = now
+        self.expires_at = now + window
+
+
+class _Hits:
+    """슬라이딩 윈도 위반 시각 목록"""
+
+    __slots__ = ("times", "expires_at")
+
+    def __init__(self, maxlen: int):
+        self.times: deque[float] = deque(maxlen=maxlen)
+        self.expires_at = 0.0
+
+
+class ViolationStore:
+    """
+    키(예: "overage:rate:<gid>:<uid>")별 위반 기록.
+    - 힙으로 만료 시각을 추적해 오래된 기록을 스스로 지움
+    - MAX_ENTRIES를 넘으면 가장 빨리 만료될 기록부터 강제 제거
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: dict[Hashable, _Overage | _Hits] = {}
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._seq = 0  # 힙에서 키끼리 비교하지 않도록 하는 타이브레이커
+        self.expired = 0
+        self.evicted = 0
+
+    def _schedule(self, key: Hashable, expires_at: float):
+        self._seq += 1
+        heapq.heappush(self._heap, (expires_at, self._seq, key))
+        # 연장으로 쌓인 낡은 힙 항목 정리
+        if len(self._heap) > 2 * len(self._data) + 1024:
+            self._heap = [(rec.expires_at, i, k) for i, (k, rec) in enumerate(self._data.items())]
+            heapq.heapify(self._heap)
+            self._seq = len(self._heap)
+
+    def _enforce_cap(self):
+        while len(self._data) > self.max_entries and self._heap:
+            exp, _, key = heapq.heappop(self._heap)
+            rec = self._data.get(key)
+            if rec is not None and rec.expires_at == exp:
+                del self._data[key]
+                self.evicted += 1
+
+    def expire(self, now: float | None = None) -> int:
+        """만료된 기록 제거, 제거 수 반환"""
+        if now is None:
+            now = time.monotonic()
+        removed = 0
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            exp, _, key = heapq.heappop(heap)
+            rec = self._data.get(key)
+            if rec is not None and rec.expires_at == exp:
+                del self._data[key]
+                removed += 1
+        self.expired += removed
+        return removed
+
+    def bump_overage(self, key: Hashable, *, window: float, threshold: int, now: float | None = None) -> bool:
+        """window 안에서 threshold회 누적되면 True (그리고 0부터 다시)"""
+        if now is None:
+            now = time.monotonic()
+        self.expire(now)
+        rec = self._data.get(key)
+        if not isinstance(rec, _Overage):
+            rec = self._data[key] = _Overage(now, window)
+            self._schedule(key, rec.expires_at)
+            self._enforce_cap()
+        rec.count += 1
+        if rec.count >= threshold:
+            rec.count = 0
+            rec.first_ts = now
+            rec.expires_at = now + window
+            self._schedule(key, rec.expires_at)
+            return True
+        return False
+
+    def hit_window(self, key: Hashable, *, window: float, threshold: int, now: float | None = None) -> bool:
+        """최근 window 안에 threshold회 이상이면 True (그리고 기록 비움)"""
+        if now is None:
+            now = time.monotonic()
+        self.expire(now)
+        rec = self._data.get(key)
+        new = not isinstance(rec, _Hits)
+        if new:
+            rec = self._data[key] = _Hits(threshold)
+        times = rec.times
+        times.append(now)
+        cutoff = now - window
+        while times[0] < cutoff:
+            times.popleft()
+        if len(times) >= threshold:
+            del self._data[key]
+            return True
+        rec.expires_at = now + window
+        self._schedule(key, rec.expires_at)
+        if new:
+            self._enforce_cap()
+        return False
+
+    def discard(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "heap": len(self._heap),
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }